@@ -3,8 +3,12 @@ import xml.etree.ElementTree as ET
 import openai
 from fpdf import FPDF
 import os
+import sys
 from openai import AzureOpenAI
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.singleflight import get_flight, request_key
+
 endpoint = os.getenv("ENDPOINT_URL", "https://pradeepazopenai.openai.azure.com/")
 deployment = os.getenv("DEPLOYMENT_NAME", "gpt-4.1")
 subscription_key = os.getenv("AZURE_OPENAI_API_KEY", "4ChnscFbQsgE6OpHkq7ADOnQiljXPiwPzhH7l3gcmiNdin09YEQFJQQJ99BHAC77bzfXJ3w3AAABACOG4fSG")
@@ -40,6 +44,10 @@ def summarize_actions(actions):
 
 {actions}
 """
+    # Identical uploads summarized at the same time share one completion
+    return get_flight("summarize").do(request_key(prompt, deployment), _complete, prompt)
+
+def _complete(prompt):
     response = client.chat.completions.create(
         messages=[{"role": "user", "content": prompt}],
         max_completion_tokens=13107,
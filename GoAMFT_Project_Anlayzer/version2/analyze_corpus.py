@@ -0,0 +1,264 @@
+# analyze_corpus.py
+"""
+Batch analyzer for exported GoAnywhere project XMLs.
+
+Usage:
+    python analyze_corpus.py exports/ -o results.jsonl
+    python analyze_corpus.py exports.zip -o results_parquet --format parquet --workers 8
+
+Every *.xml under the directory (or inside the ZIP) is parsed in a process
+pool with backend.parser. One record per project is streamed to the output,
+and finished sources are appended to <output>.done so an interrupted run
+picks up where it stopped when started again with the same output. Sources
+that failed to parse are not marked done: they are analyzed again on the
+next run, and their earlier records (like any record without a .done entry)
+are dropped from the output when it is reopened.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.parser import iter_project_modules
+
+
+def discover_sources(path):
+    """Return (source_id, size_bytes) for every project XML in a directory or ZIP."""
+    sources = []
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".xml"):
+                    sources.append((f"{path}!{info.filename}", info.file_size))
+    else:
+        for dirpath, _, filenames in os.walk(path):
+            for name in filenames:
+                if name.lower().endswith(".xml"):
+                    full = os.path.join(dirpath, name)
+                    sources.append((full, os.path.getsize(full)))
+    sources.sort()
+    return sources
+
+
+def _read_source(source_id):
+    if "!" in source_id and not os.path.isfile(source_id):
+        archive, member = source_id.split("!", 1)
+        with zipfile.ZipFile(archive) as zf:
+            return zf.read(member)
+    with open(source_id, "rb") as f:
+        return f.read()
+
+
+def analyze_source(source_id):
+    """Worker: parse one project and return a flat, JSON-serialisable record."""
+    record = {"source": source_id, "modules": [], "action_count": 0,
+              "action_types": {}, "actions": [], "error": None}
+    try:
+        counts = Counter()
+        for mod_name, actions in iter_project_modules(_read_source(source_id)):
+            record["modules"].append(mod_name)
+            record["actions"].extend(actions)
+            counts.update(a["Action"] for a in actions)
+        record["action_count"] = len(record["actions"])
+        record["action_types"] = dict(counts)
+    except Exception as e:
+        record["error"] = str(e)
+    return record
+
+
+def load_done(output):
+    done_path = output + ".done"
+    if not os.path.exists(done_path):
+        return set()
+    with open(done_path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def _done_sources(records):
+    """Sources of the records that can be marked done (failed ones are retried on the next run)."""
+    return [record["source"] for record in records if record["error"] is None]
+
+
+class JsonlWriter:
+    """
+    write() returns the sources that are now safely on disk, for the .done log.
+    On open, existing output is cut back to its last complete line and only
+    the first record of each source in done is kept, so records of sources
+    that are analyzed again do not end up in the file twice.
+    """
+
+    def __init__(self, output, done=frozenset()):
+        if os.path.exists(output):
+            self._keep_done(output, done)
+        self._f = open(output, "a", encoding="utf-8")
+
+    @staticmethod
+    def _keep_done(output, done):
+        seen = set()
+        kept = []
+        changed = False
+        with open(output, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Partial last line of an interrupted run
+                    changed = True
+                    break
+                source = json.loads(line).get("source")
+                if source in done and source not in seen:
+                    seen.add(source)
+                    kept.append(line)
+                else:
+                    changed = True
+        if changed:
+            with open(output + ".tmp", "wb") as f:
+                f.writelines(kept)
+            os.replace(output + ".tmp", output)
+
+    def write(self, record):
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._f.flush()
+        return _done_sources([record])
+
+    def close(self):
+        self._f.close()
+        return []
+
+
+class ParquetWriter:
+    """
+    Writes every batch_size records as its own part file in the output
+    directory. A part is written under a temporary name and renamed once it
+    is closed, so sources are only reported done when their part is readable.
+    On open, rows of sources not in done (failed or never marked done) are
+    removed from the existing parts, as for JsonlWriter.
+    """
+
+    def __init__(self, output, batch_size=500, done=frozenset()):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow).")
+        self._pa = pa
+        self._pq = pq
+        self._output = output
+        os.makedirs(output, exist_ok=True)
+        parts = sorted(n for n in os.listdir(output) if n.endswith(".parquet"))
+        # Parts emptied by _keep_done are removed, so number after the highest part, not the count
+        self._part = int(parts[-1][len("part-"):-len(".parquet")]) + 1 if parts else 0
+        self._keep_done(parts, done)
+        self._schema = pa.schema([
+            ("source", pa.string()),
+            ("modules", pa.list_(pa.string())),
+            ("action_count", pa.int64()),
+            ("action_types", pa.string()),
+            ("actions", pa.string()),
+            ("error", pa.string()),
+        ])
+        self._batch = []
+        self._batch_size = batch_size
+
+    def _keep_done(self, parts, done):
+        seen = set()
+        for name in parts:
+            path = os.path.join(self._output, name)
+            sources = self._pq.read_table(path, columns=["source"]).column("source").to_pylist()
+            keep = []
+            for source in sources:
+                keep.append(source in done and source not in seen)
+                seen.add(source)
+            if all(keep):
+                continue
+            table = self._pq.read_table(path).filter(self._pa.array(keep)) if any(keep) else None
+            if table is None:
+                os.remove(path)
+                continue
+            self._pq.write_table(table, path + ".tmp")
+            os.replace(path + ".tmp", path)
+
+    def write(self, record):
+        row = dict(record)
+        # Action details have no fixed schema, so nested values are stored as JSON text
+        row["action_types"] = json.dumps(record["action_types"])
+        row["actions"] = json.dumps(record["actions"], ensure_ascii=False)
+        self._batch.append(row)
+        if len(self._batch) >= self._batch_size:
+            return self._flush()
+        return []
+
+    def _flush(self):
+        if not self._batch:
+            return []
+        path = os.path.join(self._output, f"part-{self._part:05d}.parquet")
+        # A part killed mid-write stays a .tmp file and its sources are analyzed again on resume
+        self._pq.write_table(self._pa.Table.from_pylist(self._batch, schema=self._schema), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self._part += 1
+        written = _done_sources(self._batch)
+        self._batch = []
+        return written
+
+    def close(self):
+        return self._flush()
+
+
+def run(path, output, fmt="jsonl", workers=None, report_every=100):
+    sources = discover_sources(path)
+    done = load_done(output)
+    pending = [(s, size) for s, size in sources if s not in done]
+    print(f"{len(sources)} projects found, {len(sources) - len(pending)} already done, "
+          f"{len(pending)} to analyze", file=sys.stderr)
+    if not pending:
+        return
+
+    writer = ParquetWriter(output, done=done) if fmt == "parquet" else JsonlWriter(output, done=done)
+    sizes = dict(pending)
+    files = errors = 0
+    total_bytes = 0
+    start = time.perf_counter()
+
+    def report(final=False):
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print(f"{'done' if final else 'progress'}: {files}/{len(pending)} files, {errors} errors, "
+              f"{files / elapsed:.1f} files/s, {total_bytes / elapsed / 1e6:.2f} MB/s",
+              file=sys.stderr)
+
+    def checkpoint(written):
+        if written:
+            done_log.write("".join(s + "\n" for s in written))
+            done_log.flush()
+
+    with open(output + ".done", "a", encoding="utf-8") as done_log:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for record in pool.map(analyze_source, [s for s, _ in pending], chunksize=4):
+                    checkpoint(writer.write(record))
+                    files += 1
+                    total_bytes += sizes[record["source"]]
+                    errors += record["error"] is not None
+                    if files % report_every == 0:
+                        report()
+        finally:
+            checkpoint(writer.close())
+    report(final=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a corpus of GoAnywhere project XMLs.")
+    parser.add_argument("path", help="Directory or ZIP file containing project XMLs")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Output .jsonl file, or directory for --format parquet")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--report-every", type=int, default=100)
+    args = parser.parse_args(argv)
+    run(args.path, args.output, args.format, args.workers, args.report_every)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,154 @@
 # app.py
+import hashlib
+import os
+import sys
 import streamlit as st
-from backend.parser import parse_project_xml
-from backend.summarizer import summarize_actions
-from backend.exporter import generate_pdf
+from backend.parser import iter_project_modules, parse_project_xml
+from backend.diff import diff_actions, format_diff_report
+from backend.action_tree import build_project_tree
+from backend.summarizer import (
+    summarize_actions, summarize_project, summarize_revision, summarize_xml_map_reduce, get_cache
+)
+from backend.exporter import PdfBuilder, render_summary_pdf
+from backend.prompt_encoding import add_savings, prompt_savings
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common.exports import ExportDocument, prime, render_exports, file_name, mime_type
+from common.jobs import get_job_queue
+from common.singleflight import flight_stats, request_key
+
+
+
+PER_MODULE = "Per module (large projects)"
+
+
+def summary_job(mode, xml_bytes, previous_bytes=None):
+    """
+    Background job: yields summary chunks, returns (summary, pdf bytes) laid out while streaming.
+    It parses the uploads itself, so it can be started before the page renders them.
+    """
+    builder = PdfBuilder()
+    if previous_bytes is not None:
+        chunks = [summarize_revision(parse_project_xml(previous_bytes), parse_project_xml(xml_bytes),
+                                     project=build_project_tree(xml_bytes))[0]]
+    elif mode == PER_MODULE:
+        # Modules go to the map step while the rest of the file is read
+        chunks = summarize_xml_map_reduce(xml_bytes, stream=True)
+    elif mode.startswith("Rule-based"):
+        chunks = summarize_project(build_project_tree(xml_bytes), stream=True, narrative=mode.endswith("narrative"))
+    else:
+        chunks = summarize_actions(parse_project_xml(xml_bytes), stream=True)
+    parts = []
+    for chunk in chunks:
+        builder.feed(chunk)
+        parts.append(chunk)
+        yield chunk
+    return "".join(parts), builder.finish()
+
 
 st.set_page_config(page_title="GoAnywhere Project Analyzer", layout="wide")
 st.title("🔁 GoAnywhere Project Analyzer")
 
+summary_mode = st.sidebar.radio(
+    "Summary mode",
+    ("Full AI summary", PER_MODULE, "Rule-based table + AI narrative", "Rule-based table only"),
+)
+previous_file = st.sidebar.file_uploader(
+    "Previous version (optional, re-summarizes changed modules only)", type=["xml"],
+    help="Unchanged modules reuse their cached per-module summary. Modules without one (e.g. the previous "
+         "version was summarized as a whole project) are summarized as well, and cached for the next revision.",
+)
+
 uploaded_file = st.file_uploader("Upload GoAnywhere Project XML", type=["xml"])
 if uploaded_file:
-    xml_content = uploaded_file.read().decode("utf-8")
     try:
-        parsed_actions = parse_project_xml(xml_content)
-        #st.subheader("📋 Parsed Actions")
-        #st.json(parsed_actions)
+        # The summary runs as a background job keyed by its inputs: reruns reattach to it instead of re-requesting
+        jobs = get_job_queue()
+        xml_bytes = uploaded_file.getvalue()
+        job_id = request_key(
+            "summary", summary_mode, hashlib.sha256(xml_bytes).hexdigest(),
+            hashlib.sha256(previous_file.getvalue()).hexdigest() if previous_file else None,
+        )
+        cancelled = st.session_state.get("cancelled_job") == job_id
+        # A failed job keeps its error until the user asks for a retry
+        retry = st.session_state.pop("retry_job", None) == job_id
+        job = jobs.poll(job_id)
+        failed = job is not None and job["status"] == "failed"
+        # The only place the summary is submitted: before the upload is rendered, so it runs meanwhile
+        if not cancelled and (retry or not failed):
+            jobs.submit(summary_job, summary_mode, xml_bytes,
+                        previous_file.getvalue() if previous_file else None, job_id=job_id)
+        per_module = summary_mode == PER_MODULE and not previous_file
 
-        if "summary" not in st.session_state:
-            with st.spinner("Summarizing with Azure OpenAI..."):
-                st.session_state.summary = summarize_actions(parsed_actions)
+        # Stream modules out of the upload so large exports render as they are read;
+        # the full action list is only kept for the modes that send it in one prompt
+        keep_actions = bool(previous_file) or not (per_module or summary_mode.startswith("Rule-based"))
+        parsed_actions = [] if keep_actions else None
+        savings = None
+        st.subheader("📋 Parsed Modules")
+        for mod_name, mod_actions in iter_project_modules(xml_bytes):
+            if keep_actions:
+                parsed_actions.extend(mod_actions)
+            else:
+                savings = add_savings(savings, prompt_savings(mod_actions))
+            with st.expander(f"{mod_name} ({len(mod_actions)} actions)"):
+                st.json(mod_actions, expanded=False)
+
+        if keep_actions:
+            savings = prompt_savings(parsed_actions)
+        savings = savings or prompt_savings([])
+        st.sidebar.caption(
+            f"Prompt: {savings['compact_tokens']:,} tokens (saved {savings['saved_tokens']:,}, "
+            f"{savings['saved_percent']:.0f}%, ~${savings['saved_cost']:.4f})"
+        )
+
+        previous_actions = parse_project_xml(previous_file.getvalue()) if previous_file else None
+        diff = diff_actions(previous_actions, parsed_actions) if previous_actions is not None else None
+        if diff is not None:
+            st.subheader("🔍 Changes from previous version")
+            st.markdown(format_diff_report(diff))
 
         st.subheader("🧠 AI Summary")
-        st.markdown(st.session_state.summary, unsafe_allow_html=True)
+        if not cancelled:
+            running = jobs.poll(job_id)["status"] in ("pending", "running")
+            if running and st.button("⏹ Cancel summary") and jobs.cancel(job_id):
+                st.session_state.cancelled_job, cancelled = job_id, True
 
-        pdf_file = generate_pdf(st.session_state.summary)
-        with open(pdf_file, "rb") as f:
-            st.download_button("📄 Download Summary as PDF", f, file_name="GoAnywhere_Project_Summary.pdf")
+        job = jobs.poll(job_id) or {"status": "cancelled"}
+        streamed = not cancelled and job["status"] in ("pending", "running")
+        if streamed:
+            with st.spinner("Summarizing with Azure OpenAI..."):
+                st.write_stream(jobs.stream(job_id))
+            job = jobs.poll(job_id)
+        summary = None
+        if cancelled or job["status"] == "cancelled":
+            st.info("Summary cancelled.")
+            st.button("▶ Summarize again", on_click=lambda: st.session_state.pop("cancelled_job", None))
+        elif job["status"] == "failed":
+            st.error(f"Summary failed: {job['error']}")
+            st.button("🔁 Retry summary", on_click=lambda: st.session_state.update(retry_job=job_id))
+        else:
+            summary, pdf = jobs.result(job_id)
+            prime(ExportDocument(summary, title="GoAnywhere Project Summary"), "pdf", pdf, render_summary_pdf)
+            if not streamed:
+                st.markdown(summary, unsafe_allow_html=True)
+
+        stats = get_cache().stats()
+        st.sidebar.caption(f"Summary cache: {stats['hits']} hits / {stats['misses']} misses, {stats['entries']} entries")
+        flight = flight_stats().get("summarize")
+        if flight:
+            st.sidebar.caption(f"Shared in-flight summaries: {flight['coalesced']} of {flight['calls']} requests")
+
+        if summary is not None:
+            doc = ExportDocument(summary, title="GoAnywhere Project Summary")
+            exports = render_exports(doc, ["pdf", "md", "html"], renderers={"pdf": render_summary_pdf})
+            labels = {"pdf": "📄 Download Summary as PDF", "md": "Download as Markdown (.md)", "html": "Download as HTML"}
+            for fmt, data in exports.items():
+                if isinstance(data, Exception):
+                    st.error(f"❌ {fmt.upper()} export failed: {data}")
+                    continue
+                st.download_button(labels[fmt], data, file_name=file_name(fmt, "GoAnywhere_Project_Summary"),
+                                   mime=mime_type(fmt))
 
     except Exception as e:
         st.error(f"Error: {e}")
-
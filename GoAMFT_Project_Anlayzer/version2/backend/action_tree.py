@@ -0,0 +1,340 @@
+# backend/action_tree.py
+import sys
+import xml.etree.ElementTree as ET
+from array import array
+from collections import defaultdict
+
+from backend.parser import _as_stream
+
+# Node kinds, by depth under <project>
+_MODULE, _ACTION, _NESTED = 0, 1, 2
+
+
+class Node:
+    """
+    View of one XML element of a project. The element itself lives in the
+    Project's node tables; views are created on access and compare equal
+    when they point at the same element.
+    """
+    __slots__ = ("_project", "_id")
+
+    def __init__(self, project, node_id):
+        self._project = project
+        self._id = node_id
+
+    @property
+    def tag(self):
+        return self._project._tags[self._project._tag_ids[self._id]]
+
+    @property
+    def keys(self):
+        return self._project._schemas[self._project._schema_ids[self._id]]
+
+    @property
+    def values(self):
+        project, node_id = self._project, self._id
+        start = project._value_starts[node_id]
+        refs = project._value_refs[start:start + len(project._schemas[project._schema_ids[node_id]])]
+        return tuple(project._string(string_id) for string_id in refs)
+
+    @property
+    def text(self):
+        return self._project._texts.get(self._id)
+
+    @property
+    def children(self):
+        return tuple(self._project._node(child) for child in self._project._child_ids(self._id))
+
+    @property
+    def parent(self):
+        parent = self._project._parents[self._id]
+        return self._project._node(parent) if parent >= 0 else None
+
+    def get(self, name, default=None):
+        project, node_id = self._project, self._id
+        try:
+            position = project._schemas[project._schema_ids[node_id]].index(name)
+        except ValueError:
+            return default
+        return project._string(project._value_refs[project._value_starts[node_id] + position])
+
+    @property
+    def attrib(self):
+        return dict(zip(self.keys, self.values))
+
+    @property
+    def label(self):
+        return self.get("label", "No Label")
+
+    @property
+    def guard(self):
+        """The executeOnlyIf expression, if the element is conditional."""
+        return self.get("executeOnlyIf")
+
+    def iter(self):
+        # Descendants are stored in document order right after the node
+        project = self._project
+        return (project._node(node_id) for node_id in range(self._id, project._ends[self._id]))
+
+    def __eq__(self, other):
+        return isinstance(other, Node) and other._project is self._project and other._id == self._id
+
+    def __hash__(self):
+        return hash((id(self._project), self._id))
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.tag} {self.attrib}>"
+
+
+class Action(Node):
+    """A direct child of a <module>, with its module and position."""
+    __slots__ = ()
+
+    @property
+    def module(self):
+        return self.parent
+
+    @property
+    def index(self):
+        return self._project._positions[self._id]
+
+
+class Module(Node):
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return self.get("name", "Unnamed")
+
+    @property
+    def on_error(self):
+        return self.get("onError")
+
+    @property
+    def actions(self):
+        return self.children
+
+
+_VIEWS = {_MODULE: Module, _ACTION: Action, _NESTED: Node}
+
+
+class Project:
+    """
+    Typed tree for a whole project XML with indexes built once at load time:
+    by_tag("fileset") and find("sftp/get/fileset") answer without a rescan.
+    Paths are tag paths relative to the module, starting at the action.
+
+    Elements are stored column-wise in compact arrays (tag, attribute layout,
+    offset of the attribute values, parent, subtree end, position), numbered
+    in document order. Tags and attribute names are interned; attribute
+    values are ids into one string pool, and a node's values are a run of
+    _value_refs starting at its offset (identical runs are stored once). A
+    node thus costs a few bytes in the tables instead of Python objects;
+    Node views and value strings are created when they are accessed.
+    """
+    __slots__ = ("name", "attrib", "description", "modules", "_tags", "_schemas", "_strings", "_string_starts",
+                 "_texts", "_tag_ids", "_schema_ids", "_value_starts", "_value_refs", "_parents", "_ends",
+                 "_positions", "_kinds", "_tag_index", "_path_index")
+
+    def __init__(self, attrib, description=None):
+        self.name = attrib.get("name")
+        self.attrib = attrib
+        self.description = description
+        self.modules = []
+        self._tags = []
+        self._schemas = []
+        self._strings = ""
+        self._string_starts = array("I", [0])
+        self._texts = {}
+        self._tag_ids = array("I")
+        self._schema_ids = array("I")
+        self._value_starts = array("I")
+        self._value_refs = array("I")
+        self._parents = array("i")
+        self._ends = array("I")
+        self._positions = array("I")
+        self._kinds = array("B")
+        self._tag_index = {}
+        self._path_index = {}
+
+    def _node(self, node_id):
+        return _VIEWS[self._kinds[node_id]](self, node_id)
+
+    def _string(self, string_id):
+        return self._strings[self._string_starts[string_id]:self._string_starts[string_id + 1]]
+
+    def _child_ids(self, node_id):
+        child = node_id + 1
+        end = self._ends[node_id]
+        while child < end:
+            yield child
+            child = self._ends[child]
+
+    def _build_indexes(self):
+        tag_index = defaultdict(lambda: array("I"))
+        path_index = defaultdict(lambda: array("I"))
+        paths = []
+        # Parents come before their children, so a parent's path is always known
+        for node_id, kind in enumerate(self._kinds):
+            tag = self._tags[self._tag_ids[node_id]]
+            if kind == _MODULE:
+                path = None
+            elif kind == _ACTION:
+                path = tag
+            else:
+                path = sys.intern(f"{paths[self._parents[node_id]]}/{tag}")
+            paths.append(path)
+            if kind != _MODULE:
+                tag_index[tag].append(node_id)
+                path_index[path].append(node_id)
+        self._tag_index = dict(tag_index)
+        self._path_index = dict(path_index)
+
+    @property
+    def main_module(self):
+        return self.module(self.attrib.get("mainModule", "Main"))
+
+    def module(self, name):
+        for module in self.modules:
+            if module.name == name:
+                return module
+        return None
+
+    def actions(self):
+        for module in self.modules:
+            yield from module.children
+
+    def by_tag(self, tag):
+        return [self._node(node_id) for node_id in self._tag_index.get(tag, ())]
+
+    def find(self, path):
+        return [self._node(node_id) for node_id in self._path_index.get(path, ())]
+
+    def paths(self):
+        return list(self._path_index)
+
+    def to_actions(self):
+        """Flatten to the list-of-dicts shape returned by parse_project_xml."""
+        return [
+            {
+                "Module": module.name,
+                "Action": action.tag.lower(),
+                "Label": action.label,
+                "Details": action.attrib,
+            }
+            for module in self.modules
+            for action in module.children
+        ]
+
+
+class _TableBuilder:
+    """
+    Appends elements to a Project's tables, sharing tags, layouts, value runs
+    and strings. finish() packs the value strings into the Project's pool.
+    """
+
+    def __init__(self, project):
+        self.project = project
+        self.tags = {}
+        self.schemas = {}
+        self.runs = {}
+        self.strings = {}
+        self.string_list = []
+
+    def _intern(self, table, index, item):
+        item_id = index.get(item)
+        if item_id is None:
+            item_id = index[item] = len(table)
+            table.append(item)
+        return item_id
+
+    def add(self, tag, attrib, parent, position, kind):
+        project = self.project
+        node_id = len(project._kinds)
+        project._tag_ids.append(self._intern(project._tags, self.tags, sys.intern(tag)))
+        keys = tuple(sys.intern(k) for k in attrib)
+        project._schema_ids.append(self._intern(project._schemas, self.schemas, keys))
+        # Repeated values ("1.0", "false", resourceIds, paths) share one string id,
+        # and elements with the same values share one run of ids
+        refs = tuple(self._intern(self.string_list, self.strings, v) for v in attrib.values())
+        start = self.runs.get(refs)
+        if start is None:
+            start = self.runs[refs] = len(project._value_refs)
+            project._value_refs.extend(refs)
+        project._value_starts.append(start)
+        project._parents.append(parent)
+        project._ends.append(0)
+        project._positions.append(position)
+        project._kinds.append(kind)
+        return node_id
+
+    def close(self, node_id, text):
+        project = self.project
+        project._ends[node_id] = len(project._kinds)
+        if text:
+            project._texts[node_id] = text
+
+    def finish(self):
+        project = self.project
+        project._strings = "".join(self.string_list)
+        position = 0
+        for string in self.string_list:
+            position += len(string)
+            project._string_starts.append(position)
+
+
+def build_project_tree(source):
+    """
+    Build a Project from bytes, str or a binary file object. Elements are
+    added to the node tables as they start and cleared when they end, so the
+    ElementTree is never held in memory alongside the tables. Only modules
+    and their contents are kept (plus the project attributes and description).
+    """
+    project = None
+    builder = None
+    open_ids = []      # ids of the open module elements and their descendants
+    child_counts = []  # children seen so far, per open element
+    depth = 0
+    skip = 0           # depth of a skipped top-level element (<variable>, <description>, ...)
+    description = None
+    try:
+        for event, elem in ET.iterparse(_as_stream(source), events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    project = Project(dict(elem.attrib))
+                    builder = _TableBuilder(project)
+                elif skip:
+                    pass
+                elif depth == 2 and elem.tag != "module":
+                    skip = depth
+                else:
+                    parent = open_ids[-1] if open_ids else -1
+                    position = child_counts[-1] if child_counts else len(project.modules)
+                    if child_counts:
+                        child_counts[-1] += 1
+                    node_id = builder.add(elem.tag, elem.attrib, parent, position, min(depth - 2, _NESTED))
+                    if depth == 2:
+                        project.modules.append(Module(project, node_id))
+                    open_ids.append(node_id)
+                    child_counts.append(0)
+                continue
+
+            text = elem.text.strip() if elem.text and elem.text.strip() else None
+            if skip:
+                if depth == skip:
+                    if elem.tag == "description":
+                        description = text
+                    skip = 0
+            elif depth > 1:
+                builder.close(open_ids.pop(), text)
+                child_counts.pop()
+            depth -= 1
+            elem.clear()
+    except ET.ParseError as e:
+        raise ValueError(f"Invalid XML format: {e}")
+
+    project.description = description
+    builder.finish()
+    project._build_indexes()
+    return project
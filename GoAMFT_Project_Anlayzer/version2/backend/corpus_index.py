@@ -0,0 +1,202 @@
+# backend/corpus_index.py
+import json
+import os
+import xml.etree.ElementTree as ET
+from collections import defaultdict, deque
+
+INDEX_FILE = ".corpus_index.json"
+INDEX_VERSION = 1
+
+
+def project_key(path):
+    """GoAnywhere-style project path for a file: /<folder>/<name> relative to the corpus root."""
+    return "/" + os.path.splitext(path)[0].replace(os.sep, "/").strip("/")
+
+
+def _is_reference(value):
+    return value and "${" not in value
+
+
+def scan_file(path):
+    """
+    Read only what the index needs from one XML file with a single iterparse
+    pass: project name, callProject targets, onError targets and resourceIds
+    for projects; resourceName for resources.
+    """
+    entry = {"kind": None, "name": None, "calls": [], "on_error": [], "resources": []}
+    calls, on_error, resources = set(), set(), set()
+    module = None
+    resource_name = None
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if entry["kind"] is None:
+            entry["kind"] = elem.tag
+            entry["name"] = elem.get("name")
+            if elem.tag not in ("project", "resource"):
+                break
+            continue
+        if event == "start":
+            if elem.tag == "module":
+                module = elem.get("name", "Unnamed")
+            target = elem.get("onError", "")
+            if target.startswith("call:"):
+                on_error.add((module or "", target[5:]))
+            if elem.tag == "callProject" and _is_reference(elem.get("project")):
+                calls.add(elem.get("project"))
+            if _is_reference(elem.get("resourceId")):
+                resources.add(elem.get("resourceId"))
+        else:
+            if entry["kind"] == "resource" and elem.tag == "resourceName":
+                resource_name = (elem.text or "").strip()
+            elem.clear()
+    entry["calls"] = sorted(calls)
+    entry["on_error"] = sorted(on_error)
+    entry["resources"] = sorted(resources)
+    if entry["kind"] == "resource":
+        entry["name"] = resource_name
+    return entry
+
+
+class CorpusIndex:
+    """
+    Call graph and resource index over a directory of project/resource XMLs.
+
+        index = CorpusIndex("exports/")
+        index.refresh()                       # re-scans only files whose mtime/size changed
+        index.impacted_by("/project-functions-templates/Archive_Files")
+        index.projects_using_resource("E91232")
+
+    Per-file scan results persist in <root>/.corpus_index.json; the graphs
+    are rebuilt in memory from them, so queries do not touch the XML again.
+    """
+
+    def __init__(self, root, index_path=None):
+        self.root = os.path.abspath(root)
+        self.index_path = index_path or os.path.join(self.root, INDEX_FILE)
+        self.files = {}
+        self._load()
+        self._build()
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.files = data["files"]
+
+    def save(self):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "files": self.files}, f)
+        os.replace(tmp, self.index_path)
+
+    def refresh(self):
+        """Re-scan new and modified files, drop deleted ones. Returns (scanned, removed) counts."""
+        seen = set()
+        scanned = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.lower().endswith(".xml"):
+                    continue
+                full = os.path.join(dirpath, name)
+                rel = os.path.relpath(full, self.root)
+                seen.add(rel)
+                stat = os.stat(full)
+                cached = self.files.get(rel)
+                if cached and cached["mtime"] == stat.st_mtime and cached["size"] == stat.st_size:
+                    continue
+                try:
+                    entry = scan_file(full)
+                except ET.ParseError as e:
+                    entry = {"kind": "invalid", "name": None, "calls": [], "on_error": [],
+                             "resources": [], "error": str(e)}
+                entry.update(mtime=stat.st_mtime, size=stat.st_size)
+                self.files[rel] = entry
+                scanned += 1
+        removed = [rel for rel in self.files if rel not in seen]
+        for rel in removed:
+            del self.files[rel]
+        if scanned or removed:
+            self._build()
+            self.save()
+        return scanned, len(removed)
+
+    def _build(self):
+        self.projects = {}
+        self.resources = {}
+        by_name = defaultdict(list)
+        for rel, entry in self.files.items():
+            if entry["kind"] == "project":
+                key = project_key(rel)
+                self.projects[key] = dict(entry, file=rel)
+                by_name[entry["name"]].append(key)
+                by_name[os.path.basename(key)].append(key)
+            elif entry["kind"] == "resource" and entry["name"]:
+                self.resources[entry["name"]] = rel
+        self._by_name = dict(by_name)
+
+        self.calls = defaultdict(set)
+        self.callers = defaultdict(set)
+        self.resource_users = defaultdict(set)
+        for key, entry in self.projects.items():
+            for target in entry["calls"]:
+                resolved = self.resolve(target)
+                self.calls[key].add(resolved)
+                self.callers[resolved].add(key)
+            for resource_id in entry["resources"]:
+                self.resource_users[resource_id].add(key)
+
+    def resolve(self, target):
+        """
+        Match a callProject path to an indexed project: exact path, then unique
+        name/file stem. Query targets go through it too, so they name the same
+        nodes as the call edges.
+        """
+        if target in self.projects:
+            return target
+        candidates = self._by_name.get(target.rstrip("/").rsplit("/", 1)[-1], [])
+        if len(set(candidates)) == 1:
+            return candidates[0]
+        # Unknown or ambiguous: keep the raw path as its own node
+        return target
+
+    def _walk(self, start, edges):
+        seen = set()
+        queue = deque([start])
+        while queue:
+            for nxt in edges.get(queue.popleft(), ()):
+                if nxt not in seen and nxt != start:
+                    seen.add(nxt)
+                    queue.append(nxt)
+        return seen
+
+    def callees_of(self, project, transitive=True):
+        """Projects that run when project runs."""
+        project = self.resolve(project)
+        return self._walk(project, self.calls) if transitive else set(self.calls.get(project, ()))
+
+    def callers_of(self, project, transitive=True):
+        project = self.resolve(project)
+        return self._walk(project, self.callers) if transitive else set(self.callers.get(project, ()))
+
+    def impacted_by(self, project):
+        """Everything affected if project changes: the project's callers, transitively."""
+        return self.callers_of(project, transitive=True)
+
+    def projects_using_resource(self, resource_id):
+        return set(self.resource_users.get(resource_id, ()))
+
+    def error_handlers(self, project):
+        """(module, handler module) pairs from onError="call:..." in project."""
+        return [tuple(pair) for pair in self.projects.get(self.resolve(project), {}).get("on_error", [])]
+
+    def unresolved_calls(self):
+        """callProject targets that are not in the corpus."""
+        return {target for targets in self.calls.values() for target in targets if target not in self.projects}
+
+    def unknown_resources(self):
+        """resourceIds referenced by projects without a matching resource XML in the corpus."""
+        return {rid for rid in self.resource_users if rid not in self.resources}
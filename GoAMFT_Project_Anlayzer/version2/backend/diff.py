@@ -0,0 +1,85 @@
+# backend/diff.py
+"""
+Structural diff between two versions of a project (parse_project_xml output).
+Modules are matched by name; inside a module actions are aligned by
+(action, label) in order, so an inserted step does not mark every later
+step as changed, and matched actions are compared on their details.
+"""
+
+from difflib import SequenceMatcher
+
+from backend.parser import group_by_module
+
+
+def _key(action):
+    return action["Action"], action["Label"]
+
+
+def _diff_module(old, new):
+    changes = []
+    matcher = SequenceMatcher(a=[_key(a) for a in old], b=[_key(a) for a in new], autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            for i, j in zip(range(i1, i2), range(j1, j2)):
+                if old[i]["Details"] != new[j]["Details"]:
+                    changes.append({"change": "modified", "old_position": i + 1, "position": j + 1,
+                                    "action": new[j]["Action"], "label": new[j]["Label"],
+                                    "details": _changed_details(old[i]["Details"], new[j]["Details"])})
+            continue
+        if op in ("replace", "delete"):
+            for i in range(i1, i2):
+                changes.append({"change": "removed", "old_position": i + 1, "position": None,
+                                "action": old[i]["Action"], "label": old[i]["Label"]})
+        if op in ("replace", "insert"):
+            for j in range(j1, j2):
+                changes.append({"change": "added", "old_position": None, "position": j + 1,
+                                "action": new[j]["Action"], "label": new[j]["Label"]})
+    return changes
+
+
+def _changed_details(old, new):
+    return {name: (old.get(name), new.get(name))
+            for name in sorted(set(old) | set(new)) if old.get(name) != new.get(name)}
+
+
+def diff_actions(old_actions, new_actions):
+    """
+    Returns {module: {"status": added|removed|changed|unchanged, "changes": [...]}}
+    in the order of the new version (removed modules last).
+    """
+    old_modules = dict(group_by_module(old_actions))
+    new_modules = group_by_module(new_actions)
+    result = {}
+    for name, actions in new_modules:
+        if name not in old_modules:
+            result[name] = {"status": "added", "changes": []}
+            continue
+        changes = _diff_module(old_modules[name], actions)
+        result[name] = {"status": "changed" if changes else "unchanged", "changes": changes}
+    for name in old_modules:
+        if name not in result:
+            result[name] = {"status": "removed", "changes": []}
+    return result
+
+
+def changed_modules(diff):
+    return [name for name, info in diff.items() if info["status"] in ("added", "changed")]
+
+
+def format_diff_report(diff):
+    """Markdown report of what changed between the two versions."""
+    lines = []
+    for name, info in diff.items():
+        if info["status"] == "unchanged":
+            continue
+        lines.append(f"- **{name}**: {info['status']}")
+        for change in info["changes"]:
+            where = change["position"] or change["old_position"]
+            line = f"  - step {where} {change['change']}: {change['action']} ({change['label']})"
+            if change.get("details"):
+                line += "; " + ", ".join(f"{k}: {old!r} → {new!r}" for k, (old, new) in change["details"].items())
+            lines.append(line)
+    unchanged = [name for name, info in diff.items() if info["status"] == "unchanged"]
+    if unchanged:
+        lines.append(f"- unchanged: {', '.join(unchanged)}")
+    return "\n".join(lines) if lines else "No changes."
@@ -1,32 +1,202 @@
 from fpdf import FPDF
-import tempfile
 import os
-import textwrap
+import pickle
+import re
+import sys
+import time
 
-def generate_pdf(summary_text):
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=10)
-    pdf.add_page()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.metrics import get_metrics
+
+FONT_DIR = os.path.dirname(__file__)
+FONT_PATH = os.path.join(FONT_DIR, "DejaVuSans.ttf")
+FONT_METRICS_PATH = os.path.join(FONT_DIR, "DejaVuSans.pkl")
+FONT_FAMILY = "dejavu"
+
+FONT_SIZE = 10
+LINE_HEIGHT = 8
+TABLE_FONT_SIZE = 8
+TABLE_LINE_HEIGHT = 4.5
+MIN_COLUMN_WIDTH = 12
+
+_TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$")
+_font_metrics = None
+
+
+def _load_font_metrics():
+    """
+    Parsed DejaVuSans metrics, loaded once per process from DejaVuSans.pkl
+    (FPDF's own metrics cache) instead of re-reading the TTF on every export.
+    The ttffile stored in the pickle is rebased onto this folder.
+    """
+    global _font_metrics
+    if _font_metrics is None:
+        if os.path.exists(FONT_METRICS_PATH):
+            with open(FONT_METRICS_PATH, "rb") as f:
+                metrics = pickle.load(f)
+        else:
+            # No cache yet: let FPDF parse the TTF once and write DejaVuSans.pkl
+            probe = FPDF()
+            probe.add_font("DejaVu", "", FONT_PATH, uni=True)
+            metrics = dict(probe.fonts[FONT_FAMILY], originalsize=os.path.getsize(FONT_PATH))
+        metrics["ttffile"] = FONT_PATH
+        _font_metrics = metrics
+    return _font_metrics
+
+
+def _register_font(pdf):
+    """Same registration FPDF.add_font(uni=True) does, from the in-memory metrics."""
+    metrics = _load_font_metrics()
+    pdf.fonts[FONT_FAMILY] = {
+        "i": len(pdf.fonts) + 1, "type": metrics["type"],
+        "name": metrics["name"], "desc": metrics["desc"],
+        "up": metrics["up"], "ut": metrics["ut"],
+        "cw": metrics["cw"],
+        "ttffile": FONT_PATH, "fontkey": FONT_FAMILY,
+        "subset": list(range(0, 32)),
+        # cw127.pkl next to the metrics cache holds the precomputed width ranges for chars < 128
+        "unifilename": FONT_METRICS_PATH,
+    }
+    pdf.font_files[FONT_FAMILY] = {"length1": metrics["originalsize"], "type": "TTF", "ttffile": FONT_PATH}
+    pdf.font_files[FONT_PATH] = {"type": "TTF"}
+
+
+def _split_row(line):
+    """Cells of a markdown table row; escaped pipes (\\|) stay inside the cell."""
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in re.split(r"(?<!\\)\|", line)]
 
-    # Load Unicode font
-    font_path = os.path.join(os.path.dirname(__file__), "DejaVuSans.ttf")
-    pdf.add_font("DejaVu", "", font_path, uni=True)
-    pdf.set_font("DejaVu", size=10)
 
-    pdf.set_left_margin(10)
-    pdf.set_right_margin(10)
+class PdfBuilder:
+    """
+    Lays out summary text as it arrives. feed() takes raw chunks (e.g. LLM
+    stream deltas) and renders every completed line straight away; markdown
+    tables are collected until they end and drawn as real tables. Layout
+    time across all feed() calls is recorded as pdf.render at finish().
+    """
 
-    max_chars_per_line = 100  # Adjust as needed for your font size and page width
+    def __init__(self):
+        start = time.perf_counter()
+        self.pdf = FPDF()
+        self.pdf.set_auto_page_break(auto=True, margin=10)
+        self.pdf.set_left_margin(10)
+        self.pdf.set_right_margin(10)
+        self.pdf.add_page()
+        _register_font(self.pdf)
+        self.pdf.set_font("DejaVu", size=FONT_SIZE)
+        self._pending = ""
+        self._table = []
+        self._header = None
+        self._busy = time.perf_counter() - start
 
-    for line in summary_text.split('\n'):
-        # Break long words manually if needed
-        safe_line = ' '.join(textwrap.wrap(line, width=max_chars_per_line, break_long_words=True, break_on_hyphens=False))
+    def _write_line(self, line):
         try:
-            pdf.multi_cell(0, 8, safe_line)
+            self.pdf.multi_cell(0, LINE_HEIGHT, line)
         except RuntimeError:
-            pdf.multi_cell(0, 8, "[Rendering error]")
+            self.pdf.multi_cell(0, LINE_HEIGHT, "[Rendering error]")
+
+    def _column_widths(self, rows):
+        """Every column gets room for the longest word of its header, the rest is shared by content width."""
+        pdf = self.pdf
+        available = pdf.w - pdf.l_margin - pdf.r_margin
+        columns = max(len(row) for row in rows)
+        padding = 2 * pdf.c_margin
+        floor = [MIN_COLUMN_WIDTH] * columns
+        for i, cell in enumerate(rows[0]):
+            floor[i] = max([floor[i]] + [pdf.get_string_width(word) + padding for word in cell.split()])
+        natural = list(floor)
+        for row in rows:
+            for i, cell in enumerate(row[:columns]):
+                natural[i] = max(natural[i], min(pdf.get_string_width(cell) + padding, available / 2))
+        if sum(natural) <= available or sum(floor) >= available:
+            base = natural if sum(natural) <= available else floor
+            return [w * available / sum(base) for w in base]
+        extra = available - sum(floor)
+        wanted = sum(natural) - sum(floor)
+        return [f + extra * (n - f) / wanted for f, n in zip(floor, natural)]
+
+    def _draw_row(self, row, widths, header=False):
+        pdf = self.pdf
+        row = row + [""] * (len(widths) - len(row))
+        lines = [pdf.multi_cell(w, TABLE_LINE_HEIGHT, cell, align="L", split_only=True) or [""]
+                 for w, cell in zip(widths, row)]
+        height = TABLE_LINE_HEIGHT * max(len(cell_lines) for cell_lines in lines)
+        if pdf.y + height > pdf.page_break_trigger:
+            pdf.add_page()
+            if not header and self._header:
+                self._draw_row(self._header, widths, header=True)
+        x, y = pdf.l_margin, pdf.y
+        for w, cell in zip(widths, row):
+            pdf.rect(x, y, w, height, "DF" if header else "D")
+            pdf.set_xy(x, y)
+            pdf.multi_cell(w, TABLE_LINE_HEIGHT, cell, align="L")
+            x += w
+        pdf.set_xy(pdf.l_margin, y + height)
+
+    def _flush_table(self):
+        rows, self._table = self._table, []
+        if len(rows) < 2 or not _TABLE_SEPARATOR.match(rows[1]):
+            for line in rows:
+                self._write_line(line)
+            return
+
+        cells = [_split_row(rows[0])] + [_split_row(line) for line in rows[2:]]
+        pdf = self.pdf
+        pdf.set_font("DejaVu", size=TABLE_FONT_SIZE)
+        pdf.set_fill_color(230, 230, 230)
+        widths = self._column_widths(cells)
+        self._header = cells[0]
+        self._draw_row(cells[0], widths, header=True)
+        for row in cells[1:]:
+            self._draw_row(row, widths)
+        self._header = None
+        pdf.set_font("DejaVu", size=FONT_SIZE)
+        pdf.ln(2)
+
+    def _add_line(self, line):
+        if line.lstrip().startswith("|"):
+            self._table.append(line)
+            return
+        if self._table:
+            self._flush_table()
+        self._write_line(line)
+
+    def feed(self, chunk):
+        start = time.perf_counter()
+        self._pending += chunk
+        *lines, self._pending = self._pending.split('\n')
+        for line in lines:
+            self._add_line(line)
+        self._busy += time.perf_counter() - start
+
+    def finish(self):
+        """Render what is left and return the PDF as bytes (nothing is written to disk)."""
+        start = time.perf_counter()
+        if self._pending:
+            self._add_line(self._pending)
+            self._pending = ""
+        if self._table:
+            self._flush_table()
+        data = self.pdf.output(dest="S").encode("latin1")
+        get_metrics().record("pdf.render", self._busy + time.perf_counter() - start,
+                             bytes=len(data), items=self.pdf.page_no())
+        return data
+
+
+def generate_pdf(summary_text):
+    """summary_text may be a full string or an iterable of text chunks. Returns PDF bytes."""
+    builder = PdfBuilder()
+    if isinstance(summary_text, str):
+        summary_text = [summary_text]
+    for chunk in summary_text:
+        builder.feed(chunk)
+    return builder.finish()
 
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-    pdf.output(temp_file.name)
-    return temp_file.name
 
+def render_summary_pdf(doc):
+    """PDF renderer for common.exports (takes an ExportDocument)."""
+    return generate_pdf(doc.text)
@@ -1,24 +1,104 @@
 # backend/parser.py
+import io
+import os
+import sys
 import xml.etree.ElementTree as ET
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.metrics import get_metrics
+
+
+def _action_from_element(mod_name, elem):
+    return {
+        "Module": mod_name,
+        "Action": elem.tag.lower(),
+        "Label": elem.get("label", "No Label"),
+        "Details": {k: v for k, v in elem.attrib.items()}
+    }
+
+
 def parse_project_xml(xml_content):
     try:
-        tree = ET.ElementTree(ET.fromstring(xml_content))
-        root = tree.getroot()
-        actions = []
-        for module in root.findall("module"):
-            mod_name = module.get("name", "Unnamed")
-            for elem in module:
-                tag = elem.tag.lower()
-                label = elem.get("label", "No Label")
-                details = {k: v for k, v in elem.attrib.items()}
-                actions.append({
-                    "Module": mod_name,
-                    "Action": tag,
-                    "Label": label,
-                    "Details": details
-                })
+        with get_metrics().span("xml.parse", bytes=len(xml_content)) as span:
+            tree = ET.ElementTree(ET.fromstring(xml_content))
+            root = tree.getroot()
+            actions = []
+            for module in root.findall("module"):
+                mod_name = module.get("name", "Unnamed")
+                for elem in module:
+                    actions.append(_action_from_element(mod_name, elem))
+            span["items"] = len(actions)
         return actions
     except ET.ParseError as e:
         raise ValueError(f"Invalid XML format: {e}")
 
+
+def _as_stream(source):
+    if isinstance(source, str):
+        return io.BytesIO(source.encode("utf-8"))
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def _source_size(source):
+    if isinstance(source, (str, bytes, bytearray, memoryview)):
+        return len(source)
+    return getattr(source, "size", None)
+
+
+def iter_project_modules(source):
+    """
+    Incrementally parse a project XML (bytes, str or binary file object) and
+    yield (module_name, actions) as soon as each <module> closes.
+    Finished elements are cleared so memory stays flat on large exports.
+    Only the parsing time is recorded (xml.parse, items = modules).
+    """
+    return get_metrics().timed_iter("xml.parse", _iter_modules(source), fields={"bytes": _source_size(source)})
+
+
+def _iter_modules(source):
+    depth = 0
+    root = None
+    module = None
+    mod_name = None
+    actions = []
+    try:
+        for event, elem in ET.iterparse(_as_stream(source), events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    root = elem
+                elif depth == 2 and elem.tag == "module":
+                    module = elem
+                    mod_name = elem.get("name", "Unnamed")
+                    actions = []
+                continue
+
+            depth -= 1
+            if module is None:
+                continue
+            if depth == 2:
+                # Direct child of <module>: same shape as parse_project_xml
+                actions.append(_action_from_element(mod_name, elem))
+                elem.clear()
+            elif depth == 1 and elem is module:
+                yield mod_name, actions
+                module = None
+                root.clear()
+    except ET.ParseError as e:
+        raise ValueError(f"Invalid XML format: {e}")
+
+
+def iter_project_actions(source):
+    """Yield actions one by one, module by module, using iter_project_modules."""
+    for _, actions in iter_project_modules(source):
+        yield from actions
+
+
+def group_by_module(actions):
+    """Split a flat action list into [(module, actions)] keeping project order."""
+    modules = {}
+    for action in actions:
+        modules.setdefault(action["Module"], []).append(action)
+    return list(modules.items())
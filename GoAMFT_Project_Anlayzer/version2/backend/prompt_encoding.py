@@ -0,0 +1,97 @@
+# backend/prompt_encoding.py
+import os
+import re
+from collections import Counter
+
+# Attribute values that only restate GoAnywhere defaults and carry no meaning for a summary.
+# Tasks default to version="1.0"; any other version (e.g. setVariable 2.0) is kept
+DEFAULT_ATTRIBUTES = {
+    "version": {"1.0"},
+    "disabled": {"false"},
+}
+# Values at least this long that occur more than once go into the dictionary
+MIN_ALIAS_LENGTH = 6
+
+INPUT_COST_PER_1K_TOKENS = float(os.getenv("INPUT_COST_PER_1K_TOKENS", "0.002"))
+
+ENCODING_LEGEND = (
+    "Actions are listed per module as tab-separated rows: step, action, label, attributes (name=value; ...). "
+    "Values written as @N refer to the dictionary at the top."
+)
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]{1,8}|\d{1,3}|[^\sA-Za-z\d]|\s+")
+
+
+def _details(action):
+    for name, value in action["Details"].items():
+        if name == "label" or value in DEFAULT_ATTRIBUTES.get(name, ()):
+            continue
+        yield name, value
+
+
+def _clean(value):
+    return value.replace("\t", " ").replace("\n", " ")
+
+
+def encode_actions(actions):
+    """
+    Compact, token-efficient text form of the parsed action list for prompts.
+    Repeated long values (resourceIds, paths, variables) are written once in a
+    dictionary and referenced as @N; default attributes are dropped.
+    """
+    counts = Counter(value for action in actions for _, value in _details(action))
+    aliases = {}
+    for value, count in counts.most_common():
+        if count > 1 and len(value) >= MIN_ALIAS_LENGTH:
+            aliases[value] = f"@{len(aliases) + 1}"
+
+    lines = []
+    if aliases:
+        lines.append("[dictionary]")
+        lines.extend(f"{alias}={_clean(value)}" for value, alias in aliases.items())
+
+    module = None
+    step = 0
+    for action in actions:
+        if action["Module"] != module:
+            module = action["Module"]
+            step = 0
+            lines.append(f"[module {module}]")
+        step += 1
+        label = "" if action["Label"] == "No Label" else _clean(action["Label"])
+        details = "; ".join(f"{name}={aliases.get(value) or _clean(value)}" for name, value in _details(action))
+        lines.append(f"{step}\t{action['Action']}\t{label}\t{details}")
+    return "\n".join(lines)
+
+
+def estimate_tokens(text):
+    """
+    Local approximation of a BPE token count, no tokenizer download needed:
+    short letter runs, digit groups, punctuation and whitespace runs each
+    count as one token. Good enough for relative savings and cost display.
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def prompt_savings(actions, cost_per_1k=INPUT_COST_PER_1K_TOKENS):
+    """Compare the old repr() prompt payload with encode_actions() for one project."""
+    return _savings(estimate_tokens(str(actions)), estimate_tokens(encode_actions(actions)), cost_per_1k)
+
+
+def add_savings(total, savings, cost_per_1k=INPUT_COST_PER_1K_TOKENS):
+    """Sum of two prompt_savings() results (total may be None), e.g. one per module prompt."""
+    if total is None:
+        return savings
+    return _savings(total["raw_tokens"] + savings["raw_tokens"],
+                    total["compact_tokens"] + savings["compact_tokens"], cost_per_1k)
+
+
+def _savings(raw_tokens, compact_tokens, cost_per_1k):
+    saved = raw_tokens - compact_tokens
+    return {
+        "raw_tokens": raw_tokens,
+        "compact_tokens": compact_tokens,
+        "saved_tokens": saved,
+        "saved_percent": 100.0 * saved / raw_tokens if raw_tokens else 0.0,
+        "saved_cost": saved / 1000 * cost_per_1k,
+    }
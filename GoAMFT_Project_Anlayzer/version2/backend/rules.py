@@ -0,0 +1,142 @@
+# backend/rules.py
+"""
+Deterministic renderer for the sequence table of well-known GoAnywhere
+action patterns (SFTP list/get/put/delete/move, workspaces, file lists,
+callProject, ...). Works on the typed tree from backend.action_tree so
+nested filesets and filters are available. Actions without a rule are
+returned separately so only those need to go to the LLM.
+"""
+
+REMOTE_PROTOCOLS = {"sftp": "SFTP", "ftp": "FTP", "ftps": "FTPS"}
+LOCAL = "Local/Workspace"
+
+TABLE_COLUMNS = ["Step", "Action", "Label", "Source Type/Protocol", "Source Path",
+                 "Target Type/Protocol", "Target Path", "File Pattern", "Condition"]
+
+
+def _fileset(node):
+    """(dir, pattern) of the first fileset under node; patterns of all include filters joined."""
+    for child in node.iter():
+        if child.tag == "fileset":
+            patterns = [inc.get("pattern") for inc in child.iter() if inc.tag == "include" and inc.get("pattern")]
+            return child.get("dir", ""), ", ".join(patterns)
+    return "", ""
+
+
+def _files(node, variable_attr):
+    """Files an operation works on: the files variable if set, otherwise the fileset directory."""
+    directory, pattern = _fileset(node)
+    return node.get(variable_attr) or directory, pattern
+
+
+def _remote(action, operation):
+    protocol = REMOTE_PROTOCOLS[action.tag.lower()]
+    server = f"{protocol} ({action.get('resourceId', '?')})"
+    op = operation.tag
+    if op == "list":
+        path, pattern = _fileset(operation)
+        return f"{action.tag} list", server, path, "Variable", operation.get("fileListVariable", ""), pattern
+    if op == "get":
+        path, pattern = _files(operation, "sourceFilesVariable")
+        return f"{action.tag} get", server, path, LOCAL, operation.get("destinationDir", ""), pattern
+    if op == "put":
+        path, pattern = _files(operation, "sourceFilesVariable")
+        return f"{action.tag} put", LOCAL, path, server, operation.get("destinationDir", ""), pattern
+    if op in ("move", "copy"):
+        path, pattern = _files(operation, "sourceFilesVariable")
+        return f"{action.tag} {op}", server, path, server, operation.get("destinationDir", ""), pattern
+    if op == "delete":
+        path, pattern = _files(operation, "inputFilesVariable")
+        return f"{action.tag} delete", server, path, "", "", pattern
+    if op in ("mkdir", "rmdir"):
+        return f"{action.tag} {op}", "", "", server, operation.get("dir", ""), ""
+    return None
+
+
+def _rule_remote(action):
+    rows = []
+    for operation in action.children:
+        row = _remote(action, operation)
+        if row is None:
+            return None
+        rows.append(row)
+    return rows or None
+
+
+def _rule_local_files(action):
+    if action.tag == "createFileList":
+        path, pattern = _fileset(action)
+        return [("createFileList", LOCAL, path, "Variable", action.get("fileListVariable", ""), pattern)]
+    if action.tag == "delete":
+        path, pattern = _files(action, "inputFilesVariable")
+        return [("delete", LOCAL, path, "", "", pattern)]
+    path, pattern = _files(action, "sourceFilesVariable")
+    return [(action.tag, LOCAL, path, LOCAL, action.get("destinationDir", ""), pattern)]
+
+
+def _rule_call_project(action):
+    return [("callProject", "", "", "Project", action.get("project", ""), "")]
+
+
+def _rule_set_variable(action):
+    return [("setVariable", "", action.get("value", ""), "Variable", action.get("name", ""), "")]
+
+
+def _rule_print(action):
+    target = action.get("file")
+    return [("print", "", "", "File" if target else "Job log", target or "", "")]
+
+
+def _rule_plain(action):
+    return [(action.tag, "", "", "", "", "")]
+
+
+RULES = {
+    "sftp": _rule_remote,
+    "ftp": _rule_remote,
+    "ftps": _rule_remote,
+    "createFileList": _rule_local_files,
+    "delete": _rule_local_files,
+    "copy": _rule_local_files,
+    "move": _rule_local_files,
+    "callProject": _rule_call_project,
+    "setVariable": _rule_set_variable,
+    "print": _rule_print,
+    "createWorkspace": _rule_plain,
+    "deleteWorkspace": _rule_plain,
+    "exitProject": _rule_plain,
+    "raiseError": _rule_plain,
+}
+
+
+def _cell(value):
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def render_sequence_table(project):
+    """
+    Render the sequence table for a backend.action_tree.Project as markdown,
+    one table per module. Returns (markdown, unrecognized_actions).
+    """
+    sections = []
+    unrecognized = []
+    for module in project.modules:
+        lines = [f"#### Module: {module.name}", "",
+                 "| " + " | ".join(TABLE_COLUMNS) + " |",
+                 "|" + "---|" * len(TABLE_COLUMNS)]
+        step = 0
+        for action in module.actions:
+            if action.get("disabled") == "true":
+                continue
+            rule = RULES.get(action.tag)
+            rows = rule(action) if rule else None
+            if rows is None:
+                unrecognized.append(action)
+                rows = [(action.tag, "?", "", "?", "", "")]
+            for name, src_type, src_path, tgt_type, tgt_path, pattern in rows:
+                step += 1
+                cells = [step, name, action.label if action.label != "No Label" else "",
+                         src_type, src_path, tgt_type, tgt_path, pattern, action.guard or ""]
+                lines.append("| " + " | ".join(_cell(c) for c in cells) + " |")
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections), unrecognized
@@ -1,10 +1,24 @@
 # backend/summarizer.py
+import asyncio
 import os
-from openai import AzureOpenAI
+import sys
+from openai import AzureOpenAI, AsyncAzureOpenAI
+
+from backend.cache import SummaryCache, cache_key
+from backend.diff import changed_modules, diff_actions
+from backend.parser import group_by_module, iter_project_modules
+from backend.prompt_encoding import ENCODING_LEGEND, encode_actions
+from backend.rules import render_sequence_table
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.metrics import get_metrics, usage_fields
+from common.singleflight import get_flight, request_key
 
 endpoint = os.getenv("ENDPOINT_URL", "https://pradeepazopenai.openai.azure.com/")
 deployment = os.getenv("DEPLOYMENT_NAME", "gpt-4.1")
+merge_deployment = os.getenv("MERGE_DEPLOYMENT_NAME", deployment)
 subscription_key = os.getenv("AZURE_OPENAI_API_KEY", "4ChnscFbQsgE6OpHkq7ADOnQiljXPiwPzhH7l3gcmiNdin09YEQFJQQJ99BHAC77bzfXJ3w3AAABACOG4fSG")
+MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
 
 client = AzureOpenAI(
     azure_endpoint=endpoint,
@@ -12,19 +26,314 @@ client = AzureOpenAI(
     api_version="2025-01-01-preview",
 )
 
-def summarize_actions(actions):
-    prompt = f"""Summarize the following GoAnywhere project actions. Group by module, explain each action briefly in sequence of xml, and highlight key details like source/target paths, protocols (SFTP, Blob, MQ), file patterns, archive steps, deletions, and post-transfer actions. Format as readable text and include a table in such a way that this shows sequence of action with source type/protocol/path details ,target type/protocol/path details , file pattern so that it may use it to understand clearly or to use to develop in any other tool from scratch. Module is not needed in table :
+
+# Bump PROMPT_VERSION whenever the templates or request parameters change so cached summaries are not reused
+PROMPT_VERSION = "2"
+PROMPT_TEMPLATE = """Summarize the following GoAnywhere project actions. Group by module, explain each action briefly in sequence of xml, and highlight key details like source/target paths, protocols (SFTP, Blob, MQ), file patterns, archive steps, deletions, and post-transfer actions. Format as readable text and include a table in such a way that this shows sequence of action with source type/protocol/path details ,target type/protocol/path details , file pattern so that it may use it to understand clearly or to use to develop in any other tool from scratch. Module is not needed in table :
+
+{legend}
+
+{actions}
+"""
+
+MODULE_PROMPT_TEMPLATE = """Summarize the following actions of the GoAnywhere project module "{module}". Explain each action briefly in sequence of xml, and highlight key details like source/target paths, protocols (SFTP, Blob, MQ), file patterns, archive steps, deletions, and post-transfer actions. End with a numbered list of the steps, one line each, with source type/protocol/path, target type/protocol/path and file pattern where they apply :
+
+{legend}
+
+{actions}
+"""
+
+MERGE_PROMPT_TEMPLATE = """Below are summaries of each module of one GoAnywhere project, in project order. Combine them into one readable summary grouped by module, keeping the details, and include a table in such a way that this shows sequence of action with source type/protocol/path details ,target type/protocol/path details , file pattern so that it may use it to understand clearly or to use to develop in any other tool from scratch. Module is not needed in table :
+
+{summaries}
+"""
+
+NARRATIVE_PROMPT_TEMPLATE = """Summarize the following GoAnywhere project actions as readable text. Group by module, explain each action briefly in sequence of xml, and highlight key details like source/target paths, protocols (SFTP, Blob, MQ), file patterns, archive steps, deletions, and post-transfer actions. Do not include a table, the sequence table is generated separately.{unrecognized}
+
+{legend}
 
 {actions}
 """
-    response = client.chat.completions.create(
+
+UNRECOGNIZED_PROMPT = """ Explain in more detail the following actions, which the sequence table could not describe :
+{actions}"""
+
+_cache = None
+# Sessions asking for the same summary at the same time share one completion
+_flight = get_flight("summarize")
+metrics = get_metrics()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = SummaryCache()
+    return _cache
+
+
+def _chat_kwargs(prompt, model=None, max_tokens=13107):
+    return dict(
         messages=[{"role": "user", "content": prompt}],
-        max_completion_tokens=13107,
+        max_completion_tokens=max_tokens,
         temperature=1.0,
         top_p=1.0,
         frequency_penalty=0.0,
         presence_penalty=0.0,
-        model=deployment,
+        model=model or deployment,
     )
+
+
+def _build_prompt(template, actions=None, **fields):
+    """template filled with fields (and the encoded actions, if given), timed as prompt.build."""
+    with metrics.span("prompt.build") as span:
+        if actions is not None:
+            fields.update(legend=ENCODING_LEGEND, actions=encode_actions(actions))
+            span["items"] = len(actions)
+        prompt = template.format(**fields)
+        span["bytes"] = len(prompt)
+    return prompt
+
+
+def _count_cache(cached):
+    metrics.count("summary.cache", "miss" if cached is None else "hit")
+
+
+def _complete(key, request, use_cache=True, stream=False):
+    """Run one chat completion through the summary cache; with stream=True return a generator of deltas."""
+    cached = get_cache().get(key) if use_cache else None
+    if use_cache:
+        _count_cache(cached)
+    if stream:
+        return _stream_completion(key, request, use_cache, cached)
+    if cached is not None:
+        return cached
+
+    summary = _flight.do(request_key(request), _create_completion, request)
+    if use_cache and summary:
+        get_cache().set(key, summary)
+    return summary
+
+
+def _create_completion(request):
+    with metrics.span("llm.completion") as span:
+        response = client.chat.completions.create(**request)
+        span.update(usage_fields(getattr(response, "usage", None)))
     return response.choices[0].message.content
 
+
+def _open_stream(request):
+    # Opened on first iteration, so the request itself counts towards llm.first_token
+    yield from client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **request)
+
+
+def _completion_deltas(request):
+    usage = {}
+    # The wait for the first chunk (Azure queueing + prompt processing) and the rest (generation) are timed apart
+    chunks = metrics.timed_iter("llm.generation", _open_stream(request), first_stage="llm.first_token", fields=usage)
+    for chunk in chunks:
+        if getattr(chunk, "usage", None):
+            usage.update(usage_fields(chunk.usage))
+        # Azure sends content-filter chunks (and the usage chunk) with no choices; skip them
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def _stream_completion(key, request, use_cache, cached):
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    for delta in _flight.stream(request_key(request, "stream"), _completion_deltas, request):
+        parts.append(delta)
+        yield delta
+    summary = "".join(parts)
+    if use_cache and summary:
+        get_cache().set(key, summary)
+
+
+def summarize_actions(actions, use_cache=True, stream=False):
+    """Return the summary text, or with stream=True a generator yielding it in chunks."""
+    key = cache_key(actions, PROMPT_VERSION, PROMPT_TEMPLATE, deployment)
+    prompt = _build_prompt(PROMPT_TEMPLATE, actions)
+    return _complete(key, _chat_kwargs(prompt), use_cache, stream)
+
+
+def _module_key(mod_name, mod_actions):
+    return cache_key(mod_name, mod_actions, PROMPT_VERSION, MODULE_PROMPT_TEMPLATE, deployment)
+
+
+async def _summarize_module(async_client, mod_name, mod_actions, semaphore, use_cache):
+    key = _module_key(mod_name, mod_actions)
+    if use_cache:
+        cached = get_cache().get(key)
+        _count_cache(cached)
+        if cached is not None:
+            return cached
+
+    prompt = _build_prompt(MODULE_PROMPT_TEMPLATE, mod_actions, module=mod_name)
+    async with semaphore:
+        with metrics.span("llm.completion", module=mod_name) as span:
+            response = await async_client.chat.completions.create(**_chat_kwargs(prompt))
+            span.update(usage_fields(getattr(response, "usage", None)))
+    summary = response.choices[0].message.content
+    if use_cache and summary:
+        get_cache().set(key, summary)
+    return summary
+
+
+async def _map_modules(modules, max_concurrency, use_cache):
+    """
+    Start one request per module as soon as modules yields it. modules may be
+    a lazy iterator (e.g. iter_project_modules); it is advanced in a worker
+    thread so requests for earlier modules run while later ones are parsed.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    loop = asyncio.get_running_loop()
+    iterator = iter(modules)
+    names, tasks = [], []
+    # One client per asyncio.run(): its connection pool is bound to the event loop that opened it
+    async with AsyncAzureOpenAI(azure_endpoint=endpoint, api_key=subscription_key,
+                                api_version="2025-01-01-preview") as async_client:
+        try:
+            while (item := await loop.run_in_executor(None, next, iterator, None)) is not None:
+                name, mod_actions = item
+                names.append(name)
+                tasks.append(asyncio.create_task(
+                    _summarize_module(async_client, name, mod_actions, semaphore, use_cache)))
+            summaries = await asyncio.gather(*tasks)
+        except BaseException:
+            # A parse error (or a failed request) drops the requests still in flight before the client closes
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    return list(zip(names, summaries))
+
+
+def _summarize_module_list(modules, max_concurrency, use_cache):
+    return asyncio.run(_map_modules(modules, max_concurrency, use_cache)) if modules else []
+
+
+def summarize_modules(actions, max_concurrency=MAP_CONCURRENCY, use_cache=True):
+    """Map step: one summary per module, requested concurrently. Returns [(module, summary)]."""
+    return _summarize_module_list(group_by_module(actions), max_concurrency, use_cache)
+
+
+def merge_module_summaries(module_summaries, use_cache=True, stream=False):
+    """Reduce step: a single merge call that builds the combined text and sequence table."""
+    summaries = "\n\n".join(f"### Module: {name}\n{summary}" for name, summary in module_summaries)
+    key = cache_key(summaries, PROMPT_VERSION, MERGE_PROMPT_TEMPLATE, merge_deployment)
+    prompt = _build_prompt(MERGE_PROMPT_TEMPLATE, summaries=summaries)
+    return _complete(key, _chat_kwargs(prompt, model=merge_deployment, max_tokens=8192), use_cache, stream)
+
+
+def summarize_actions_map_reduce(actions, max_concurrency=MAP_CONCURRENCY, use_cache=True, stream=False):
+    """
+    Summarize each module on its own (cached per module, so editing one module
+    only re-summarizes that module), then merge the results in one call.
+    With stream=True only the merge call is streamed.
+    """
+    module_summaries = summarize_modules(actions, max_concurrency, use_cache)
+    return merge_module_summaries(module_summaries, use_cache, stream)
+
+
+def summarize_xml_map_reduce(source, max_concurrency=MAP_CONCURRENCY, use_cache=True, stream=False):
+    """
+    Per-module summary straight from a project XML (bytes, str or binary file
+    object): each module is sent to the map step as soon as
+    iter_project_modules yields it, so summarizing overlaps with reading the
+    rest of the file and the full action list is never built.
+    """
+    module_summaries = asyncio.run(_map_modules(iter_project_modules(source), max_concurrency, use_cache))
+    return merge_module_summaries(module_summaries, use_cache, stream)
+
+
+def summarize_revision(old_actions, new_actions, diff=None, project=None, max_concurrency=MAP_CONCURRENCY,
+                       use_cache=True, fill_missing=True):
+    """
+    Re-summarize a new version of a project against the previous one.
+    Modules the diff marks as added or changed go to the LLM; unchanged
+    modules reuse their per-module summary from the cache. Those entries only
+    exist once a version was summarized per module (or revised before), so
+    by default unchanged modules without one are summarized too and cached
+    for the next revision; with fill_missing=False they are left out and
+    only listed. With project (a backend.action_tree.Project of the new
+    version) the locally rendered sequence table is appended.
+    Returns (summary, diff, uncached_modules).
+    """
+    if diff is None:
+        diff = diff_actions(old_actions, new_actions)
+    modules = group_by_module(new_actions)
+    changed = set(changed_modules(diff))
+    texts = {}
+    uncached = []
+    for name, mod_actions in modules:
+        if name in changed:
+            continue
+        cached = get_cache().get(_module_key(name, mod_actions)) if use_cache else None
+        if use_cache:
+            _count_cache(cached)
+        if cached is not None:
+            texts[name] = cached
+        else:
+            uncached.append(name)
+
+    to_summarize = [(name, mod_actions) for name, mod_actions in modules
+                    if name in changed or (fill_missing and name in uncached)]
+    texts.update(_summarize_module_list(to_summarize, max_concurrency, use_cache))
+
+    sections = []
+    if uncached and fill_missing:
+        sections.append(f"> {len(uncached)} unchanged module(s) had no cached summary and were summarized again: "
+                        f"{', '.join(uncached)}.")
+    elif uncached:
+        sections.append(f"> {len(uncached)} unchanged module(s) have no cached summary and were not re-summarized: "
+                        f"{', '.join(uncached)}. Summarize the previous version per module to fill them in.")
+    for name, _ in modules:
+        status = diff.get(name, {}).get("status", "unchanged")
+        text = texts.get(name, "_No cached summary._")
+        sections.append(f"### Module: {name} ({status})\n\n{text}")
+    removed = [name for name, info in diff.items() if info["status"] == "removed"]
+    if removed:
+        sections.append(f"### Removed modules\n\n{', '.join(removed)}")
+    if project is not None:
+        table, _ = render_sequence_table(project)
+        sections.append("### Sequence of Actions\n\n" + table)
+    return "\n\n".join(sections), diff, uncached
+
+
+def _outline(node, indent=""):
+    attrs = " ".join(f'{k}="{v}"' for k, v in zip(node.keys, node.values))
+    lines = [f"{indent}<{node.tag} {attrs}>".replace(" >", ">")]
+    for child in node.children:
+        lines.extend(_outline(child, indent + "  "))
+    return lines
+
+
+def _table_after(narrative, table):
+    yield from narrative
+    yield "\n\n### Sequence of Actions\n\n" + table
+
+
+def summarize_project(project, use_cache=True, stream=False, narrative=True):
+    """
+    Build the summary for a backend.action_tree.Project with the sequence table
+    rendered locally by backend.rules. The LLM is only called for the narrative
+    text (narrative=True) or when some actions have no rule.
+    """
+    table, unrecognized = render_sequence_table(project)
+    if not narrative and not unrecognized:
+        return iter([table]) if stream else table
+
+    actions = project.to_actions()
+    extra = ""
+    if unrecognized:
+        outlines = "\n".join(line for action in unrecognized for line in _outline(action))
+        extra = UNRECOGNIZED_PROMPT.format(actions=outlines)
+    key = cache_key(actions, extra, PROMPT_VERSION, NARRATIVE_PROMPT_TEMPLATE, deployment)
+    prompt = _build_prompt(NARRATIVE_PROMPT_TEMPLATE, actions, unrecognized=extra)
+    text = _complete(key, _chat_kwargs(prompt), use_cache, stream)
+    if stream:
+        return _table_after(text, table)
+    return text + "\n\n### Sequence of Actions\n\n" + table
@@ -0,0 +1,68 @@
+# bench_exporter.py
+"""
+Render-time benchmark for backend.exporter.generate_pdf.
+
+Usage:
+    python bench_exporter.py --pages 100 --runs 3
+"""
+
+import argparse
+import time
+
+from backend.exporter import generate_pdf
+
+PARAGRAPH = (
+    "The Main module connects to the source SFTP server, lists files matching the configured pattern "
+    "and exits when nothing is found. Files are downloaded into the job workspace, archived through "
+    "the Archive_Files project and uploaded to the target server before the workspace is removed."
+)
+TABLE_HEADER = ("| Step | Action | Source Type/Protocol | Source Path | Target Type/Protocol | Target Path | File Pattern |\n"
+                "|---|---|---|---|---|---|---|")
+TABLE_ROW = "| {n} | sftp get | SFTP (E91232) | /sourcepath/send/dataout/{n} | Local/Workspace | ${{system.job.workspace}} | *.csv |"
+
+
+def sample_report(sections):
+    """Markdown report of the usual summary shape: narrative paragraphs followed by a sequence table."""
+    parts = []
+    for section in range(sections):
+        parts.append(f"### Module: Module_{section}")
+        parts.extend([PARAGRAPH] * 4)
+        parts.append(TABLE_HEADER)
+        parts.extend(TABLE_ROW.format(n=n) for n in range(1, 16))
+        parts.append("")
+    return "\n".join(parts)
+
+
+def count_pages(pdf_bytes):
+    return pdf_bytes.count(b"/Type /Page\n")
+
+
+def report_for_pages(pages):
+    """sample_report sized to roughly pages pages."""
+    # One section is roughly a page and a half; calibrate on a small report first
+    probe_pages = count_pages(generate_pdf(sample_report(10)))
+    return sample_report(max(1, round(pages * 10 / probe_pages)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PDF export.")
+    parser.add_argument("--pages", type=int, default=100, help="Approximate report length in pages")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    text = report_for_pages(args.pages)
+
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        pdf_bytes = generate_pdf(text)
+        timings.append(time.perf_counter() - start)
+
+    pages = count_pages(pdf_bytes)
+    best = min(timings)
+    print(f"pages={pages} size={len(pdf_bytes) / 1024:.0f} KiB input={len(text) / 1024:.0f} KiB")
+    print(f"best={best:.3f}s mean={sum(timings) / len(timings):.3f}s per_page={best / pages * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# bench_suite.py
+"""
+Benchmark suite for the analyzer hot paths, on synthetic projects from
+generate_projects.py:
+
+    parse_project_xml     full parse of a project XML
+    iter_project_modules  streaming parse, module by module
+    encode_actions        prompt serialization of the parsed actions
+    parse_markdown_table  sequence table of one row per action
+    generate_pdf          PDF export of a summary report (bench_exporter.py)
+
+Usage:
+    python bench_suite.py                                     # 1k and 10k actions
+    python bench_suite.py --sizes 1000,10000,100000 --runs 10
+    python bench_suite.py --save-baseline                     # store the current numbers as the baseline
+    python bench_suite.py --only parse_project_xml,encode_actions
+
+Each case reports the best and mean wall time over --runs and the peak
+Python memory of one extra run under tracemalloc (timed runs are not
+traced). Results are written to --output as JSON. When --baseline exists,
+a case is flagged as a regression if its best time grows by more than
+--time-tolerance or its peak memory by more than --memory-tolerance, and
+the exit status is 1. Baselines only compare on the same machine.
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from backend.exporter import generate_pdf
+from backend.parser import iter_project_modules, parse_project_xml
+from backend.prompt_encoding import encode_actions
+from bench_exporter import TABLE_HEADER, TABLE_ROW, report_for_pages
+from generate_projects import project_bytes
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common.markdown_tables import parse_markdown_table
+
+CASES = ("parse_project_xml", "iter_project_modules", "encode_actions", "parse_markdown_table", "generate_pdf")
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def measure(fn, runs):
+    """{"best_s", "mean_s", "peak_mib"} for fn()."""
+    timings = []
+    for _ in range(runs):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"best_s": min(timings), "mean_s": sum(timings) / len(timings), "peak_mib": peak / 1024 / 1024}
+
+
+def consume(iterator):
+    for _ in iterator:
+        pass
+
+
+def sequence_table(rows):
+    return "\n".join([TABLE_HEADER] + [TABLE_ROW.format(n=n) for n in range(1, rows + 1)])
+
+
+def planned_cases(args):
+    """(case, size, unit, setup) for everything selected; setup() returns (fn, input_bytes)."""
+    selected = set(args.only.split(",")) if args.only else set(CASES)
+    unknown = selected - set(CASES)
+    if unknown:
+        raise SystemExit(f"Unknown case(s): {', '.join(sorted(unknown))}; choose from {', '.join(CASES)}")
+
+    def xml_case(name, size):
+        def setup():
+            data = project_bytes(actions=size, patterns=args.patterns)
+            if name == "parse_project_xml":
+                return (lambda: parse_project_xml(data)), len(data)
+            if name == "iter_project_modules":
+                return (lambda: consume(iter_project_modules(data))), len(data)
+            actions = parse_project_xml(data)
+            return (lambda: encode_actions(actions)), len(data)
+        return setup
+
+    def table_case(rows):
+        def setup():
+            text = sequence_table(rows)
+            return (lambda: parse_markdown_table(text)), len(text.encode("utf-8"))
+        return setup
+
+    def pdf_case(pages):
+        def setup():
+            text = report_for_pages(pages)
+            return (lambda: generate_pdf(text)), len(text.encode("utf-8"))
+        return setup
+
+    planned = []
+    for name in ("parse_project_xml", "iter_project_modules", "encode_actions"):
+        if name in selected:
+            planned.extend((name, size, "actions", xml_case(name, size)) for size in _int_list(args.sizes))
+    if "parse_markdown_table" in selected:
+        planned.extend(("parse_markdown_table", rows, "rows", table_case(rows)) for rows in _int_list(args.table_rows))
+    if "generate_pdf" in selected:
+        planned.extend(("generate_pdf", pages, "pages", pdf_case(pages)) for pages in _int_list(args.pdf_pages))
+    return planned
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    """Mark results against baseline results in place; returns the regression messages."""
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        if not before:
+            continue
+        result["baseline_best_s"] = before["best_s"]
+        result["baseline_peak_mib"] = before["peak_mib"]
+        result["time_change"] = result["best_s"] / before["best_s"] - 1 if before["best_s"] else 0.0
+        result["memory_change"] = result["peak_mib"] / before["peak_mib"] - 1 if before["peak_mib"] else 0.0
+        flags = []
+        if result["time_change"] > time_tolerance:
+            flags.append(f"time +{result['time_change']:.0%}")
+        if result["memory_change"] > memory_tolerance:
+            flags.append(f"memory +{result['memory_change']:.0%}")
+        result["regression"] = flags
+        if flags:
+            regressions.append(f"{key}: {', '.join(flags)}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark parsing, prompt encoding, table parsing and PDF export.")
+    parser.add_argument("--sizes", default="1000,10000", help="Project sizes in actions, comma separated")
+    parser.add_argument("--patterns", type=int, default=1, help="Include patterns per filter in generated projects")
+    parser.add_argument("--table-rows", default="1000,10000", help="Markdown table sizes in rows")
+    parser.add_argument("--pdf-pages", default="20", help="PDF report sizes in pages")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--only", default="", help=f"Comma separated subset of: {', '.join(CASES)}")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default="bench_baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to --baseline as well")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="Allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="Allowed peak memory growth")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, size, unit, setup in planned_cases(args):
+        fn, input_bytes = setup()
+        result = {"case": name, "size": size, "unit": unit, "input_bytes": input_bytes, "runs": args.runs,
+                  **measure(fn, args.runs)}
+        result["per_item_us"] = result["best_s"] / size * 1e6
+        key = f"{name}[{size} {unit}]"
+        results[key] = result
+        print(f"{key:<38} best={result['best_s'] * 1000:>10.1f} ms  mean={result['mean_s'] * 1000:>10.1f} ms  "
+              f"peak={result['peak_mib']:>8.1f} MiB  {result['per_item_us']:>8.2f} us/{unit[:-1]}", flush=True)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args.time_tolerance, args.memory_tolerance)
+
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "results": results,
+        "regressions": regressions,
+    }
+    paths = [args.output] + ([args.baseline] if args.save_baseline else [])
+    for path in paths:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(f"Results written to {', '.join(paths)}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {args.baseline}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+# generate_projects.py
+"""
+Synthetic GoAnywhere project XML generator, for benchmarks and load tests.
+
+Usage:
+    python generate_projects.py big_project.xml --actions 100000
+    python generate_projects.py big_project.xml --actions 100000 --patterns 100   # about 200 MB
+    python generate_projects.py corpus/ --projects 500 --actions 200              # input for analyze_corpus.py
+
+Projects follow the shape of the real exports: a Main module plus worker
+modules and a TransferFailure error handler, sftp list/get/put/delete
+tasks with nested filesets and wildcard/regex filters, workspaces, file
+lists, forEachLoop blocks, callProject/callModule and setVariable, with
+${...} references to variables defined earlier in the project. --actions
+counts direct children of modules, which is what parse_project_xml
+returns. --patterns sets the include patterns per filter and is the main
+knob for file size. Output is written incrementally, so size is not
+limited by memory, and the same --seed always gives the same bytes.
+"""
+
+import argparse
+import os
+import random
+import time
+from xml.sax.saxutils import escape
+
+RESOURCE_IDS = [f"{prefix}{n}" for prefix in ("E", "I") for n in range(91230, 91250)]
+EXTENSIONS = ("csv", "txt", "xml", "json", "dat", "zip", "pgp")
+TEMPLATE_PROJECTS = ("Archive_Files", "TransferSuccessData", "DataError", "Notify_Support", "Audit_Log")
+ERROR_MODULE = "TransferFailure"
+
+# Action kind -> relative frequency, roughly what the real exports contain
+ACTION_WEIGHTS = {
+    "sftp_list": 12, "sftp_get": 10, "sftp_put": 10, "sftp_delete": 5, "createWorkspace": 5,
+    "deleteWorkspace": 5, "createFileList": 8, "callProject": 8, "callModule": 4, "setVariable": 12,
+    "print": 6, "delete": 5, "exitProject": 4, "forEachLoop": 4, "zip": 2,
+}
+
+
+class _ProjectWriter:
+    """Emits one project as a sequence of XML text chunks."""
+
+    def __init__(self, rng, name, actions, modules, patterns):
+        self.rng = rng
+        self.name = name
+        self.patterns = patterns
+        self.file_lists = ["filelistonsrcserver"]
+        self.variables = ["sourceDir", "targetDir", "MFT_Logs"]
+        self.counts = ["filelistonsrcservernum"]
+        self.counter = 0
+        self.modules = ["Main"] + [f"Module_{i}" for i in range(1, modules)]
+        # Every worker module gets at least one action; Main takes the remainder
+        per_module = max(1, actions // modules)
+        self.sizes = [actions - per_module * (modules - 1)] + [per_module] * (modules - 1)
+        self.kinds = list(ACTION_WEIGHTS)
+        self.weights = list(ACTION_WEIGHTS.values())
+
+    def _next(self, prefix):
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def _var(self):
+        return self.rng.choice(self.variables)
+
+    def _file_list(self):
+        return self.rng.choice(self.file_lists)
+
+    def _new_file_list(self):
+        name = self._next("filelist")
+        self.file_lists.append(name)
+        return name
+
+    def _filter(self, indent):
+        kind = "wildcardFilter" if self.rng.random() < 0.7 else "regexFilter"
+        lines = [f"{indent}<{kind}>"]
+        for _ in range(self.patterns):
+            ext = self.rng.choice(EXTENSIONS)
+            if kind == "wildcardFilter":
+                pattern = f"*_{self.rng.randrange(1000):03d}.{ext}"
+                lines.append(f'{indent}\t<include pattern="{pattern}" />')
+            else:
+                pattern = f"^[A-Z]{{3}}_\\d{{8}}_{self.rng.randrange(1000):03d}\\.{ext}$"
+                lines.append(f'{indent}\t<include pattern="{pattern}" caseSensitive="true" />')
+        lines.append(f"{indent}</{kind}>")
+        return "\n".join(lines)
+
+    def _fileset(self, indent, directory):
+        return (f'{indent}<fileset dir="{directory}" recursive="{self.rng.choice(("false", "true"))}" '
+                f'includeItems="files">\n{self._filter(indent + chr(9))}\n{indent}</fileset>')
+
+    def _action(self, kind, module, indent="\t\t"):
+        rng = self.rng
+        resource = rng.choice(RESOURCE_IDS)
+        inner = indent + "\t"
+        if kind == "sftp_list":
+            listed, count = self._new_file_list(), self._next("numfiles")
+            self.counts.append(count)
+            return (f'{indent}<sftp label="SFTP connect to {resource}" resourceId="{resource}" version="1.0">\n'
+                    f'{inner}<list fileListVariable="{listed}" numFilesFoundVariable="{count}">\n'
+                    f"{self._fileset(inner + chr(9), '/sourcepath/send/dataout/' + resource)}\n"
+                    f"{inner}</list>\n{indent}</sftp>")
+        if kind == "sftp_get":
+            downloaded = self._new_file_list()
+            return (f'{indent}<sftp label="SFTP get from {resource}" resourceId="{resource}" version="1.0">\n'
+                    f'{inner}<get sourceFilesVariable="${{{self._file_list()}}}" destinationDir="${{system.job.workspace}}" '
+                    f'whenFileExists="overwrite" destinationFilesVariable="{downloaded}" />\n{indent}</sftp>')
+        if kind == "sftp_put":
+            uploaded = self._new_file_list()
+            return (f'{indent}<sftp label="SFTP to {resource}" resourceId="{resource}" keyLocation="KeyVault" version="1.0">\n'
+                    f'{inner}<put destinationDir="/targetpath/recieve/datain/{resource}" '
+                    f'destinationFilesVariable="{uploaded}">\n'
+                    f"{self._fileset(inner + chr(9), '${system.job.workspace}')}\n"
+                    f"{inner}</put>\n{indent}</sftp>")
+        if kind == "sftp_delete":
+            return (f'{indent}<sftp label="SFTP cleanup on {resource}" resourceId="{resource}" version="1.0">\n'
+                    f'{inner}<delete inputFilesVariable="${{{self._file_list()}}}" />\n{indent}</sftp>')
+        if kind == "createWorkspace":
+            return f'{indent}<createWorkspace label="Create workspace" version="1.0" />'
+        if kind == "deleteWorkspace":
+            return f'{indent}<deleteWorkspace version="1.0" />'
+        if kind == "createFileList":
+            listed = self._new_file_list()
+            return (f'{indent}<createFileList label="Create FileList from workspace" fileListVariable="{listed}" '
+                    f'version="1.0">\n{self._fileset(inner, "${system.job.workspace}")}\n{indent}</createFileList>')
+        if kind == "callProject":
+            target = rng.choice(TEMPLATE_PROJECTS)
+            return (f'{indent}<callProject label="Call {target} Project" project="/project-functions-templates/{target}" '
+                    f'runInSameJob="true" inheritUserVariables="true" returnUserVariables="true" mode="batch" version="1.0" />')
+        if kind == "callModule":
+            target = rng.choice(self.modules)
+            target = ERROR_MODULE if target == module else target
+            return f'{indent}<callModule label="Run {target}" module="{target}" version="1.0" />'
+        if kind == "setVariable":
+            name = self._next("var")
+            value = f"${{{self._var()}}}/{rng.choice(('archive', 'backup', 'inbound', 'outbound'))}"
+            self.variables.append(name)
+            return f'{indent}<setVariable label="Set {name}" name="{name}" value="{value}" version="2.0" />'
+        if kind == "print":
+            message = escape(f"Processed ${{{self._file_list()}}} <{module}> & done")
+            return (f'{indent}<print label="Print FileTrack" file="${{MFT_Logs}}/{self.name}.log" append="true" '
+                    f'version="1.0">\n{inner}<message>{message}</message>\n{indent}</print>')
+        if kind == "delete":
+            return (f'{indent}<delete label="Delete processed files" inputFilesVariable="${{{self._file_list()}}}" '
+                    f'version="1.0" />')
+        if kind == "exitProject":
+            return (f'{indent}<exitProject label="EXIT if No Files" version="1.0" '
+                    f'executeOnlyIf="${{ {self.rng.choice(self.counts)} eq 0 }}" />')
+        if kind == "forEachLoop":
+            item = self._next("currentfile")
+            body = "\n".join(self._action(rng.choice(("sftp_put", "delete", "print")), module, inner)
+                             for _ in range(rng.randint(1, 3)))
+            return (f'{indent}<forEachLoop label="For each file" itemsVariable="${{{self._file_list()}}}" '
+                    f'itemVariable="{item}" version="1.0">\n{body}\n{indent}</forEachLoop>')
+        if kind == "zip":
+            return (f'{indent}<zip label="Zip files" outputFile="${{system.job.workspace}}/{self._next("archive")}.zip" '
+                    f'version="1.0">\n{self._fileset(inner, "${system.job.workspace}")}\n{indent}</zip>')
+        raise ValueError(kind)
+
+    def chunks(self):
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield (f'<project name="{self.name}" mainModule="Main" version="2.0" logLevel="normal" threadSafe="true">\n'
+               f"\t<description>{self.name} (synthetic)\n</description>\n")
+        yield '\t<variable name="sourceDir" value="/sourcepath/send/dataout" />\n'
+        yield '\t<variable name="targetDir" value="/targetpath/recieve/datain" />\n'
+        yield '\t<variable name="MFT_Logs" value="/logs/mft" />\n'
+        yield '\t<variable name="filelistonsrcserver" value="" />\n'
+        yield '\t<variable name="filelistonsrcservernum" value="0" />\n'
+        for module, size in zip(self.modules, self.sizes):
+            on_error = self.rng.choice((f"call:{ERROR_MODULE}", f"call:{ERROR_MODULE}", "abort", "continue"))
+            yield f'\t<module name="{module}" logLevel="debug" onError="{on_error}">\n'
+            for kind in self.rng.choices(self.kinds, self.weights, k=size):
+                yield self._action(kind, module) + "\n"
+            yield "\t</module>\n"
+        yield (f'\t<module name="{ERROR_MODULE}" description="This module calls Project DataError">\n'
+               '\t\t<setVariable label="Error Message" name="errormsg" value="${system.job.error}" version="2.0" />\n'
+               '\t\t<callProject label="Call DataError Project" project="/project-functions-templates/DataError" '
+               'runInSameJob="true" inheritUserVariables="true" mode="batch" version="1.0" />\n'
+               "\t</module>\n</project>\n")
+
+
+def generate_project(actions=1000, modules=None, patterns=1, seed=0, name=None):
+    """
+    Yield the text of one synthetic project in chunks. actions excludes the
+    two actions of the error module; modules defaults to one per 50 actions.
+    """
+    rng = random.Random(seed)
+    modules = max(1, min(actions, modules or actions // 50 or 1))
+    name = name or f"mSYN{seed:05d}-{actions}"
+    yield from _ProjectWriter(rng, name, actions, modules, patterns).chunks()
+
+
+def project_bytes(**options):
+    """One synthetic project as UTF-8 bytes (see generate_project)."""
+    return "".join(generate_project(**options)).encode("utf-8")
+
+
+def write_project(path, **options):
+    """Write one synthetic project to path; returns the file size in bytes."""
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        for chunk in generate_project(**options):
+            f.write(chunk)
+    return os.path.getsize(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic GoAnywhere project XMLs.")
+    parser.add_argument("output", help="XML file, or a directory when --projects > 1")
+    parser.add_argument("--actions", type=int, default=1000, help="Module-level actions per project")
+    parser.add_argument("--modules", type=int, default=None, help="Modules per project (default: actions / 50)")
+    parser.add_argument("--patterns", type=int, default=1, help="Include patterns per file filter")
+    parser.add_argument("--projects", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    options = dict(actions=args.actions, modules=args.modules, patterns=args.patterns)
+    if args.projects == 1 and not os.path.isdir(args.output):
+        paths = [(args.output, args.seed)]
+    else:
+        os.makedirs(args.output, exist_ok=True)
+        paths = [(os.path.join(args.output, f"project_{args.seed + i:05d}.xml"), args.seed + i)
+                 for i in range(args.projects)]
+    total = sum(write_project(path, seed=seed, **options) for path, seed in paths)
+    print(f"{len(paths)} project(s), {args.actions:,} actions each, {total / 1024 / 1024:.1f} MiB "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+# pages/Diagnostics.py
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.diagnostics import show_diagnostics
+
+show_diagnostics()
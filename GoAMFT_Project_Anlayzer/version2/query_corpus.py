@@ -0,0 +1,61 @@
+# query_corpus.py
+"""
+Query the cross-project index of a directory of project and resource XMLs.
+
+Usage:
+    python query_corpus.py exports/ impacted /project-functions-templates/Archive_Files
+    python query_corpus.py exports/ callees /interfaces/mE91232-IS0232-I92122
+    python query_corpus.py exports/ resource E91232
+    python query_corpus.py exports/ unresolved
+
+A project target is matched like a callProject path: the exact path, else a
+project name or file stem that is unique in the corpus. The index is stored
+in <dir>/.corpus_index.json and refreshed by file mtime on every run, so
+only new or changed files are parsed.
+"""
+
+import argparse
+import sys
+import time
+
+from backend.corpus_index import CorpusIndex
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query callProject / resource dependencies across projects.")
+    parser.add_argument("path", help="Directory containing project and resource XMLs")
+    parser.add_argument("query", choices=["impacted", "callers", "callees", "resource", "unresolved", "stats"])
+    parser.add_argument("target", nargs="?", help="Project path (e.g. /folder/Project), unique project name, or resourceId")
+    parser.add_argument("--direct", action="store_true", help="Only direct callers/callees")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = CorpusIndex(args.path)
+    scanned, removed = index.refresh()
+    refreshed = time.perf_counter()
+
+    if args.query in ("impacted", "callers", "callees", "resource") and not args.target:
+        parser.error(f"{args.query} needs a target")
+    if args.query == "impacted":
+        result = index.impacted_by(args.target)
+    elif args.query == "callers":
+        result = index.callers_of(args.target, transitive=not args.direct)
+    elif args.query == "callees":
+        result = index.callees_of(args.target, transitive=not args.direct)
+    elif args.query == "resource":
+        result = index.projects_using_resource(args.target)
+    elif args.query == "unresolved":
+        result = index.unresolved_calls() | {f"resource:{rid}" for rid in index.unknown_resources()}
+    else:
+        result = [f"projects={len(index.projects)}", f"resources={len(index.resources)}",
+                  f"call_edges={sum(len(v) for v in index.calls.values())}"]
+    done = time.perf_counter()
+
+    for item in sorted(result):
+        print(item)
+    print(f"refresh: {scanned} scanned, {removed} removed in {(refreshed - start) * 1000:.1f} ms; "
+          f"query: {(done - refreshed) * 1000:.2f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,17 @@
 import os
-import re
-import xml.etree.ElementTree as ET
+import sys
 import streamlit as st
-from backend_using_appreg import run_agent_workflow
+from backend_using_appreg import stream_agent_workflow
+from xml_artifacts import ArtifactWriter, XmlBlockExtractor, extract_xml_blocks
+from xml_validation import format_violations, load_resources, validate_blocks
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.jobs import get_job_queue
+
+# Extra agent rounds when generated projects fail semantic validation
+VALIDATION_RETRIES = int(os.getenv("AGENT_VALIDATION_RETRIES", "1"))
+# Exported resource XMLs (resource_*.xml) of the target GoAnywhere server, if any
+EXISTING_RESOURCES_DIR = os.getenv("GOA_RESOURCES_DIR")
 
 st.title(" GoA Agent Workflow App")
 
@@ -14,63 +23,110 @@ def extract_valid_xml_blocks(response_text: str, tag: str):
     Extracts valid XML blocks for a given tag from the response text.
     Skips invalid fragments that cannot be parsed.
     """
-    pattern = fr"<{tag}.*?</{tag}>"
-    matches = re.findall(pattern, response_text, re.DOTALL)
-    valid_blocks = []
-    for m in matches:
-        try:
-            ET.fromstring(m)  # validate XML
-            valid_blocks.append(m)
-        except ET.ParseError:
-            continue
-    return valid_blocks
+    return [xml for _, xml in extract_xml_blocks(response_text, tags=(tag,))]
 
 
 def write_xml_files(response_text: str, output_dir: str = "xml_outputs"):
     """
     Extracts project, resource, and webuser XML blocks from the response text
-    and writes them into separate numbered files.
+    and writes them into separate numbered files, replacing earlier ones.
+    """
+    writer = ArtifactWriter(output_dir, clear=True)
+    for tag, xml in extract_xml_blocks(response_text):
+        print(f"✅ Wrote {writer.write(tag, xml)}")
+    return writer.written
+
+
+def stream_and_write(chunks, output_dir: str = "xml_outputs", blocks=None):
+    """
+    Pass the response through while writing every project/resource/webuser
+    block to output_dir as soon as its closing tag arrives. Artifact files
+    from earlier runs are removed first. Written blocks are appended to
+    blocks, if given. Returns (written files, invalid block count).
     """
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Project XMLs
-    projects = extract_valid_xml_blocks(response_text, "project")
-    for i, xml in enumerate(projects, start=1):
-        filename = f"{output_dir}/project_{i}.xml"
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(xml)
-        print(f"✅ Wrote {filename}")
-
-    # Resource XMLs
-    resources = extract_valid_xml_blocks(response_text, "resource")
-    for i, xml in enumerate(resources, start=1):
-        filename = f"{output_dir}/resource_{i}.xml"
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(xml)
-        print(f"✅ Wrote {filename}")
-
-    # WebUser XMLs
-    webusers = extract_valid_xml_blocks(response_text, "webuser")
-    for i, xml in enumerate(webusers, start=1):
-        filename = f"{output_dir}/webuser_{i}.xml"
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(xml)
-        print(f"✅ Wrote {filename}")
-    
-    #st.success("XML files have been extracted and saved to xml_outputs/")
+    extractor = XmlBlockExtractor()
+    writer = ArtifactWriter(output_dir, clear=True)
+    for chunk in chunks:
+        yield chunk
+        for tag, xml in extractor.feed(chunk):
+            filename = writer.write(tag, xml)
+            if blocks is not None:
+                blocks.append((tag, xml))
+            print(f"✅ Wrote {filename}")
+    extractor.finish()
+    return writer.written, extractor.invalid
 
 
+def error_lines(validation):
+    """Error-severity violations of validate_blocks results, formatted for a retry prompt."""
+    return format_violations([v for _, violations in validation for v in violations if v.severity == "error"])
 
-if st.button("Submit"):
-    if prompt.strip():
-        with st.spinner("Submitting ..."):
-            result = run_agent_workflow(prompt)
 
-        #st.subheader("Agent Response")
-        st.write(result)
+def retry_prompt(prompt, errors):
+    return (f"{prompt}\n\nYour previous XML had these errors:\n{errors}\n\n"
+            "Regenerate all project and resource XML with these errors fixed.")
 
-        write_xml_files(result, output_dir="xml_outputs")
 
+def generate_job(prompt, output_dir: str = "xml_outputs", retries: int = VALIDATION_RETRIES):
+    """
+    Background job: streams the agent response, writing XML files as blocks
+    complete, and re-asks the agent with the validation errors up to retries
+    times. Every attempt replaces the files of the previous one, and projects
+    are checked against the resources of the same attempt plus those in
+    EXISTING_RESOURCES_DIR. Returns {"written", "invalid", "validation"} of the last attempt.
+    """
+    existing = load_resources(EXISTING_RESOURCES_DIR) if EXISTING_RESOURCES_DIR else {}
+    request = prompt
+    for attempt in range(retries + 1):
+        if attempt:
+            yield f"\n\n---\n**Retrying with validation feedback ({attempt}) ...**\n\n"
+        blocks = []
+        written, invalid = yield from stream_and_write(stream_agent_workflow(request), output_dir, blocks)
+        validation = validate_blocks(blocks, existing)
+        errors = error_lines(validation)
+        if not errors:
+            break
+        request = retry_prompt(prompt, errors)
+    return {"written": written, "invalid": invalid, "validation": validation, "output_dir": output_dir}
+
+
+def show_report(report):
+    if report["invalid"]:
+        st.warning(f"Skipped {report['invalid']} incomplete or invalid XML block(s).")
+    if report["written"]:
+        names = ", ".join(os.path.basename(f) for f in report["written"])
+        st.success(f"XML files saved to {report['output_dir']}/: {names}")
+    for name, violations in report["validation"]:
+        if not violations:
+            st.success(f"Project {name}: no validation issues.")
+            continue
+        st.warning(f"Project {name}: {len(violations)} validation issue(s)")
+        st.code(format_violations(violations), language="text")
+
+
+# Generation runs as a background job; its id is kept in the session so reruns reattach instead of re-submitting
+jobs = get_job_queue()
+if st.button("Submit"):
+    if prompt.strip():
+        st.session_state.workflow_job = jobs.submit(generate_job, prompt)
     else:
         st.warning("Please enter a prompt before Submit.")
 
+job_id = st.session_state.get("workflow_job")
+job = jobs.poll(job_id) if job_id else None
+if job:
+    if job["status"] in ("pending", "running"):
+        if st.button("⏹ Cancel"):
+            jobs.cancel(job_id)
+        with st.spinner("Submitting ..."):
+            # Files are written by the job while the response streams in
+            st.write_stream(jobs.stream(job_id))
+    else:
+        st.markdown("".join(jobs.stream(job_id)))
+    job = jobs.poll(job_id)
+    if job["status"] == "cancelled":
+        st.info("Generation cancelled.")
+    elif job["status"] == "failed":
+        st.error(f"Generation failed: {job['error']}")
+    else:
+        show_report(jobs.result(job_id))
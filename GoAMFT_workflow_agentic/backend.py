@@ -1,9 +1,14 @@
 import os
+import sys
 import logging
 import time
-from azure.ai.projects import AIProjectClient
 from azure.core.credentials import TokenCredential, AccessToken
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.foundry import credential_key, get_openai_client, response_text
+from common.metrics import get_metrics, usage_fields
+from common.singleflight import get_flight, request_key
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,41 +41,31 @@ def run_agent_workflow(prompt: str, token: str) -> str:
     Returns the raw textual response.
     """
     try:
-        credential = ManualTokenCredential(token)
-        project_client = AIProjectClient(endpoint=FOUNDARY_ENDPOINT, credential=credential)
-        openai_client = project_client.get_openai_client()
+        # Identical prompts in flight with the same token share one agent call
+        key = request_key(FOUNDARY_ENDPOINT, FOUNDARY_AGENT_NAME, credential_key(token), prompt)
+        return get_flight("agent").do(key, _call_agent, prompt, token)
+
+    except Exception as e:
+        logger.exception("Error calling Foundry agent: %s", e)
+        return f"❌ Error calling agent: {str(e)}"
 
-        user_message = f"Prompt: {prompt}"
 
+def _call_agent(prompt: str, token: str) -> str:
+    # Clients are reused per token, so repeat runs skip client setup and TLS handshakes
+    openai_client = get_openai_client(FOUNDARY_ENDPOINT, ManualTokenCredential(token), key=credential_key(token))
+
+    user_message = f"Prompt: {prompt}"
+
+    with get_metrics().span("agent.response", bytes=len(user_message)) as span:
         response = openai_client.responses.create(
             input=[{"role": "user", "content": user_message}],
             extra_body={"agent": {"name": FOUNDARY_AGENT_NAME, "type": "agent_reference"}},
         )
+        span.update(usage_fields(getattr(response, "usage", None)))
 
-        # Try to extract text directly
-        raw_text = getattr(response, "output_text", None)
-
-        # Fallback: parse response.output if needed
-        if not raw_text:
-            raw_text_parts = []
-            for item in getattr(response, "output", []) or []:
-                if isinstance(item, dict):
-                    if "text" in item:
-                        raw_text_parts.append(item["text"])
-                    if "content" in item and isinstance(item["content"], list):
-                        for c in item["content"]:
-                            if isinstance(c, dict) and "text" in c:
-                                raw_text_parts.append(c["text"])
-                            elif isinstance(c, str):
-                                raw_text_parts.append(c)
-            raw_text = "\n\n".join(raw_text_parts).strip()
-
-        if not raw_text:
-            raise RuntimeError("Agent returned no textual output.")
-
-        return raw_text
+    raw_text = response_text(response)
 
-    except Exception as e:
-        logger.exception("Error calling Foundry agent: %s", e)
-        return f"❌ Error calling agent: {str(e)}"
+    if not raw_text:
+        raise RuntimeError("Agent returned no textual output.")
 
+    return raw_text
@@ -1,33 +1,77 @@
 import logging
+import os
+import sys
 import streamlit as st
 from azure.identity import ClientSecretCredential
-from azure.ai.projects import AIProjectClient
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.foundry import CachedTokenCredential, get_openai_client
+from common.metrics import get_metrics, usage_fields
+from common.singleflight import get_flight, request_key
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load secrets from Streamlit Cloud or local secrets.toml
-tenant_id = st.secrets["AZURE_TENANT_ID"]
-client_id = st.secrets["AZURE_CLIENT_ID"]
-client_secret = st.secrets["AZURE_CLIENT_SECRET"]
+# Load secrets from Streamlit Cloud or local secrets.toml; environment variables take precedence (local stand-in)
+tenant_id = os.getenv("AZURE_TENANT_ID") or st.secrets["AZURE_TENANT_ID"]
+client_id = os.getenv("AZURE_CLIENT_ID") or st.secrets["AZURE_CLIENT_ID"]
+client_secret = os.getenv("AZURE_CLIENT_SECRET") or st.secrets["AZURE_CLIENT_SECRET"]
 
-FOUNDARY_ENDPOINT = st.secrets["FOUNDARY_ENDPOINT"]
-FOUNDARY_AGENT_NAME = st.secrets["FOUNDARY_AGENT_NAME"]
+FOUNDARY_ENDPOINT = os.getenv("FOUNDARY_ENDPOINT") or st.secrets["FOUNDARY_ENDPOINT"]
+FOUNDARY_AGENT_NAME = os.getenv("FOUNDARY_AGENT_NAME") or st.secrets["FOUNDARY_AGENT_NAME"]
 
-# Create credential and client
-credential = ClientSecretCredential(tenant_id, client_id, client_secret)
-project_client = AIProjectClient(endpoint=FOUNDARY_ENDPOINT, credential=credential)
-openai_client = project_client.get_openai_client()
+# Create credential and client (tokens refreshed in the background, shared connection pool)
+credential = CachedTokenCredential(ClientSecretCredential(tenant_id, client_id, client_secret))
+openai_client = get_openai_client(FOUNDARY_ENDPOINT, credential)
+# Identical prompts from concurrent sessions share one agent call
+flight = get_flight("agent")
 
 def run_agent_workflow(prompt: str) -> str:
     """Send a prompt to the Foundry agent and return its response."""
     try:
+        return flight.do(request_key(FOUNDARY_ENDPOINT, FOUNDARY_AGENT_NAME, prompt), _create_response, prompt)
+    except Exception as e:
+        logger.exception("Error calling Foundry agent")
+        return f"❌ Error: {e}"
+
+
+
+def stream_agent_workflow(prompt: str):
+    """Yield the Foundry agent's response text as it is generated."""
+    try:
+        key = request_key(FOUNDARY_ENDPOINT, FOUNDARY_AGENT_NAME, prompt, "stream")
+        yield from flight.stream(key, _response_deltas, prompt)
+    except Exception as e:
+        logger.exception("Error calling Foundry agent")
+        yield f"❌ Error: {e}"
+
+
+def _create_response(prompt: str) -> str:
+    with get_metrics().span("agent.response", bytes=len(prompt)) as span:
         response = openai_client.responses.create(
             input=[{"role": "user", "content": prompt}],
             extra_body={"agent": {"name": FOUNDARY_AGENT_NAME, "type": "agent_reference"}},
         )
-        return getattr(response, "output_text", "No response text")
-    except Exception as e:
-        logger.exception("Error calling Foundry agent")
-        return f"❌ Error: {e}"
+        span.update(usage_fields(getattr(response, "usage", None)))
+    return getattr(response, "output_text", "No response text")
+
+
+def _open_stream(prompt: str):
+    # Opened on first iteration, so the request itself counts towards agent.first_token
+    yield from openai_client.responses.create(
+        input=[{"role": "user", "content": prompt}],
+        extra_body={"agent": {"name": FOUNDARY_AGENT_NAME, "type": "agent_reference"}},
+        stream=True,
+    )
+
 
+def _response_deltas(prompt: str):
+    usage = {"bytes": len(prompt)}
+    events = get_metrics().timed_iter("agent.generation", _open_stream(prompt), first_stage="agent.first_token",
+                                      fields=usage)
+    for event in events:
+        event_type = getattr(event, "type", "")
+        if event_type == "response.output_text.delta":
+            yield event.delta
+        elif event_type == "response.completed":
+            usage.update(usage_fields(getattr(event.response, "usage", None)))
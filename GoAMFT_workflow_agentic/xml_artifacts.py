@@ -0,0 +1,171 @@
+# xml_artifacts.py
+"""
+Incremental extraction of the XML artifacts (project, resource, webuser) an
+agent writes into its response.
+
+    extractor = XmlBlockExtractor()
+    writer = ArtifactWriter("xml_outputs")
+    for chunk in stream:
+        for tag, xml in extractor.feed(chunk):
+            writer.write(tag, xml)          # written as soon as the closing tag arrives
+    extractor.finish()
+
+One pass over the text finds the next opening tag of any artifact type,
+then tracks nesting of that tag until its matching close. While a block is
+open its text is fed to an XMLPullParser, so a block is validated as it
+streams in and malformed blocks are dropped without a second parse. The
+extractor keeps one pull parser for all blocks: blocks are fed as children
+of a synthetic wrapper element, and the parser is only replaced after a
+malformed or unfinished block (expat cannot continue past an error).
+"""
+
+import glob
+import os
+import re
+import xml.etree.ElementTree as ET
+
+ARTIFACT_TAGS = ("project", "resource", "webuser")
+_WRAPPER = "artifacts"
+
+# Attribute values may contain '>' (e.g. executeOnlyIf="${n} > 0"), so quoted strings are skipped
+_TAG_BODY = r"""(?:\s+(?:[^"'>/]|"[^"]*"|'[^']*'|/(?!>))*)?\s*"""
+
+
+class XmlBlockExtractor:
+    """Feed response chunks; returns (tag, xml_text) for every valid block completed by each chunk."""
+
+    def __init__(self, tags=ARTIFACT_TAGS):
+        self._open = re.compile(r"<(%s)(?=[\s>/])" % "|".join(map(re.escape, tags)))
+        self._keep = max(len(tag) for tag in tags) + 2
+        self._tag_patterns = {tag: re.compile(r"<(/?)%s%s(/?)>" % (re.escape(tag), _TAG_BODY)) for tag in tags}
+        self._buffer = ""
+        self._pos = 0            # everything before _pos is consumed
+        self._parser = None
+        self._reset_block()
+        self.invalid = 0
+
+    def _reset_block(self):
+        self._tag = None
+        self._depth = 0
+        self._scan = 0
+        self._fed = 0
+        self._error = None
+        self._level = 0          # element depth inside the block, from parser events
+        self._closed = False     # the parser has seen the end of the block's root element
+
+    def _start_parser(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._parser.feed(f"<{_WRAPPER}>")
+        (_, self._root), = self._parser.read_events()
+
+    def _feed_parser(self, end):
+        if self._error is None and end > self._fed:
+            try:
+                self._parser.feed(self._buffer[self._fed:end])
+                for event, _ in self._parser.read_events():
+                    self._level += 1 if event == "start" else -1
+                    self._closed = self._level == 0
+            except ET.ParseError as e:
+                self._error = e
+        self._fed = end
+
+    def _advance_block(self):
+        """Scan the open block; returns the end offset once its closing tag is in the buffer."""
+        pattern = self._tag_patterns[self._tag]
+        while True:
+            match = pattern.search(self._buffer, self._scan)
+            if match is None:
+                # Resume at the last '<': its tag may still be incomplete
+                last = self._buffer.rfind("<", self._scan)
+                self._scan = last if last != -1 else len(self._buffer)
+                return None
+            self._scan = match.end()
+            closing, self_closing = match.group(1), match.group(2)
+            if closing:
+                self._depth -= 1
+            elif not self_closing:
+                self._depth += 1
+            if self._depth == 0:
+                return match.end()
+
+    def _blocks(self):
+        blocks = []
+        while True:
+            if self._tag is None:
+                match = self._open.search(self._buffer, self._pos)
+                if match is None:
+                    self._pos = max(self._pos, len(self._buffer) - self._keep)
+                    return blocks
+                self._pos = self._scan = self._fed = match.start()
+                self._tag = match.group(1)
+                if self._parser is None:
+                    self._start_parser()
+
+            end = self._advance_block()
+            if end is None:
+                self._feed_parser(self._scan)
+                return blocks
+            self._feed_parser(end)
+            if self._error is None and self._closed:
+                blocks.append((self._tag, self._buffer[self._pos:end]))
+                # Finished blocks are not kept under the wrapper
+                self._root.clear()
+            else:
+                self.invalid += 1
+                self._parser = None
+            self._reset_block()
+            self._pos = end
+
+    def feed(self, chunk):
+        # Drop the consumed prefix once per chunk, not once per block
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            if self._tag is not None:
+                self._scan -= self._pos
+                self._fed -= self._pos
+            self._pos = 0
+        self._buffer += chunk
+        return self._blocks()
+
+    def finish(self):
+        """End of the response: an unclosed block is incomplete and is discarded."""
+        if self._tag is not None:
+            self.invalid += 1
+            self._parser = None
+        self._buffer = ""
+        self._pos = 0
+        self._reset_block()
+
+
+def extract_xml_blocks(response_text, tags=ARTIFACT_TAGS):
+    """All valid artifact blocks of a complete response as (tag, xml_text), in order of appearance."""
+    extractor = XmlBlockExtractor(tags)
+    blocks = extractor.feed(response_text)
+    extractor.finish()
+    return blocks
+
+
+class ArtifactWriter:
+    """
+    Writes blocks to <output_dir>/<tag>_<n>.xml, numbering each tag separately.
+    With clear=True the artifact files already in output_dir are removed
+    first, so none are left over from an earlier run with more blocks.
+    """
+
+    def __init__(self, output_dir="xml_outputs", clear=False, tags=ARTIFACT_TAGS):
+        self.output_dir = output_dir
+        self.counts = {}
+        self.written = []
+        os.makedirs(output_dir, exist_ok=True)
+        if clear:
+            for tag in tags:
+                for path in glob.glob(os.path.join(output_dir, f"{glob.escape(tag)}_*.xml")):
+                    os.remove(path)
+
+    def write(self, tag, xml):
+        self.counts[tag] = self.counts.get(tag, 0) + 1
+        filename = f"{self.output_dir}/{tag}_{self.counts[tag]}.xml"
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(xml)
+        self.written.append(filename)
+        return filename
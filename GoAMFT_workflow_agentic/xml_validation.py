@@ -0,0 +1,296 @@
+# xml_validation.py
+"""
+Semantic checks for agent-generated GoAnywhere project XML, run against the
+resources generated alongside it. Well-formed output can still be unusable:
+
+    violations = validate_project(project_xml, resources=load_resources("exported_resources"))
+    errors = [v for v in violations if v.severity == "error"]
+    retry_prompt = format_violations(violations)
+
+Rules (see RULES):
+    undefined-variable   ${name} used but never set in the project (a warning: it may be a
+                         global variable or set by a called project; KNOWN_VARIABLES are skipped)
+    unknown-resource     resourceId (literal or via a setVariable value) not among the resources
+    resource-type        resource class does not match the action (sftp needs an SSH resource, ...)
+    bad-on-error         onError is not abort/continue/call:<existing module>
+    bad-main-module      mainModule / callModule names a module that does not exist
+    unknown-action       element is not a known GoAnywhere task or operation
+    missing-attribute    task lacks an attribute it requires
+
+The action schema is compiled once into lookup sets and expression parsing
+is memoized, so a project is checked in a single tree walk, in milliseconds.
+"""
+
+import glob
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from functools import lru_cache
+
+Violation = namedtuple("Violation", "rule severity module element message")
+
+# Module-level tasks -> attributes they require
+TASKS = {
+    "createWorkspace": (), "deleteWorkspace": (), "print": (), "exitProject": (), "raiseError": (),
+    "setVariable": ("name",), "callProject": ("project",), "callModule": ("module",),
+    "sftp": ("resourceId",), "ftp": ("resourceId",), "ftps": ("resourceId",), "scp": ("resourceId",),
+    "http": ("resourceId",), "as2": ("resourceId",), "sendEmail": (), "retrieveEmail": ("resourceId",),
+    "createFileList": ("fileListVariable",), "copy": (), "move": (), "delete": (), "rename": (),
+    "createDirectory": ("dir",), "deleteDirectory": (), "zip": (), "unzip": (),
+    "pgpEncrypt": (), "pgpDecrypt": (), "pgpSign": (), "pgpVerify": (),
+    "readCSV": (), "writeCSV": (), "readExcel": (), "writeExcel": (), "readXML": (), "writeXML": (),
+    "sql": ("resourceId",), "timestamp": (), "sleep": (), "modifyRowSet": (), "searchAndReplace": (),
+    "if": ("condition",), "else": (), "forEachLoop": ("itemVariable",), "whileLoop": ("condition",),
+    "doWhileLoop": ("condition",), "exit": (), "continueLoop": (), "exitLoop": (),
+}
+CONTAINERS = {"if", "else", "forEachLoop", "whileLoop", "doWhileLoop"}
+# Operations allowed inside remote-server tasks
+OPERATIONS = {
+    "sftp": {"list", "get", "put", "move", "copy", "delete", "rename", "mkdir", "rmdir", "chmod", "command"},
+    "ftp": {"list", "get", "put", "move", "delete", "rename", "mkdir", "rmdir", "command"},
+    "ftps": {"list", "get", "put", "move", "delete", "rename", "mkdir", "rmdir", "command"},
+    "scp": {"get", "put"},
+}
+# Elements that may appear anywhere inside a task (file selection, filters, messages)
+NESTED = {"fileset", "wildcardFilter", "regexFilter", "include", "exclude", "dateFilter", "sizeFilter",
+          "variable", "column", "data", "header", "attachment", "to", "cc", "bcc", "message", "query",
+          "output", "param", "elseIf"}
+# Action tag -> resource classes it can use (matched on the class name suffix)
+RESOURCE_TYPES = {"sftp": ("SSHResource", "SFTPResource"), "scp": ("SSHResource", "SCPResource"),
+                  "ftp": ("FTPResource",), "ftps": ("FTPSResource",), "http": ("HTTPResource",),
+                  "as2": ("AS2Resource",), "sql": ("DatabaseResource",)}
+ON_ERROR_KEYWORDS = {"abort", "continue"}
+BUILTIN_PREFIXES = ("system.", "job.", "project.", "module.")
+# Global variables and variables inherited from calling projects, comma separated in GOA_KNOWN_VARIABLES
+KNOWN_VARIABLES = frozenset(name.strip() for name in os.getenv("GOA_KNOWN_VARIABLES", "").split(",") if name.strip())
+OPERATORS = {"eq", "ne", "lt", "gt", "le", "ge", "and", "or", "not", "true", "false", "null", "empty", "div", "mod"}
+
+_EXPRESSION = re.compile(r"\$\{([^}]*)\}")
+_QUOTED = re.compile(r"'[^']*'|\"[^\"]*\"")
+_IDENTIFIER = re.compile(r"(?<![\w.:])([A-Za-z_][\w]*(?:\.[\w]+)*)(?!\s*\(|[\w.])")
+
+
+@lru_cache(maxsize=4096)
+def expression_names(text):
+    """Variable names referenced by the ${...} expressions in text."""
+    names = []
+    for expression in _EXPRESSION.findall(text):
+        for name in _IDENTIFIER.findall(_QUOTED.sub(" ", expression)):
+            if name.lower() not in OPERATORS and not name.startswith(BUILTIN_PREFIXES):
+                names.append(name)
+    return tuple(names)
+
+
+def _is_expression(value):
+    return "${" in value
+
+
+def _resource_info(xml_text):
+    root = ET.fromstring(xml_text)
+    if root.tag != "resource":
+        return None
+    return (root.findtext("resourceName") or "").strip(), root.get("class", "")
+
+
+_resource_cache = {}
+
+
+def load_resources(directory):
+    """{resourceName: class} from resource_*.xml in directory, re-read only for files whose mtime changed."""
+    resources = {}
+    for path in sorted(glob.glob(os.path.join(directory, "resource_*.xml"))):
+        mtime = os.path.getmtime(path)
+        cached = _resource_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    info = _resource_info(f.read())
+            except (OSError, ET.ParseError):
+                info = None
+            cached = _resource_cache[path] = (mtime, info)
+        if cached[1] and cached[1][0]:
+            resources[cached[1][0]] = cached[1][1]
+    return resources
+
+
+def resources_from_blocks(blocks):
+    """{resourceName: class} from (tag, xml) blocks of a response (see xml_artifacts)."""
+    resources = {}
+    for tag, xml in blocks:
+        if tag == "resource":
+            info = _resource_info(xml)
+            if info and info[0]:
+                resources[info[0]] = info[1]
+    return resources
+
+
+class _Context:
+    """Everything the rules need, collected in one walk of the project tree."""
+
+    def __init__(self, root):
+        self.root = root
+        self.modules = {}
+        self.defined = {}          # variable -> literal value ('' when not a literal)
+        self.references = []       # (module, element, name)
+        self.elements = []         # (module, element, parent tag)
+        for variable in root.iter("variable"):
+            if variable.get("name"):
+                self.defined.setdefault(variable.get("name"), variable.get("value", ""))
+        for module in root.findall("module"):
+            name = module.get("name", "Unnamed")
+            self.modules[name] = module
+            self._walk(name, module, "module")
+
+    def _walk(self, module, elem, parent):
+        for child in elem:
+            self.elements.append((module, child, parent))
+            for key, value in child.attrib.items():
+                if key == "name" and child.tag == "setVariable":
+                    self.defined[value] = child.get("value", "") if not _is_expression(child.get("value", "")) else ""
+                elif key.endswith("Variable") and not _is_expression(value):
+                    self.defined.setdefault(value, "")
+                elif _is_expression(value):
+                    self.references.extend((module, child, n) for n in expression_names(value))
+            if child.text and "${" in child.text:
+                self.references.extend((module, child, n) for n in expression_names(child.text))
+            self._walk(module, child, child.tag)
+
+
+def _where(elem):
+    label = elem.get("label")
+    return f"<{elem.tag}> '{label}'" if label else f"<{elem.tag}>"
+
+
+def _rule_undefined_variables(ctx, resources):
+    seen = set()
+    for module, elem, name in ctx.references:
+        root_name = name.split(".")[0]
+        if root_name in KNOWN_VARIABLES or name in KNOWN_VARIABLES:
+            continue
+        if name not in ctx.defined and root_name not in ctx.defined and (module, name) not in seen:
+            seen.add((module, name))
+            # Globals and variables returned by a called project are not visible here, so not an error
+            yield Violation("undefined-variable", "warning", module, _where(elem),
+                            f"${{{name}}} is used but never set in this project")
+
+
+def _resolve_resource(ctx, value):
+    if not _is_expression(value):
+        return value
+    names = expression_names(value)
+    if len(names) == 1 and value.strip() == "${%s}" % names[0]:
+        literal = ctx.defined.get(names[0], "")
+        return literal if literal and not _is_expression(literal) else None
+    return None
+
+
+def _rule_resources(ctx, resources):
+    if resources is None:
+        return
+    for module, elem, _ in ctx.elements:
+        value = elem.get("resourceId")
+        if not value:
+            continue
+        name = _resolve_resource(ctx, value)
+        if name is None:
+            continue
+        if name not in resources:
+            via = f" (via {value})" if name != value else ""
+            yield Violation("unknown-resource", "error", module, _where(elem),
+                            f"resource '{name}'{via} is not defined; known: {', '.join(sorted(resources)) or 'none'}")
+            continue
+        expected = RESOURCE_TYPES.get(elem.tag)
+        if expected and resources[name] and not resources[name].endswith(expected):
+            yield Violation("resource-type", "warning", module, _where(elem),
+                            f"resource '{name}' is {resources[name].rsplit('.', 1)[-1]}, "
+                            f"expected {' or '.join(expected)} for <{elem.tag}>")
+
+
+def _rule_module_targets(ctx, resources):
+    main = ctx.root.get("mainModule")
+    if main and main not in ctx.modules:
+        yield Violation("bad-main-module", "error", "", "<project>", f"mainModule '{main}' does not exist")
+    for name, module in ctx.modules.items():
+        yield from _check_on_error(ctx, name, module)
+    for module, elem, _ in ctx.elements:
+        yield from _check_on_error(ctx, module, elem)
+        if elem.tag == "callModule" and elem.get("module") and elem.get("module") not in ctx.modules:
+            yield Violation("bad-main-module", "error", module, _where(elem),
+                            f"callModule target '{elem.get('module')}' does not exist")
+
+
+def _check_on_error(ctx, module, elem):
+    target = elem.get("onError")
+    if not target or target in ON_ERROR_KEYWORDS or _is_expression(target):
+        return
+    if target.startswith("call:"):
+        if target[5:] not in ctx.modules:
+            yield Violation("bad-on-error", "error", module, _where(elem) if elem.tag != "module" else "<module>",
+                            f"onError calls module '{target[5:]}', which does not exist; "
+                            f"modules: {', '.join(ctx.modules)}")
+        return
+    if not target.startswith("setVariable:"):
+        yield Violation("bad-on-error", "error", module, _where(elem) if elem.tag != "module" else "<module>",
+                        f"onError '{target}' is not abort, continue or call:<module>")
+
+
+def _rule_schema(ctx, resources):
+    for module, elem, parent in ctx.elements:
+        tag = elem.tag
+        if parent == "module" or parent in CONTAINERS:
+            if tag not in TASKS:
+                yield Violation("unknown-action", "warning", module, _where(elem), f"unknown task <{tag}>")
+                continue
+            missing = [attr for attr in TASKS[tag] if not elem.get(attr)]
+            if missing:
+                yield Violation("missing-attribute", "error", module, _where(elem),
+                                f"<{tag}> requires {', '.join(missing)}")
+        elif parent in OPERATIONS and tag not in OPERATIONS[parent] and tag not in NESTED:
+            yield Violation("unknown-action", "warning", module, _where(elem),
+                            f"<{parent}> has no operation <{tag}>")
+
+
+RULES = (_rule_undefined_variables, _rule_resources, _rule_module_targets, _rule_schema)
+
+
+def validate_project(project_xml, resources=None):
+    """
+    Violations of one project (XML text or parsed root element). resources is
+    {resourceName: class}; when None the resource rules are skipped.
+    """
+    try:
+        root = ET.fromstring(project_xml) if isinstance(project_xml, (str, bytes)) else project_xml
+    except ET.ParseError as e:
+        return [Violation("xml", "error", "", "<project>", f"invalid XML: {e}")]
+    if root.tag != "project":
+        return []
+    ctx = _Context(root)
+    return [violation for rule in RULES for violation in rule(ctx, resources)]
+
+
+def validate_blocks(blocks, known_resources=None):
+    """
+    Check every project among (tag, xml) blocks against the resources in the
+    same blocks plus known_resources (e.g. load_resources() of the server's
+    exported resources, not of earlier generated output). When
+    no resources are known at all the resource rules are skipped, since every
+    resourceId would be reported. Returns [(project_name, violations)].
+    """
+    resources = dict(known_resources or {})
+    resources.update(resources_from_blocks(blocks))
+    results = []
+    for tag, xml in blocks:
+        if tag == "project":
+            root = ET.fromstring(xml)
+            results.append((root.get("name", "Unnamed"), validate_project(root, resources or None)))
+    return results
+
+
+def format_violations(violations):
+    """One line per violation, suitable for showing to a user or an agent retry prompt."""
+    lines = []
+    for v in violations:
+        where = f"module '{v.module}', {v.element}" if v.module else v.element
+        lines.append(f"- [{v.severity}] {v.rule}: {where}: {v.message}")
+    return "\n".join(lines)
@@ -40,7 +40,7 @@ else:
             try:
                 # Initialize Azure OpenAI client with user-provided API key
                 client = AzureOpenAI(
-                    azure_endpoint="https://pradeep-azai-openai.openai.azure.com/",
+                    azure_endpoint=os.getenv("ENDPOINT_URL", "https://pradeep-azai-openai.openai.azure.com/"),
                     api_key=api_key,  # Use the input API key
                     api_version="2025-01-01-preview",
                 )
@@ -0,0 +1,122 @@
+# loadtest_user_store.py
+"""
+Load test for user_store: N users, concurrent logins and registrations,
+compared with the former users.csv approach (pandas read + mask per login).
+
+Also checks correctness under contention: every registration of a distinct
+name must persist, and duplicate names must be accepted exactly once.
+
+Usage:
+    python loadtest_user_store.py --users 100000 --threads 16 --logins 50000
+"""
+
+import argparse
+import csv
+import hashlib
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from user_store import UserStore
+
+
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def run_concurrent(threads, fn, items):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda item: timed(fn, *item), items))
+    return time.perf_counter() - start, results
+
+
+def report(label, wall, results):
+    latencies = [t * 1000 for t, _ in results]
+    print(f"{label:<34} {len(results) / wall:>10,.0f}/s  p50={statistics.median(latencies):.3f} ms  "
+          f"p95={percentile(latencies, 95):.3f} ms  p99={percentile(latencies, 99):.3f} ms")
+
+
+def legacy_login(csv_path, username, hashed):
+    users = pd.read_csv(csv_path)
+    return bool(((users["username"] == username) & (users["password"] == hashed)).any())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the SQLite user store.")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=50_000)
+    parser.add_argument("--registrations", type=int, default=5_000)
+    parser.add_argument("--legacy-logins", type=int, default=20, help="Logins timed against users.csv (slow)")
+    args = parser.parse_args(argv)
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "users.csv")
+        passwords = {f"user{i:06d}": f"pw{i}" for i in range(args.users)}
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["username", "password"])
+            writer.writerows((name, hash_password(pw)) for name, pw in passwords.items())
+
+        migrate_time, store = timed(UserStore, os.path.join(tmp, "users.sqlite3"), csv_path)
+        print(f"users={store.count():,} migrated from CSV in {migrate_time * 1000:.0f} ms")
+        first_time, _ = timed(store.password_hash, "user000000")
+        print(f"first lookup                       {first_time * 1000:.3f} ms")
+
+        names = list(passwords)
+        logins = []
+        for _ in range(args.logins):
+            name = rng.choice(names)
+            good = rng.random() < 0.9
+            logins.append((name, hash_password(passwords[name] if good else "wrong"), good))
+
+        wall, results = run_concurrent(args.threads, lambda n, h, good: store.check(n, h) == good, logins)
+        report(f"logins ({args.threads} threads)", wall, results)
+        assert all(ok for _, ok in results), "login returned a wrong answer"
+
+        # Distinct names must all persist; each duplicated name must win exactly once
+        registrations = [(f"new{i:06d}", hash_password("pw")) for i in range(args.registrations)]
+        registrations += registrations[: args.registrations // 10]
+        rng.shuffle(registrations)
+        wall, results = run_concurrent(args.threads, store.add_user, registrations)
+        report(f"registrations ({args.threads} threads)", wall, results)
+        accepted = sum(1 for _, ok in results if ok)
+        assert accepted == args.registrations, f"{accepted} registrations accepted, expected {args.registrations}"
+
+        # A second connection sees the new users; its writes invalidate our index through data_version
+        other = UserStore(store.path, legacy_csv=None)
+        assert other.exists(f"new{args.registrations - 1:06d}")
+        other.add_user("from_other_process", hash_password("pw"))
+        invalidations = store.invalidations
+        lookup_time, found = timed(store.exists, "from_other_process")
+        assert found and store.invalidations == invalidations + 1
+        print(f"lookup after external write        {lookup_time * 1000:.3f} ms")
+        print(f"users={store.count():,}, all checks passed")
+
+        legacy = [(csv_path, n, h) for n, h, _ in logins[: args.legacy_logins]]
+        wall, results = run_concurrent(args.threads, legacy_login, legacy)
+        report(f"legacy CSV logins ({args.threads} threads)", wall, results)
+        other.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# user_store.py
+"""
+SQLite user store for auth.py, with an in-memory username -> password hash
+index for logins.
+
+    from user_store import get_user_store
+    store = get_user_store()
+    store.add_user("alice", hash_password("secret"))    # False if the name is taken
+    store.check("alice", hash_password("secret"))       # True / False
+
+Usernames are the primary key, so registering is one INSERT: the write is
+atomic and two concurrent registrations of the same name cannot both win.
+Logins are answered from the index, filled by primary-key lookups as users
+log in; it is dropped only when another connection (another app process)
+has changed the database, which SQLite reports through PRAGMA data_version.
+On first use an existing users.csv is imported.
+"""
+
+import csv
+import logging
+import os
+import sqlite3
+import threading
+
+USER_STORE_PATH = os.getenv("USER_STORE_PATH", "users.sqlite3")
+LEGACY_USER_CSV = os.getenv("LEGACY_USER_CSV", "users.csv")
+
+logger = logging.getLogger(__name__)
+
+
+class UserStore:
+    """Users in SQLite, looked up through an in-memory index kept in sync with the file."""
+
+    def __init__(self, path=USER_STORE_PATH, legacy_csv=LEGACY_USER_CSV):
+        self.path = path
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, password TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        if legacy_csv and os.path.exists(legacy_csv):
+            self.migrate_csv(legacy_csv)
+        self._index = {}
+        self._version = None
+
+    def migrate_csv(self, csv_path):
+        """Import username,password rows from the old users.csv; existing users are kept. Returns rows added."""
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = [(r["username"], r["password"]) for r in csv.DictReader(f) if r.get("username") and r.get("password")]
+        with self._lock:
+            before = self._conn.total_changes
+            with self._conn:
+                self._conn.executemany("INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)", rows)
+            added = self._conn.total_changes - before
+        if added:
+            logger.info(f"Migrated {added} user(s) from {csv_path} to {self.path}")
+        return added
+
+    def _sync(self):
+        """Drop the index if the database changed since it was filled (caller holds the lock)."""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            if self._index:
+                self.invalidations += 1
+            self._index = {}
+            self._version = version
+
+    def password_hash(self, username):
+        """Stored password hash of username, or None."""
+        with self._lock:
+            self._sync()
+            stored = self._index.get(username)
+            if stored is None:
+                row = self._conn.execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
+                if row is None:
+                    return None
+                stored = self._index[username] = row[0]
+            return stored
+
+    def exists(self, username):
+        return self.password_hash(username) is not None
+
+    def check(self, username, password_hash):
+        stored = self.password_hash(username)
+        return stored is not None and stored == password_hash
+
+    def add_user(self, username, password_hash):
+        """Register a user; False if the username already exists."""
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password_hash))
+            except sqlite3.IntegrityError:
+                return False
+            # Our own commits do not change data_version, so keep the index current here
+            self._index[username] = password_hash
+        return True
+
+    def add_users(self, users):
+        """Bulk insert of (username, password_hash) pairs, skipping existing names. Returns rows added."""
+        with self._lock:
+            before = self._conn.total_changes
+            with self._conn:
+                self._conn.executemany("INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)", users)
+            return self._conn.total_changes - before
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store():
+    """Process-wide store (Streamlit reruns the script, the store and its index survive)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = UserStore()
+        return _store
@@ -1,8 +1,25 @@
+import os
+import sys
 import streamlit as st
-import pandas as pd
-from io import BytesIO
-from backend import get_comparison
-from fpdf import FPDF
+from backend import get_comparison, iter_tool_evaluations, merge_tool_results
+from fact_cache import get_fact_cache
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.exports import ExportDocument, render_exports, file_name, mime_type
+from common.jobs import get_job_queue
+from common.singleflight import flight_stats, request_key
+from tco_panel import show_tco_calculator
+
+
+
+def fan_out_job(prompt, tools):
+    """Background job: yields (tool, text, df) as each tool finishes, returns the merged (text, df)."""
+    results = []
+    for result in iter_tool_evaluations(prompt, tools):
+        results.append(result)
+        yield result
+    return merge_tool_results(prompt, tools, results)
+
 
 st.set_page_config(page_title="MFT Tool Comparator", layout="centered")
 st.title("🔐 MFT Tool Comparison Assistant")
@@ -25,78 +42,90 @@ with st.expander("🧰 Select MFT Tools to Compare"):
 
 selected_tools = [tool for tool, checked in tools.items() if checked]
 
+# 💰 Cost questions are answered locally from the cost sheet
+show_tco_calculator(selected_tools)
+
 # 📝 Prompt input
 user_prompt = st.text_area(
     "Your Requirements",
     placeholder="e.g., SFTP, FTPS support, cloud integration like SharePoint, MQ, S3 or Blob"
 )
 
-# Helper: PDF creation
-def create_pdf(result_text, result_df):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-
-    # Add raw text
-    pdf.multi_cell(0, 10, "MFT Tool Comparison Result\n\n" + result_text)
-
-    # Add table if available
-    if not result_df.empty:
-        pdf.ln(10)
-        pdf.set_font("Arial", size=10)
-        col_width = pdf.w / (len(result_df.columns) + 1)
-
-        # Header
-        for col in result_df.columns:
-            pdf.cell(col_width, 10, col, border=1)
-        pdf.ln()
-
-        # Rows
-        for _, row in result_df.iterrows():
-            for item in row:
-                pdf.cell(col_width, 10, str(item), border=1)
-            pdf.ln()
-
-    buffer = BytesIO()
-    pdf.output(buffer)
-    return buffer.getvalue()
-
-# 🚀 Submit button
+fan_out = st.checkbox(
+    "⚡ Evaluate each tool in parallel",
+    value=True,
+    help="One request per tool, shown as each finishes and merged into one table. Answers are cached per "
+         "tool and requirement, so only new combinations go to the agent."
+)
+
+# 🚀 Submit button: the comparison runs as a background job, so reruns reattach to it instead of re-requesting
+jobs = get_job_queue()
 if st.button("Compare Tools"):
     if not user_prompt.strip():
         st.warning("Please enter your requirements.")
     elif not selected_tools:
         st.warning("Please select at least one MFT tool to compare.")
+    else:
+        job_id = request_key("comparison", user_prompt, selected_tools, fan_out)
+        if fan_out:
+            jobs.submit(fan_out_job, user_prompt, selected_tools, job_id=job_id)
+        else:
+            jobs.submit(get_comparison, user_prompt, selected_tools, job_id=job_id)
+        st.session_state.comparison = {"job_id": job_id, "tools": selected_tools, "fan_out": fan_out}
+
+current = st.session_state.get("comparison")
+job = jobs.poll(current["job_id"]) if current else None
+if job:
+    job_id = current["job_id"]
+    st.markdown("### 🧾 Comparison Result")
+    if job["status"] in ("pending", "running") and st.button("⏹ Cancel comparison"):
+        jobs.cancel(job_id)
+
+    if current["fan_out"]:
+        progress = st.progress(0.0, text="Evaluating tools...")
+        done = 0
+        for tool, tool_text, tool_df in jobs.stream(job_id):
+            done += 1
+            progress.progress(done / len(current["tools"]), text=f"{done}/{len(current['tools'])} tools evaluated")
+            with st.expander(f"{'❌' if tool_text.startswith('❌') else '✅'} {tool}"):
+                st.write(tool_text)
     else:
         with st.spinner("Generating comparison..."):
-            result_text, result_df = get_comparison(user_prompt, selected_tools)
-
-            st.markdown("### 🧾 Comparison Result")
+            for _ in jobs.stream(job_id):
+                pass
+
+    job = jobs.poll(job_id)
+    if job["status"] == "cancelled":
+        st.info("Comparison cancelled.")
+    elif job["status"] == "failed":
+        st.error(f"Comparison failed: {job['error']}")
+    else:
+        result_text, result_df = jobs.result(job_id)
+        if not current["fan_out"]:
             st.write(result_text)
-
-            if not result_df.empty:
-                st.markdown("### 📊 Structured Comparison Table")
-                st.dataframe(result_df)
-
-                # Excel export
-                buffer = BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    result_df.to_excel(writer, index=False, sheet_name="MFT Comparison")
+        stats = get_fact_cache().stats()
+        st.caption(f"Fact cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} cells stored")
+        flight = flight_stats().get("comparison")
+        if flight and flight["coalesced"]:
+            st.caption(f"Shared in-flight agent calls: {flight['coalesced']} of {flight['calls']} requests")
+
+        if not result_df.empty:
+            st.markdown("### 📊 Structured Comparison Table")
+            st.dataframe(result_df)
+
+            # Excel and PDF exports, rendered together and reused across reruns
+            doc = ExportDocument(result_text, result_df, title="MFT Tool Comparison Result")
+            exports = render_exports(doc, ["xlsx", "pdf"])
+            labels = {"xlsx": "📥 Download Excel", "pdf": "📄 Download PDF"}
+            for fmt, data in exports.items():
+                if isinstance(data, Exception):
+                    st.error(f"❌ {fmt.upper()} export failed: {data}")
+                    continue
                 st.download_button(
-                    label="📥 Download Excel",
-                    data=buffer.getvalue(),
-                    file_name="mft_comparison.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    label=labels[fmt],
+                    data=data,
+                    file_name=file_name(fmt, "mft_comparison"),
+                    mime=mime_type(fmt)
                 )
-
-                # PDF export
-                pdf_bytes = create_pdf(result_text, result_df)
-                st.download_button(
-                    label="📄 Download PDF",
-                    data=pdf_bytes,
-                    file_name="mft_comparison.pdf",
-                    mime="application/pdf"
-                )
-            else:
-                st.info("No structured table found in the response.")
-
+        else:
+            st.info("No structured table found in the response.")
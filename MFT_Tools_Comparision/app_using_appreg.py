@@ -1,8 +1,12 @@
+import os
+import sys
 import streamlit as st
-import pandas as pd
-from io import BytesIO
 from backend_using_appreg import run_agent_workflow
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.exports import ExportDocument, render_exports, file_name, mime_type
+from tco_panel import show_tco_calculator
+
 st.set_page_config(page_title="MFT Tool Comparator", layout="centered")
 st.title("🔐 MFT Tool Comparison Assistant")
 st.markdown("Enter your requirements and select MFT tools to compare.")
@@ -24,6 +28,9 @@ with st.expander("🧰 Select MFT Tools to Compare"):
 
 selected_tools = [tool for tool, checked in tools.items() if checked]
 
+# 💰 Cost questions are answered locally from the cost sheet
+show_tco_calculator(selected_tools)
+
 # 📝 Prompt input
 user_prompt = st.text_area(
     "Your Requirements",
@@ -52,48 +59,17 @@ if st.button("Compare Tools"):
         # Export options
         st.markdown("### 📤 Export Options")
 
-        # Export to text file
-        st.download_button(
-            label="Download as TXT",
-            data=comparison_result,
-            file_name="mft_comparison.txt",
-            mime="text/plain"
-        )
-
-        # Export to Markdown file
-        try:
-            md_buffer = BytesIO(comparison_result.encode("utf-8"))
+        # TXT, Markdown and HTML are rendered together and reused across reruns
+        doc = ExportDocument(comparison_result, title="MFT Tool Comparison Result")
+        exports = render_exports(doc, ["txt", "md", "html"])
+        labels = {"txt": "Download as TXT", "md": "Download as Markdown (.md)", "html": "Download as HTML"}
+        for fmt, data in exports.items():
+            if isinstance(data, Exception):
+                st.error(f"❌ {fmt.upper()} export failed: {data}")
+                continue
             st.download_button(
-                label="Download as Markdown (.md)",
-                data=md_buffer,
-                file_name="mft_comparison.md",
-                mime="text/markdown"
+                label=labels[fmt],
+                data=data,
+                file_name=file_name(fmt, "mft_comparison"),
+                mime=mime_type(fmt)
             )
-        except Exception as e:
-            st.error(f"❌ Markdown export failed: {e}")
-
-        # Export to HTML file
-        try:
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="utf-8">
-                <title>MFT Comparison</title>
-            </head>
-            <body>
-                <h1>MFT Tool Comparison Result</h1>
-                <pre>{comparison_result}</pre>
-            </body>
-            </html>
-            """
-            html_buffer = BytesIO(html_content.encode("utf-8"))
-            st.download_button(
-                label="Download as HTML",
-                data=html_buffer,
-                file_name="mft_comparison.html",
-                mime="text/html"
-            )
-        except Exception as e:
-            st.error(f"❌ HTML export failed: {e}")
-
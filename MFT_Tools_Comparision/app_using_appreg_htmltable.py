@@ -1,8 +1,13 @@
+import os
+import sys
 import streamlit as st
-import pandas as pd
-from io import BytesIO
 from backend_using_appreg_test import run_agent_workflow
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.exports import ExportDocument, render_exports, file_name, mime_type
+from common.markdown_tables import parse_markdown_table
+from tco_panel import show_tco_calculator
+
 st.set_page_config(page_title="MFT Tool Comparator", layout="centered")
 st.title("🔐 MFT Tool Comparison Assistant")
 st.markdown("Enter your requirements and select MFT tools to compare.")
@@ -24,6 +29,9 @@ with st.expander("🧰 Select MFT Tools to Compare"):
 
 selected_tools = [tool for tool, checked in tools.items() if checked]
 
+# 💰 Cost questions are answered locally from the cost sheet
+show_tco_calculator(selected_tools)
+
 # 📝 Prompt input
 user_prompt = st.text_area(
     "Your Requirements",
@@ -51,49 +59,20 @@ if st.button("Compare Tools"):
         # Export options
         st.markdown("### 📤 Export Options")
 
-        # TXT export
-        st.download_button(
-            label="Download as TXT",
-            data=comparison_result,
-            file_name="mft_comparison.txt",
-            mime="text/plain"
-        )
-
-        # Markdown export
-        try:
-            md_buffer = BytesIO(comparison_result.encode("utf-8"))
-            st.download_button(
-                label="Download as Markdown (.md)",
-                data=md_buffer,
-                file_name="mft_comparison.md",
-                mime="text/markdown"
-            )
-        except Exception as e:
-            st.error(f"❌ Markdown export failed: {e}")
-
-        # HTML export with table handling
-        try:
-            html_content = "<!DOCTYPE html><html><head><meta charset='utf-8'><title>MFT Comparison</title></head><body>"
-            html_content += "<h1>MFT Tool Comparison Result</h1>"
-
-            # Try to detect tabular structure
-            try:
-                # If the response looks like CSV/Markdown table, attempt to parse
-                df = pd.read_csv(BytesIO(comparison_result.encode("utf-8")), sep="|", engine="python")
-                html_content += df.to_html(index=False, escape=False)
-            except Exception:
-                # Fallback: render as preformatted text
-                html_content += f"<pre>{comparison_result}</pre>"
+        # First Markdown table of the response, if any, for the HTML export
+        table = parse_markdown_table(comparison_result)
 
-            html_content += "</body></html>"
-
-            html_buffer = BytesIO(html_content.encode("utf-8"))
+        # TXT, Markdown and HTML are rendered together and reused across reruns
+        doc = ExportDocument(comparison_result, table=table, title="MFT Tool Comparison Result")
+        exports = render_exports(doc, ["txt", "md", "html"])
+        labels = {"txt": "Download as TXT", "md": "Download as Markdown (.md)", "html": "Download as HTML"}
+        for fmt, data in exports.items():
+            if isinstance(data, Exception):
+                st.error(f"❌ {fmt.upper()} export failed: {data}")
+                continue
             st.download_button(
-                label="Download as HTML",
-                data=html_buffer,
-                file_name="mft_comparison.html",
-                mime="text/html"
+                label=labels[fmt],
+                data=data,
+                file_name=file_name(fmt, "mft_comparison"),
+                mime=mime_type(fmt)
             )
-        except Exception as e:
-            st.error(f"❌ HTML export failed: {e}")
-
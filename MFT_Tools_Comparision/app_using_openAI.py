@@ -1,8 +1,12 @@
+import os
+import sys
 import streamlit as st
-import pandas as pd
-from io import BytesIO
 from backend import get_comparison
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.exports import ExportDocument, render_exports, file_name, mime_type
+from tco_panel import show_tco_calculator
+
 st.set_page_config(page_title="MFT Tool Comparator", layout="centered")
 st.title("🔐 MFT Tool Comparison Assistant")
 st.markdown("Enter your requirements and select MFT tools to compare.")
@@ -24,6 +28,9 @@ with st.expander("🧰 Select MFT Tools to Compare"):
 
 selected_tools = [tool for tool, checked in tools.items() if checked]
 
+# 💰 Cost questions are answered locally from the cost sheet
+show_tco_calculator(selected_tools)
+
 # 📝 Prompt input
 user_prompt = st.text_area("Your Requirements", placeholder="e.g., SFTP,FTPS support, cloud integration like sharepoint, MQ, S3 or blob")
 
@@ -43,14 +50,16 @@ if st.button("Compare Tools"):
                 st.markdown("### 📊 Structured Comparison Table")
                 st.dataframe(result_df)
 
-                buffer = BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    result_df.to_excel(writer, index=False, sheet_name="MFT Comparison")
-                st.download_button(
-                    label="📥 Download Excel",
-                    data=buffer.getvalue(),
-                    file_name="mft_comparison.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+                doc = ExportDocument(result_text, result_df, title="MFT Tool Comparison Result")
+                xlsx = render_exports(doc, ["xlsx"])["xlsx"]
+                if isinstance(xlsx, Exception):
+                    st.error(f"❌ Excel export failed: {xlsx}")
+                else:
+                    st.download_button(
+                        label="📥 Download Excel",
+                        data=xlsx,
+                        file_name=file_name("xlsx", "mft_comparison"),
+                        mime=mime_type("xlsx")
+                    )
             else:
                 st.info("No structured table found in the response.")
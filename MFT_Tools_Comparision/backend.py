@@ -8,6 +8,12 @@ Usage:
     from backend import get_comparison
     raw_text, df = get_comparison(user_prompt, selected_tools, uploaded_files)
 
+    # Ignore the fact cache: one free-form request, the agent's own table
+    raw_text, df = get_comparison(user_prompt, selected_tools, use_cache=False)
+
+    # One concurrent request per tool, cached per (tool, requirement), merged into one table
+    raw_text, df = get_comparison(user_prompt, selected_tools, fan_out=True)
+
 Notes:
 - Requires azure-identity and azure-ai-projects packages.
 - Configure environment variables: FOUNDARY_ENDPOINT, FOUNDARY_AGENT_NAME.
@@ -15,14 +21,23 @@ Notes:
 """
 
 import os
+import sys
 import logging
-from typing import List, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Tuple
 
 import pandas as pd
 import re
 
 from azure.identity import DefaultAzureCredential
-from azure.ai.projects import AIProjectClient
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.foundry import CachedTokenCredential, get_openai_client, response_text
+from common.markdown_tables import parse_markdown_table
+from common.metrics import get_metrics, usage_fields
+from common.singleflight import get_flight, request_key
+from fact_cache import get_fact_cache, normalize_facet
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,71 +49,253 @@ FOUNDARY_ENDPOINT = os.getenv(
     "https://pradeepazaifoundry.services.ai.azure.com/api/projects/mftcomparision",
 )
 FOUNDARY_AGENT_NAME = os.getenv("FOUNDARY_AGENT_NAME", "agentMFTtoolscomparison")
+FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", "9"))
+
+TOOL_PROMPT_TEMPLATE = (
+    "Selected tools: {tool}\n"
+    "Requirements:\n{requirements}\n\n"
+    "Evaluate only {tool} against each numbered requirement. Answer with a short explanation "
+    "followed by one Markdown table with the columns | # | Requirement | Support | Details |, "
+    "one row per requirement in the same order, where Support is Yes, Partial or No.\n"
+)
+
+MATRIX_PROMPT_TEMPLATE = (
+    "Selected tools: {tools}\n"
+    "Requirements:\n{requirements}\n\n"
+    "{needed}"
+    "Answer with a short explanation followed by one Markdown table with the columns "
+    "| # | Requirement | {columns} |, one row per requirement in the same order. Each tool cell is "
+    "Yes, Partial or No, then \" – \" and a short detail.\n"
+)
 
 # Initialize clients (lazily to avoid side effects on import)
-_project_client: Optional[AIProjectClient] = None
+_credential: Optional[CachedTokenCredential] = None
 _openai_client = None
+_init_lock = threading.Lock()
 
 
 def _init_clients():
-    global _project_client, _openai_client
-    if _project_client is None:
-        credential = DefaultAzureCredential()
-        _project_client = AIProjectClient(endpoint=FOUNDARY_ENDPOINT, credential=credential)
-        logger.info("Initialized AIProjectClient for endpoint: %s", FOUNDARY_ENDPOINT)
-    if _openai_client is None:
-        _openai_client = _project_client.get_openai_client()
-        logger.info("Retrieved OpenAI client from project client")
+    global _credential, _openai_client
+    with _init_lock:
+        if _openai_client is not None:
+            return
+        _credential = CachedTokenCredential(DefaultAzureCredential())
+        _openai_client = get_openai_client(FOUNDARY_ENDPOINT, _credential)
+
+
+def split_requirements(prompt: str) -> List[str]:
+    """Requirements as a list: one per line, comma or semicolon of the free-text prompt."""
+    parts = re.split(r"[\n;,]+", prompt)
+    return [re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", part).strip() for part in parts if part.strip()]
+
+
+def _ask_agent(user_message: str) -> str:
+    """One agent call; returns the response text or raises. Identical messages in flight share the call."""
+    key = request_key(FOUNDARY_ENDPOINT, FOUNDARY_AGENT_NAME, user_message)
+    return get_flight("comparison").do(key, _create_response, user_message)
+
+
+def _create_response(user_message: str) -> str:
+    _init_clients()
+    with get_metrics().span("agent.response", bytes=len(user_message)) as span:
+        response = _openai_client.responses.create(
+            input=[{"role": "user", "content": user_message}],
+            extra_body={"agent": {"name": FOUNDARY_AGENT_NAME, "type": "agent_reference"}},
+        )
+        span.update(usage_fields(getattr(response, "usage", None)))
+    raw_text = response_text(response)
+    if not raw_text:
+        raise RuntimeError("Agent returned no textual output.")
+    return raw_text
+
+
+def _tool_table(requirements: List[str], cells: dict) -> pd.DataFrame:
+    rows = []
+    for i, req in enumerate(requirements, 1):
+        support, details = cells.get(normalize_facet(req), ("", ""))
+        rows.append([str(i), req, support, details])
+    return pd.DataFrame(rows, columns=["#", "Requirement", "Support", "Details"])
 
 
-def parse_markdown_table(markdown: str) -> pd.DataFrame:
+def _evaluate_tool(tool: str, requirements: List[str], use_cache: bool = True) -> Tuple[str, str, pd.DataFrame]:
     """
-    Parse the first Markdown table found in the text into a pandas DataFrame.
-    Returns an empty DataFrame if no valid table is found.
+    Answer every requirement for one tool. Cells already in the fact cache are
+    reused; only the missing requirements go to the agent, and its answers
+    are stored back per (tool, facet).
     """
-    # Collect lines that look like table rows (contain pipes)
-    lines = [line.strip() for line in markdown.splitlines() if "|" in line]
-    if not lines:
-        return pd.DataFrame()
-
-    # Normalize and split rows
-    rows = [re.split(r'\s*\|\s*', line.strip("| ")) for line in lines]
-
-    # Find header and separator rows (header followed by a separator like ---)
-    if len(rows) >= 2 and all(re.match(r'^-+$', cell.strip('- ')) for cell in rows[1]):
-        header = rows[0]
-        data_rows = rows[2:]
-    else:
-        # If no explicit separator, assume first row is header and rest are data
-        header = rows[0]
-        data_rows = rows[1:]
-
-    # Clean header and rows
-    header = [h.strip() for h in header if h.strip() != ""]
-    cleaned_rows = []
-    for r in data_rows:
-        # Pad or trim to match header length
-        r = [c.strip() for c in r]
-        if len(r) < len(header):
-            r += [""] * (len(header) - len(r))
-        cleaned_rows.append(r[: len(header)])
+    cache = get_fact_cache() if use_cache else None
+    facets = {normalize_facet(req): req for req in requirements}
+    cells = cache.get_many(tool, list(facets)) if cache else {}
+    missing = [req for facet, req in facets.items() if facet not in cells]
+    if not missing:
+        return tool, f"All {len(facets)} answers for {tool} served from the fact cache.", _tool_table(requirements, cells)
 
+    numbered = "\n".join(f"{i}. {req}" for i, req in enumerate(missing, 1))
     try:
-        df = pd.DataFrame(cleaned_rows, columns=header)
-    except Exception:
-        df = pd.DataFrame()
-    return df
+        raw_text = _ask_agent(TOOL_PROMPT_TEMPLATE.format(tool=tool, requirements=numbered))
+    except Exception as e:
+        logger.exception("Error evaluating %s: %s", tool, e)
+        return tool, f"❌ Error calling agent: {str(e)}", pd.DataFrame()
+
+    answered = {}
+    for position, (_, row) in enumerate(parse_markdown_table(raw_text, infer_types=False).iterrows()):
+        number = str(row.get("#", "")).strip().rstrip(".")
+        index = int(number) - 1 if number.isdigit() else position
+        support = str(row.get("Support", "")).strip()
+        if 0 <= index < len(missing) and support:
+            answered[normalize_facet(missing[index])] = (support, str(row.get("Details", "")).strip())
+    if cache and answered:
+        cache.set_many(tool, answered)
+    cells.update(answered)
+    if len(missing) < len(facets):
+        raw_text += f"\n\n_{len(facets) - len(missing)} of {len(facets)} answers served from the fact cache._"
+    return tool, raw_text, _tool_table(requirements, cells)
+
+
+def iter_tool_evaluations(prompt: str, tools: List[str],
+                          use_cache: bool = True) -> Iterator[Tuple[str, str, pd.DataFrame]]:
+    """
+    Evaluate every tool against the requirements in its own concurrent agent
+    request and yield (tool, raw_text, table) as each one finishes, so callers
+    can show partial results. A failed tool yields its error text and an
+    empty table instead of stopping the others. With use_cache, only
+    (tool, requirement) cells missing from the fact cache are asked for.
+    """
+    requirements = split_requirements(prompt)
+    if not tools:
+        return
+    with ThreadPoolExecutor(max_workers=min(FANOUT_CONCURRENCY, len(tools)), thread_name_prefix="fanout") as pool:
+        futures = [pool.submit(_evaluate_tool, tool, requirements, use_cache) for tool in tools]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _support_cell(row: pd.Series) -> str:
+    return _join_cell(str(row.get("Support", "")).strip(), str(row.get("Details", "")).strip())
+
+
+def _join_cell(support: str, details: str) -> str:
+    return f"{support} – {details}" if support and details else support or details
+
+
+def merge_tool_results(prompt: str, tools: List[str],
+                       results: List[Tuple[str, str, pd.DataFrame]]) -> Tuple[str, pd.DataFrame]:
+    """
+    Build the comparison (requirements x tools) from per-tool tables, columns
+    in the order of tools. Rows are matched by requirement number, falling
+    back to row order.
+    Returns (markdown_text, dataframe) shaped like a single get_comparison answer.
+    """
+    requirements = split_requirements(prompt)
+    table = pd.DataFrame({"Requirement": requirements})
+    sections = []
+    order = {tool: i for i, tool in enumerate(tools)}
+    for tool, raw_text, df in sorted(results, key=lambda result: order.get(result[0], len(order))):
+        sections.append(f"### {tool}\n\n{raw_text}")
+        column = [""] * len(requirements)
+        if not df.empty:
+            for position, (_, row) in enumerate(df.iterrows()):
+                number = str(row.get("#", "")).strip().rstrip(".")
+                index = int(number) - 1 if number.isdigit() else position
+                if 0 <= index < len(requirements):
+                    column[index] = _support_cell(row)
+        elif raw_text.startswith("❌"):
+            column = ["error"] * len(requirements)
+        table[tool] = column
+
+    raw_text = "\n".join(["## Comparison", "", _table_markdown(table), "", *sections])
+    return raw_text, table
+
+
+def _table_markdown(table: pd.DataFrame) -> str:
+    header = "| " + " | ".join(table.columns) + " |"
+    separator = "|" + "---|" * len(table.columns)
+    rows = ["| " + " | ".join(str(v).replace("|", "\\|") for v in values) + " |" for values in table.itertuples(index=False)]
+    return "\n".join([header, separator, *rows])
+
 
+def _split_cell(cell: str) -> Tuple[str, str]:
+    """("Yes", "detail") from a matrix cell such as "Yes – detail"."""
+    parts = re.split(r"\s+[–—-]\s+", cell.strip(), maxsplit=1)
+    return parts[0].strip(), parts[1].strip() if len(parts) > 1 else ""
 
-def get_comparison(prompt: str, tools: List[str], uploaded_files: Optional[List[str]] = None) -> Tuple[str, pd.DataFrame]:
+
+def _compare_missing(prompt: str, tools: List[str]) -> Tuple[str, pd.DataFrame]:
+    """
+    One request for all tools that only asks for the (tool, requirement) cells
+    missing from the fact cache, then stores the new answers per cell.
+    The table is requirements x tools, like merge_tool_results.
+    """
+    cache = get_fact_cache()
+    requirements = split_requirements(prompt)
+    facets = [normalize_facet(req) for req in requirements]
+    cells = {tool: cache.get_many(tool, facets) for tool in tools}
+    needed = {tool: [i for i, facet in enumerate(facets) if facet not in cells[tool]] for tool in tools}
+    needed = {tool: rows for tool, rows in needed.items() if rows}
+
+    explanation = f"All {len(facets) * len(tools)} answers served from the fact cache."
+    if needed:
+        asked_rows = sorted({i for rows in needed.values() for i in rows})
+        asked_tools = [tool for tool in tools if tool in needed]
+        numbered = "\n".join(f"{n}. {requirements[i]}" for n, i in enumerate(asked_rows, 1))
+        # Cells already cached inside the asked rows/columns are listed so the agent can skip them
+        partial = any(len(needed[tool]) < len(asked_rows) for tool in asked_tools)
+        needed_text = ""
+        if partial:
+            needed_text = "Only these cells are needed (other cells may be left as -): " + "; ".join(
+                f"{tool}: {', '.join(str(asked_rows.index(i) + 1) for i in needed[tool])}" for tool in asked_tools
+            ) + "\n"
+        message = MATRIX_PROMPT_TEMPLATE.format(tools=", ".join(asked_tools), requirements=numbered,
+                                                needed=needed_text, columns=" | ".join(asked_tools))
+        try:
+            explanation = _ask_agent(message)
+        except Exception as e:
+            logger.exception("Error calling Foundry agent: %s", e)
+            return f"❌ Error calling agent: {str(e)}", pd.DataFrame()
+
+        for position, (_, row) in enumerate(parse_markdown_table(explanation, infer_types=False).iterrows()):
+            number = str(row.get("#", "")).strip().rstrip(".")
+            index = int(number) - 1 if number.isdigit() else position
+            if not 0 <= index < len(asked_rows):
+                continue
+            requirement = asked_rows[index]
+            for tool in asked_tools:
+                support, details = _split_cell(str(row.get(tool, "")))
+                if requirement in needed[tool] and support and support != "-":
+                    cells[tool][facets[requirement]] = (support, details)
+        for tool in asked_tools:
+            answered = {facets[i]: cells[tool][facets[i]] for i in needed[tool] if facets[i] in cells[tool]}
+            if answered:
+                cache.set_many(tool, answered)
+        cached = len(facets) * len(tools) - sum(len(rows) for rows in needed.values())
+        if cached:
+            explanation += f"\n\n_{cached} of {len(facets) * len(tools)} answers served from the fact cache._"
+
+    table = pd.DataFrame({"Requirement": requirements})
+    for tool in tools:
+        table[tool] = [_join_cell(*cells[tool].get(facet, ("", ""))) for facet in facets]
+    return "\n".join(["## Comparison", "", _table_markdown(table), "", explanation]), table
+
+
+def get_comparison(prompt: str, tools: List[str], uploaded_files: Optional[List[str]] = None,
+                   fan_out: bool = False, use_cache: bool = True) -> Tuple[str, pd.DataFrame]:
     """
     Call the configured Foundry agent with the user's prompt and selected tools.
+    By default one request covers all tools and only asks for the
+    (tool, requirement) cells missing from the fact cache; the table is
+    requirements x tools. With fan_out=True each tool is evaluated in its own
+    concurrent request instead (see iter_tool_evaluations / merge_tool_results).
+    fan_out=False with use_cache=False sends the free-form request and returns
+    the agent's own table.
 
     Returns:
         (raw_text, dataframe) where raw_text is the agent's full textual response,
         and dataframe is the parsed Markdown table (or empty DataFrame on failure).
     """
-    _init_clients()
+    if fan_out:
+        return merge_tool_results(prompt, tools, list(iter_tool_evaluations(prompt, tools, use_cache)))
+    if use_cache and tools:
+        return _compare_missing(prompt, tools)
 
     # Build user message content
     tool_list = ", ".join(tools) if tools else "No tools selected"
@@ -110,39 +307,9 @@ def get_comparison(prompt: str, tools: List[str], uploaded_files: Optional[List[
 
     try:
         # Reference the agent and request a response
-        response = _openai_client.responses.create(
-            input=[{"role": "user", "content": user_message}],
-            extra_body={"agent": {"name": FOUNDARY_AGENT_NAME, "type": "agent_reference"}},
-        )
+        raw_text = _ask_agent(user_message)
 
-        # Prefer output_text if available (simple), otherwise try to extract from output structure
-        raw_text = getattr(response, "output_text", None)
-        if not raw_text:
-            # Fallback: try to extract textual content from response.output
-            raw_text_parts = []
-            for item in getattr(response, "output", []) or []:
-                # Each item may have 'content' or 'text' fields depending on SDK version
-                content = item.get("content") if isinstance(item, dict) else None
-                if content:
-                    # content may be a list of dicts
-                    if isinstance(content, list):
-                        for c in content:
-                            if isinstance(c, dict) and "text" in c:
-                                raw_text_parts.append(c["text"])
-                            elif isinstance(c, str):
-                                raw_text_parts.append(c)
-                    elif isinstance(content, str):
-                        raw_text_parts.append(content)
-                # Try 'text' field directly
-                text = item.get("text") if isinstance(item, dict) else None
-                if text:
-                    raw_text_parts.append(text)
-            raw_text = "\n\n".join(raw_text_parts).strip()
-
-        if not raw_text:
-            raise RuntimeError("Agent returned no textual output.")
-
-        # Parse the first Markdown table found in the response
+        # Parse the first Markdown table found in the response (typed columns)
         df = parse_markdown_table(raw_text)
 
         return raw_text, df
@@ -1,47 +1,59 @@
 import logging
 import os
+import sys
 import streamlit as st
-import httpx
 from azure.identity import ClientSecretCredential
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.foundry import CachedTokenCredential, get_http_client
+from common.metrics import get_metrics, usage_fields
+from common.singleflight import get_flight, request_key
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-tenant_id = st.secrets["AZURE_TENANT_ID"]
-client_id = st.secrets["AZURE_CLIENT_ID"]
-client_secret = st.secrets["AZURE_CLIENT_SECRET"]
+# Streamlit secrets; environment variables take precedence (local stand-in)
+tenant_id = os.getenv("AZURE_TENANT_ID") or st.secrets["AZURE_TENANT_ID"]
+client_id = os.getenv("AZURE_CLIENT_ID") or st.secrets["AZURE_CLIENT_ID"]
+client_secret = os.getenv("AZURE_CLIENT_SECRET") or st.secrets["AZURE_CLIENT_SECRET"]
 
-FOUNDARY_ENDPOINT = st.secrets["FOUNDARY_ENDPOINT"]
-FOUNDARY_AGENT_NAME = st.secrets["FOUNDARY_AGENT_NAME"]
-PROJECT_NAME = st.secrets.get("FOUNDARY_PROJECT_NAME", "GoAMFT_workflow_agentic")
-API_VERSION = st.secrets.get("OPENAI_API_VERSION", "2025-11-15-preview")
+FOUNDARY_ENDPOINT = os.getenv("FOUNDARY_ENDPOINT") or st.secrets["FOUNDARY_ENDPOINT"]
+FOUNDARY_AGENT_NAME = os.getenv("FOUNDARY_AGENT_NAME") or st.secrets["FOUNDARY_AGENT_NAME"]
+PROJECT_NAME = os.getenv("FOUNDARY_PROJECT_NAME") or st.secrets.get("FOUNDARY_PROJECT_NAME", "GoAMFT_workflow_agentic")
+API_VERSION = os.getenv("OPENAI_API_VERSION") or st.secrets.get("OPENAI_API_VERSION", "2025-11-15-preview")
 
-credential = ClientSecretCredential(tenant_id, client_id, client_secret)
+credential = CachedTokenCredential(ClientSecretCredential(tenant_id, client_id, client_secret))
+# Identical prompts from concurrent sessions share one agent call
+flight = get_flight("agent")
 
 def run_agent_workflow(prompt: str) -> str:
     try:
-        url = f"{FOUNDARY_ENDPOINT}/api/projects/{PROJECT_NAME}/agents/{FOUNDARY_AGENT_NAME}/responses?api-version={API_VERSION}"
+        return flight.do(request_key(FOUNDARY_ENDPOINT, PROJECT_NAME, FOUNDARY_AGENT_NAME, prompt), _post_prompt, prompt)
+    except Exception as e:
+        logger.exception("Error calling Foundry agent")
+        return f"❌ Error: {e}"
 
-        # IMPORTANT: request token for Foundry resource, not Cognitive Services
-        scope = f"{FOUNDARY_ENDPOINT}/.default"
-        token = credential.get_token(scope).token
+def _post_prompt(prompt: str) -> str:
+    url = f"{FOUNDARY_ENDPOINT}/api/projects/{PROJECT_NAME}/agents/{FOUNDARY_AGENT_NAME}/responses?api-version={API_VERSION}"
 
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
+    # IMPORTANT: request token for Foundry resource, not Cognitive Services
+    scope = f"{FOUNDARY_ENDPOINT}/.default"
+    token = credential.get_token(scope).token
 
-        body = {
-            "input": [{"role": "user", "content": prompt}],
-            "version": "latest"
-        }
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json"
+    }
 
-        resp = httpx.post(url, headers=headers, json=body, timeout=60)
-        resp.raise_for_status()
+    body = {
+        "input": [{"role": "user", "content": prompt}],
+        "version": "latest"
+    }
 
+    with get_metrics().span("agent.response", bytes=len(prompt)) as span:
+        resp = get_http_client().post(url, headers=headers, json=body, timeout=60)
+        resp.raise_for_status()
         data = resp.json()
-        return data.get("output_text", str(data))
-    except Exception as e:
-        logger.exception("Error calling Foundry agent")
-        return f"❌ Error: {e}"
+        span.update(usage_fields(data.get("usage")))
+    return data.get("output_text", str(data))
 
@@ -1,9 +1,12 @@
 import openai
 from openai import AzureOpenAI
 import os
+import sys
 from dotenv import load_dotenv
 import pandas as pd
-import re
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.markdown_tables import parse_markdown_table
 
 #load_dotenv()
 
@@ -52,8 +55,3 @@ def get_comparison(prompt: str, tools: list):
     except Exception as e:
         # Always return a tuple
         return f"❌ Error: {str(e)}", pd.DataFrame()
-
-def parse_markdown_table(markdown: str) -> pd.DataFrame:
-    lines = [line.strip() for line in markdown.splitlines() if "|" in line]
-    rows = [re.split(r'\s*\|\s*', line.strip("|")) for line in lines]
-    return pd.DataFrame(rows[2:], columns=rows[0]) if len(rows) > 2 else pd.DataFrame()
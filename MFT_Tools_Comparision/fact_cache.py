@@ -0,0 +1,119 @@
+# fact_cache.py
+"""
+Cell-level cache for tool comparisons: one answer (support, details) per
+(tool, facet), where a facet is a normalized requirement ("SFTP support",
+"sftp" and "Support for SFTP" are all "sftp"). Entries expire after a TTL so
+vendor changes are picked up eventually.
+
+    from fact_cache import get_fact_cache, normalize_facet
+    cache = get_fact_cache()
+    cached = cache.get_many("GoAnywhere MFT", ["sftp", "s3"])   # {facet: (support, details)}
+    cache.set_many("GoAnywhere MFT", {"sftp": ("Yes", "Native SFTP server and client")})
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+FACT_CACHE_PATH = os.getenv("FACT_CACHE_PATH", os.path.join(os.path.dirname(__file__), ".fact_cache.sqlite3"))
+FACT_CACHE_TTL = int(os.getenv("FACT_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Words that do not change what is being asked about
+_FILLER = {"support", "supports", "supported", "for", "of", "the", "a", "an", "with", "and", "or",
+           "capability", "capabilities", "feature", "features", "integration", "integrations",
+           "protocol", "protocols", "compliance", "compliant", "like", "such", "as", "via", "using"}
+_SYNONYMS = {
+    "amazon s3": "s3", "aws s3": "s3",
+    "azure blob": "blob", "azure blob storage": "blob", "blob storage": "blob",
+    "ibm mq": "mq", "websphere mq": "mq",
+    "ftp over ssl": "ftps", "ftp over tls": "ftps",
+    "ssh file transfer": "sftp",
+    "high availability": "ha", "clustering": "ha",
+    "single sign on": "sso",
+}
+
+
+def normalize_facet(requirement):
+    """Canonical form of one requirement: lowercase words without filler, synonyms folded."""
+    text = re.sub(r"[^a-z0-9+]+", " ", requirement.lower()).strip()
+    for phrase, canonical in _SYNONYMS.items():
+        text = re.sub(rf"\b{phrase}\b", canonical, text)
+    words = [word for word in text.split() if word not in _FILLER]
+    return " ".join(words) or text
+
+
+class FactCache:
+    """SQLite store of (tool, facet) -> (support, details) with a TTL."""
+
+    def __init__(self, path=FACT_CACHE_PATH, ttl=FACT_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS facts ("
+            " tool TEXT NOT NULL, facet TEXT NOT NULL, support TEXT NOT NULL, details TEXT NOT NULL,"
+            " created REAL NOT NULL, PRIMARY KEY (tool, facet))"
+        )
+        self._conn.commit()
+
+    def get_many(self, tool, facets):
+        """Cached, unexpired cells of tool for facets: {facet: (support, details)}."""
+        facets = list(dict.fromkeys(facets))
+        if not facets:
+            return {}
+        oldest = time.time() - self.ttl if self.ttl else 0
+        marks = ",".join("?" * len(facets))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT facet, support, details FROM facts WHERE tool = ? AND created >= ? AND facet IN ({marks})",
+                (tool, oldest, *facets),
+            ).fetchall()
+            found = {facet: (support, details) for facet, support, details in rows}
+            self.hits += len(found)
+            self.misses += len(facets) - len(found)
+        return found
+
+    def set_many(self, tool, cells):
+        """Store {facet: (support, details)} for tool."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO facts (tool, facet, support, details, created) VALUES (?, ?, ?, ?, ?)",
+                [(tool, facet, support, details, now) for facet, (support, details) in cells.items()],
+            )
+            if self.ttl:
+                self._conn.execute("DELETE FROM facts WHERE created < ?", (now - self.ttl,))
+            self._conn.commit()
+
+    def clear(self, tool=None):
+        with self._lock:
+            if tool is None:
+                self._conn.execute("DELETE FROM facts")
+            else:
+                self._conn.execute("DELETE FROM facts WHERE tool = ?", (tool,))
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM facts").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0, "entries": entries}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_fact_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FactCache()
+        return _cache
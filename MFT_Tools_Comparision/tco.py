@@ -0,0 +1,244 @@
+# tco.py
+"""
+Local total-cost-of-ownership engine over Tools_Dummy_cost.txt.
+
+    from tco import load_cost_table, tco, compare_scenarios
+    costs, addons = load_cost_table()
+    tco(costs, addons, years=5, model="subscription", servers=2, agents=10, addon_names=["High Availability"])
+
+load_cost_table() parses the free-text cost sheet once into typed columns
+(one row per tool, amounts in USD, periods normalized to one-time or per
+year) plus a long table of add-ons. tco() prices a scenario for every tool
+at once with NumPy arrays, so cost questions need no agent call.
+
+Pricing rules, applied the same way to every tool:
+- perpetual: license x servers once; support % of the license and of
+  one-time add-ons every year.
+- subscription: subscription x servers every year; support % only on
+  one-time add-ons.
+- saas: hosted fee every year (the subscription price where the sheet
+  says the fee is included in it).
+- fixed support fees (e.g. AWS support plan), recurring add-ons and
+  third-party costs are added in every model. Third-party items marked
+  "variable" or "if required" are left out.
+A tool that does not offer the chosen model gets NaN costs.
+"""
+
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+COST_FILE = os.path.join(os.path.dirname(__file__), "Tools_Dummy_cost.txt")
+MODELS = ("perpetual", "subscription", "saas")
+
+_AMOUNT = re.compile(r"([\d,]+(?:\.\d+)?)\s*USD")
+# "Key: value", where the key may carry a parenthesized hint such as "(name : price)"
+_FIELD = re.compile(r"([^:(]+(?:\([^)]*\))?)\s*:\s*(.*)")
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _amounts(text):
+    return [float(value.replace(",", "")) for value in _AMOUNT.findall(text)]
+
+
+def _annual_factor(text):
+    """12 for monthly prices, 1 for yearly prices, 0 for one-time prices."""
+    text = text.lower()
+    if "month" in text:
+        return 12
+    if "year" in text or "annual" in text:
+        return 1
+    return 0
+
+
+def _items(text):
+    """(name, price text) pairs of a ';'-separated "name : price" list."""
+    for item in text.split(";"):
+        name, _, price = item.partition(":")
+        if price.strip():
+            yield name.strip(), price.strip()
+
+
+def _parse_block(block):
+    fields = {}
+    for line in block.splitlines():
+        match = _FIELD.match(line.strip())
+        if match:
+            fields[match.group(1).strip().lower()] = match.group(2).strip()
+
+    row = {"tool": fields.get("tool", ""), "license_model": fields.get("license model", ""),
+           "perpetual_license": np.nan, "subscription_annual": np.nan, "subscription_unit": "",
+           "support_pct": 0.0, "support_fixed_annual": 0.0, "saas_annual": 0.0,
+           "services": 0.0, "training": 0.0, "third_party_one_time": 0.0, "third_party_annual": 0.0,
+           "stated_first_year": np.nan, "stated_recurring": np.nan, "notes": fields.get("notes", "")}
+
+    for part in re.split(r"\s/\s", fields.get("base license price", "")):
+        amounts = _amounts(part)
+        if not amounts:
+            continue
+        if "perpetual" in part.lower():
+            row["perpetual_license"] = amounts[0]
+            continue
+        factor = _annual_factor(part) or 1
+        row["subscription_annual"] = sum(amounts) * factor
+        unit = re.search(r"per (server|instance|tenant|core|cpu)", part.lower())
+        row["subscription_unit"] = unit.group(1) if unit else ("usage" if "usage" in part.lower() else "tenant")
+
+    support = fields.get("support & maintenance", "")
+    pct = re.search(r"(\d+(?:\.\d+)?)\s*%", support)
+    if pct:
+        row["support_pct"] = float(pct.group(1)) / 100
+    elif _amounts(support):
+        row["support_fixed_annual"] = _amounts(support)[0] * (_annual_factor(support) or 1)
+
+    saas = fields.get("cloud / saas fees", "")
+    saas_annual = sum(_amounts(saas)) * (_annual_factor(saas) or 1)
+    if saas.lower().startswith("included"):
+        saas_annual += 0 if np.isnan(row["subscription_annual"]) else row["subscription_annual"]
+    row["saas_annual"] = saas_annual
+
+    for key in ("services", "training"):
+        text = fields.get("implementation / professional services" if key == "services" else key, "")
+        row[key] = (_amounts(text) or [0.0])[0]
+
+    for _, price in _items(fields.get("third-party costs", "")):
+        amounts = _amounts(price)
+        if not amounts or "if required" in price.lower():
+            continue
+        factor = _annual_factor(price)
+        if factor:
+            row["third_party_annual"] += amounts[0] * factor
+        else:
+            row["third_party_one_time"] += amounts[0]
+
+    for key, column in (("total first-year cost (estimate)", "stated_first_year"),
+                        ("total recurring annual cost (estimate)", "stated_recurring")):
+        amounts = _amounts(fields.get(key, ""))
+        if amounts:
+            row[column] = amounts[0]
+
+    addons = []
+    for name, price in _items(fields.get("add-on modules (name : price)", "")):
+        amounts = _amounts(price)
+        if not amounts:
+            continue
+        per = "agent" if "per agent" in name.lower() else "each" if "each" in price.lower() else ""
+        addons.append({"tool": row["tool"], "addon": re.sub(r"\s*\(per agent\)", "", name).strip(),
+                       "price": amounts[0], "annual_factor": _annual_factor(price), "per": per})
+    return row, addons
+
+
+def parse_cost_sheet(text):
+    """Parse the cost sheet text into (costs, addons) DataFrames."""
+    rows, addons = [], []
+    for block in re.split(r"\n\s*\n", text.strip()):
+        if block.lstrip().lower().startswith("tool:"):
+            row, tool_addons = _parse_block(block)
+            rows.append(row)
+            addons.extend(tool_addons)
+    costs = pd.DataFrame(rows)
+    addons = pd.DataFrame(addons, columns=["tool", "addon", "price", "annual_factor", "per"])
+    addons["annual_factor"] = addons["annual_factor"].astype(np.int64)
+    return costs, addons
+
+
+def load_cost_table(path=COST_FILE):
+    """(costs, addons) for the cost sheet at path, re-parsed only when the file changes."""
+    mtime = os.path.getmtime(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    with open(path, encoding="utf-8") as f:
+        tables = parse_cost_sheet(f.read())
+    with _cache_lock:
+        _cache[path] = (mtime, tables)
+    return tables
+
+
+_GENERIC_WORDS = {"mft", "fortra", "progress", "the", "suite", "managed", "file", "transfer"}
+
+
+def _words(name):
+    return set(re.findall(r"[a-z0-9]+", name.lower())) - _GENERIC_WORDS
+
+
+def match_tools(names, costs):
+    """Map tool names as shown in the apps (e.g. "Cleo (CIC)") to cost sheet tool names."""
+    sheet = list(costs["tool"])
+    matched = {}
+    for name in names:
+        scores = [len(_words(name) & _words(tool)) for tool in sheet]
+        if scores and max(scores) > 0:
+            matched[name] = sheet[int(np.argmax(scores))]
+    return matched
+
+
+def tco(costs, addons, years=5, model="perpetual", servers=1, agents=0, connectors=1,
+        addon_names=(), include_services=True, include_training=True):
+    """
+    N-year cost of every tool in costs under one scenario. addon_names selects
+    add-ons by case-insensitive substring ("all" for every add-on); per-agent
+    add-ons are multiplied by agents, "each" add-ons by connectors.
+    Returns a DataFrame with one-time, annual, per-year and total costs.
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown pricing model: {model}")
+    costs = costs.reset_index(drop=True)
+    tool_index = {tool: i for i, tool in enumerate(costs["tool"])}
+    n_tools = len(tool_index)
+
+    # Add-ons: one vectorized pass over the long table, summed per tool
+    addons = addons[addons["tool"].isin(tool_index)]
+    names = addons["addon"].str.lower().to_numpy()
+    if "all" in addon_names:
+        selected = np.ones(len(addons), dtype=bool)
+    else:
+        selected = np.zeros(len(addons), dtype=bool)
+        for wanted in addon_names:
+            selected |= np.char.find(names.astype(str), wanted.lower()) >= 0
+    per = addons["per"].to_numpy()
+    quantity = np.where(per == "agent", agents, np.where(per == "each", connectors, 1))
+    spend = addons["price"].to_numpy() * quantity * selected
+    factor = addons["annual_factor"].to_numpy()
+    owner = addons["tool"].map(tool_index).to_numpy(dtype=np.int64)
+    addon_once = np.bincount(owner, weights=np.where(factor == 0, spend, 0.0), minlength=n_tools)
+    addon_annual = np.bincount(owner, weights=spend * factor, minlength=n_tools)
+
+    perpetual = costs["perpetual_license"].to_numpy() * servers
+    support_pct = costs["support_pct"].to_numpy()
+    one_time = (addon_once + costs["third_party_one_time"].to_numpy()
+                + include_services * costs["services"].to_numpy()
+                + include_training * costs["training"].to_numpy())
+    annual = (addon_annual + costs["support_fixed_annual"].to_numpy()
+              + costs["third_party_annual"].to_numpy() + support_pct * addon_once)
+    if model == "perpetual":
+        one_time = one_time + perpetual
+        annual = annual + support_pct * perpetual
+    elif model == "subscription":
+        annual = annual + costs["subscription_annual"].to_numpy() * servers
+    else:
+        saas = costs["saas_annual"].to_numpy()
+        annual = annual + np.where(saas > 0, saas, np.nan)
+
+    # (tools, years): one-time spend lands in year 1
+    yearly = np.repeat(annual[:, None], years, axis=1)
+    yearly[:, 0] += one_time
+
+    result = pd.DataFrame({"Tool": costs["tool"], "Model": model,
+                           "One-time (USD)": one_time, "Annual (USD)": annual})
+    for year in range(years):
+        result[f"Year {year + 1}"] = yearly[:, year]
+    result[f"{years}-year TCO (USD)"] = yearly.sum(axis=1)
+    return result
+
+
+def compare_scenarios(costs, addons, scenarios, years=5):
+    """Totals per tool (rows) for each named scenario (columns): {name: tco() keyword arguments}."""
+    totals = {name: tco(costs, addons, years=years, **kwargs)[f"{years}-year TCO (USD)"].to_numpy()
+              for name, kwargs in scenarios.items()}
+    return pd.DataFrame(totals, index=costs["tool"])
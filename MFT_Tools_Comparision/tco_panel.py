@@ -0,0 +1,39 @@
+# tco_panel.py
+import streamlit as st
+
+from tco import MODELS, compare_scenarios, load_cost_table, match_tools, tco
+
+
+def show_tco_calculator(selected_tools):
+    """Cost calculator over Tools_Dummy_cost.txt; answers locally, without an agent call."""
+    costs, addons = load_cost_table()
+    with st.expander("💰 Total Cost of Ownership (instant, from the cost sheet)"):
+        matched = match_tools(selected_tools, costs)
+        only_selected = st.checkbox("Only the selected tools", value=bool(matched), disabled=not matched)
+        if only_selected:
+            costs = costs[costs["tool"].isin(matched.values())]
+
+        col1, col2, col3 = st.columns(3)
+        years = col1.slider("Years", 1, 10, 5)
+        model = col2.selectbox("Pricing model", MODELS)
+        servers = col3.number_input("Servers / instances", min_value=1, value=1)
+        col1, col2 = st.columns(2)
+        agents = col1.number_input("Agents", min_value=0, value=0)
+        connectors = col2.number_input("Connectors / adapters", min_value=1, value=1)
+        addon_names = st.multiselect("Add-ons", sorted(addons["addon"].unique()))
+        col1, col2 = st.columns(2)
+        include_services = col1.checkbox("Include implementation services", value=True)
+        include_training = col2.checkbox("Include training", value=True)
+
+        scenario = {"servers": servers, "agents": agents, "connectors": connectors, "addon_names": addon_names,
+                    "include_services": include_services, "include_training": include_training}
+        result = tco(costs, addons, years=years, model=model, **scenario)
+        total = f"{years}-year TCO (USD)"
+        result = result.sort_values(total, na_position="last")
+        st.dataframe(result.style.format(precision=0, thousands=",", na_rep="n/a"), hide_index=True)
+        st.bar_chart(result.dropna(subset=[total]).set_index("Tool")[total])
+
+        st.markdown(f"**{years}-year TCO by pricing model**")
+        by_model = compare_scenarios(costs, addons, {m: dict(scenario, model=m) for m in MODELS}, years=years)
+        st.dataframe(by_model.style.format(precision=0, thousands=",", na_rep="n/a"))
+        st.caption("Estimates from Tools_Dummy_cost.txt; n/a means the tool is not sold under that model.")
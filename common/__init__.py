@@ -0,0 +1 @@
+# common: helpers shared by the analyzer, workflow and MFT comparison apps.
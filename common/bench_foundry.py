@@ -0,0 +1,133 @@
+# common/bench_foundry.py
+"""
+Per-call client overhead of the Foundry backends, before and after common.foundry.
+
+Runs against a local HTTP stand-in, so only client-side cost is measured:
+token acquisition (a fake credential sleeping --token-ms, like an AAD round
+trip), client construction and connection setup. Real endpoints add a TLS
+handshake on every fresh connection, so the pooled numbers gain more there.
+
+Usage:
+    python common/bench_foundry.py --calls 200 --token-ms 40
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from azure.core.credentials import AccessToken
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.foundry import CachedTokenCredential, credential_key, get_http_client, get_openai_client
+
+RESPONSE = json.dumps({
+    "id": "resp_bench", "object": "response", "created_at": 0, "status": "completed", "model": "bench",
+    "output": [{"type": "message", "id": "msg_bench", "role": "assistant", "status": "completed",
+                "content": [{"type": "output_text", "text": "ok", "annotations": []}]}],
+}).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+class SlowCredential:
+    """Stands in for ClientSecretCredential: every get_token costs one AAD round trip."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    def get_token(self, *scopes, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        return AccessToken("bench-token", int(time.time()) + 3600)
+
+
+def _timed(fn, calls, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda _: fn(), range(calls)))
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed / calls * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Foundry client overhead.")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent callers, like Streamlit sessions")
+    parser.add_argument("--token-ms", type=float, default=40, help="Simulated AAD token latency")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_port}"
+    url = f"{endpoint}/agents/bench/responses"
+    body = {"input": [{"role": "user", "content": "ping"}], "version": "latest"}
+    latency = args.token_ms / 1000
+
+    # REST path (backend_using_appreg_test.py)
+    raw = SlowCredential(latency)
+
+    def rest_before():
+        token = raw.get_token(f"{endpoint}/.default").token
+        httpx.post(url, headers={"Authorization": f"Bearer {token}"}, json=body, timeout=60).raise_for_status()
+
+    cached = CachedTokenCredential(SlowCredential(latency))
+
+    def rest_after():
+        token = cached.get_token(f"{endpoint}/.default").token
+        get_http_client().post(url, headers={"Authorization": f"Bearer {token}"}, json=body).raise_for_status()
+
+    results = [("rest: get_token + httpx.post", _timed(rest_before, args.calls, args.workers)),
+               ("rest: cached token + pool", _timed(rest_after, args.calls, args.workers))]
+
+    # SDK path (workflow backend.py): project + OpenAI client per call vs memoized client
+    try:
+        from azure.ai.projects import AIProjectClient
+    except ImportError:
+        AIProjectClient = None
+    if AIProjectClient is not None:
+        def request(client):
+            client.responses.create(input=[{"role": "user", "content": "ping"}],
+                                    extra_body={"agent": {"name": "bench", "type": "agent_reference"}})
+
+        sdk_raw = SlowCredential(latency)
+
+        def sdk_before():
+            request(AIProjectClient(endpoint=endpoint, credential=sdk_raw).get_openai_client())
+
+        sdk_cached = CachedTokenCredential(SlowCredential(latency))
+
+        def sdk_after():
+            request(get_openai_client(endpoint, sdk_cached, key=credential_key("bench-token")))
+
+        results += [("sdk: new clients per call", _timed(sdk_before, args.calls, args.workers)),
+                    ("sdk: shared client", _timed(sdk_after, args.calls, args.workers))]
+
+    server.shutdown()
+    print(f"calls={args.calls} workers={args.workers} token_latency={args.token_ms:.0f}ms")
+    for name, (elapsed, per_call) in results:
+        print(f"{name:32} total={elapsed:.2f}s per_call={per_call:.2f}ms")
+    print(f"token fetches: uncached={raw.calls} cached={cached.fetches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# common/bench_markdown_tables.py
+"""
+Benchmark common.markdown_tables on large multi-table agent responses.
+
+Compares the previous backend.py parse_markdown_table (first table only,
+every pipe line treated as one table) with extract_tables on the full text
+and on the same text fed as small stream chunks. Every tenth row is an
+all-N/A row of single dashes (| - | - |), and the run fails if any table
+is split or loses rows.
+
+Usage:
+    python common/bench_markdown_tables.py --tables 200 --rows 40 --runs 3
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.markdown_tables import TableExtractor, extract_tables
+
+TOOLS = ["GoAnywhere MFT", "Axway SecureTransport", "IBM Sterling MFT", "Progress MOVEit", "Cleo (CIC)"]
+
+
+def sample_response(tables, rows):
+    """Agent-style answer: prose and one comparison table per section, with numbers, ✓/✗ and escaped pipes."""
+    parts = []
+    for t in range(tables):
+        parts.append(f"### Requirement group {t + 1}\n\nThe tools below were compared on the requested capabilities.\n")
+        parts.append("| # | Capability | " + " | ".join(TOOLS) + " | Cost (USD) | Notes |")
+        parts.append("|---:|:---|" + ":---:|" * len(TOOLS) + "---:|---|")
+        for r in range(rows):
+            if r % 10 == 9:
+                # Not applicable for every column: dash-only data row, not an alignment row
+                parts.append("| " + " | ".join("-" for _ in range(len(TOOLS) + 4)) + " |")
+                continue
+            marks = " | ".join("✅" if (r + i) % 3 else "❌" for i in range(len(TOOLS)))
+            parts.append(f"| {r + 1} | Capability {r} | {marks} | {1000 + r * 250:,} | SFTP \\| FTPS via adapter |")
+        parts.append("")
+    return "\n".join(parts)
+
+
+def legacy_parse_markdown_table(markdown):
+    """The former backend.py implementation, kept here as the baseline."""
+    lines = [line.strip() for line in markdown.splitlines() if "|" in line]
+    if not lines:
+        return pd.DataFrame()
+    rows = [re.split(r'\s*\|\s*', line.strip("| ")) for line in lines]
+    if len(rows) >= 2 and all(re.match(r'^-+$', cell.strip('- ')) for cell in rows[1]):
+        header, data_rows = rows[0], rows[2:]
+    else:
+        header, data_rows = rows[0], rows[1:]
+    header = [h.strip() for h in header if h.strip() != ""]
+    cleaned_rows = []
+    for r in data_rows:
+        r = [c.strip() for c in r]
+        if len(r) < len(header):
+            r += [""] * (len(header) - len(r))
+        cleaned_rows.append(r[: len(header)])
+    try:
+        return pd.DataFrame(cleaned_rows, columns=header)
+    except Exception:
+        return pd.DataFrame()
+
+
+def streamed(text, chunk_size):
+    extractor = TableExtractor()
+    tables = []
+    for i in range(0, len(text), chunk_size):
+        tables.extend(extractor.feed(text[i:i + chunk_size]))
+    return tables + extractor.finish()
+
+
+def check_tables(label, tables, expected_tables, expected_rows):
+    """Regression check: one frame per table, none split by dash-only rows, all rows kept."""
+    problems = []
+    if len(tables) != expected_tables:
+        problems.append(f"{label}: {len(tables)} tables, expected {expected_tables}")
+    bad = [i for i, t in enumerate(tables) if len(t) != expected_rows]
+    if bad:
+        problems.append(f"{label}: {len(bad)} table(s) without {expected_rows} rows (first: #{bad[0] + 1})")
+    return problems
+
+
+def best_of(runs, fn):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark markdown table extraction.")
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument("--chunk", type=int, default=64, help="Stream chunk size in characters")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    text = sample_response(args.tables, args.rows)
+    legacy_time, legacy = best_of(args.runs, lambda: legacy_parse_markdown_table(text))
+    full_time, tables = best_of(args.runs, lambda: extract_tables(text))
+    raw_time, _ = best_of(args.runs, lambda: extract_tables(text, infer_types=False))
+    stream_time, stream_tables = best_of(args.runs, lambda: streamed(text, args.chunk))
+
+    rows = sum(len(t) for t in tables)
+    print(f"input={len(text) / 1024:.0f} KiB tables={args.tables} rows={args.tables * args.rows}")
+    print(f"legacy first-table parse  {legacy_time * 1000:8.1f} ms  -> 1 frame, {len(legacy)} rows (all tables merged)")
+    print(f"extract_tables typed      {full_time * 1000:8.1f} ms  -> {len(tables)} frames, {rows} rows")
+    print(f"extract_tables untyped    {raw_time * 1000:8.1f} ms")
+    print(f"streamed ({args.chunk}-char chunks)  {stream_time * 1000:8.1f} ms  -> {len(stream_tables)} frames")
+    print("dtypes:", ", ".join(f"{k}={v}" for k, v in tables[0].dtypes.astype(str).items()))
+
+    problems = (check_tables("extract_tables", tables, args.tables, args.rows)
+                + check_tables("streamed", stream_tables, args.tables, args.rows))
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
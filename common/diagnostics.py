@@ -0,0 +1,41 @@
+# common/diagnostics.py
+"""Streamlit diagnostics view over common.metrics: p50/p95 per stage, counters and exports."""
+
+import pandas as pd
+import streamlit as st
+
+from common.metrics import get_metrics
+
+
+def show_diagnostics():
+    metrics = get_metrics()
+    st.title("🩺 Diagnostics")
+    st.caption("Per-stage timings of this app process since it started (or since the last reset).")
+
+    stats = metrics.stats()
+    counters = stats.pop("counters")
+    if not stats:
+        st.info("Nothing recorded yet. Run a summary or comparison, then come back.")
+    else:
+        rows = []
+        for stage, data in stats.items():
+            rows.append({
+                "Stage": stage, "Count": data["count"],
+                "p50 (ms)": data["p50"] * 1000, "p95 (ms)": data["p95"] * 1000, "max (ms)": data["max"] * 1000,
+                "Prompt tokens": data.get("prompt_tokens", 0), "Completion tokens": data.get("completion_tokens", 0),
+                "Bytes": data.get("bytes", 0), "Items": data.get("items", 0),
+            })
+        df = pd.DataFrame(rows)
+        st.dataframe(df.style.format(precision=1, thousands=","), hide_index=True)
+        st.bar_chart(df.set_index("Stage")[["p50 (ms)", "p95 (ms)"]])
+    if counters:
+        st.markdown("**Counters**")
+        st.json(counters)
+
+    col1, col2, col3 = st.columns(3)
+    col1.download_button("Prometheus metrics", metrics.prometheus(), file_name="metrics.prom", mime="text/plain")
+    if metrics.jsonl_path:
+        col2.caption(f"Spans are appended to {metrics.jsonl_path}")
+    if col3.button("Reset"):
+        metrics.reset()
+        st.rerun()
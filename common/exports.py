@@ -0,0 +1,174 @@
+# common/exports.py
+"""
+Shared export pipeline for summary/comparison results.
+
+    from common.exports import ExportDocument, render_exports
+    doc = ExportDocument(result_text, table=result_df, title="MFT Tool Comparison Result")
+    files = render_exports(doc, ["md", "html", "xlsx", "pdf"])
+
+Formats are rendered concurrently in a shared thread pool and every artifact
+is memoized by (content hash, format, renderer), so Streamlit reruns and
+download buttons reuse the bytes instead of rendering again. Identical
+renders already in flight are shared as well.
+"""
+
+import hashlib
+import html
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+
+EXPORT_WORKERS = 4
+MEMO_SIZE = 128
+
+FORMATS = {
+    "txt": ("text/plain", "txt"),
+    "md": ("text/markdown", "md"),
+    "html": ("text/html", "html"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "pdf": ("application/pdf", "pdf"),
+}
+
+_pool = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+class ExportDocument:
+    """Text of a result plus an optional pandas DataFrame table; hashed once for memoization."""
+
+    def __init__(self, text, table=None, title="Result"):
+        self.text = text or ""
+        self.table = table if table is not None and not table.empty else None
+        self.title = title
+        digest = hashlib.sha256()
+        digest.update(title.encode("utf-8") + b"\0" + self.text.encode("utf-8"))
+        if self.table is not None:
+            digest.update(b"\0" + self.table.to_csv(index=False).encode("utf-8"))
+        self.content_hash = digest.hexdigest()
+
+
+def mime_type(fmt):
+    return FORMATS[fmt][0]
+
+
+def file_name(fmt, stem):
+    return f"{stem}.{FORMATS[fmt][1]}"
+
+
+def render_txt(doc):
+    return doc.text.encode("utf-8")
+
+
+def render_html(doc):
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>{html.escape(doc.title)}</title></head><body>",
+        f"<h1>{html.escape(doc.title)}</h1>",
+    ]
+    if doc.table is not None:
+        parts.append(doc.table.to_html(index=False, escape=True))
+    parts.append(f"<pre>{html.escape(doc.text)}</pre>")
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def render_xlsx(doc):
+    if doc.table is None:
+        raise ValueError("Excel export needs a table.")
+    import pandas as pd
+
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        doc.table.to_excel(writer, index=False, sheet_name=doc.title[:31])
+    return buffer.getvalue()
+
+
+def render_pdf(doc):
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+
+    # Add raw text
+    pdf.multi_cell(0, 10, doc.title + "\n\n" + doc.text)
+
+    # Add table if available
+    if doc.table is not None:
+        pdf.ln(10)
+        pdf.set_font("Arial", size=10)
+        col_width = pdf.w / (len(doc.table.columns) + 1)
+
+        # Header
+        for col in doc.table.columns:
+            pdf.cell(col_width, 10, str(col), border=1)
+        pdf.ln()
+
+        # Rows
+        for _, row in doc.table.iterrows():
+            for item in row:
+                pdf.cell(col_width, 10, str(item), border=1)
+            pdf.ln()
+
+    return pdf.output(dest="S").encode("latin1")
+
+
+RENDERERS = {
+    "txt": render_txt,
+    "md": render_txt,
+    "html": render_html,
+    "xlsx": render_xlsx,
+    "pdf": render_pdf,
+}
+
+
+def _memo_key(doc, fmt, renderer):
+    return (doc.content_hash, fmt, f"{renderer.__module__}.{renderer.__qualname__}")
+
+
+def _remember(key, future):
+    with _memo_lock:
+        _memo[key] = future
+        _memo.move_to_end(key)
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+
+
+def _submit(doc, fmt, renderer):
+    key = _memo_key(doc, fmt, renderer)
+    with _memo_lock:
+        future = _memo.get(key)
+        if future is not None and not (future.done() and future.exception()):
+            _memo.move_to_end(key)
+            return future
+        future = _pool.submit(renderer, doc)
+        _memo[key] = future
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return future
+
+
+def prime(doc, fmt, data, renderer=None):
+    """Store bytes produced elsewhere (e.g. a PDF built while streaming) as the memoized artifact."""
+    future = Future()
+    future.set_result(data)
+    _remember(_memo_key(doc, fmt, renderer or RENDERERS[fmt]), future)
+
+
+def render_exports(doc, formats, renderers=None):
+    """
+    Render doc in every requested format concurrently.
+    Returns {format: bytes}; a format that failed maps to its exception instead.
+    renderers can override the default renderer of a format (called with the ExportDocument).
+    """
+    renderers = {**RENDERERS, **(renderers or {})}
+    futures = {fmt: _submit(doc, fmt, renderers[fmt]) for fmt in formats}
+    results = {}
+    for fmt, future in futures.items():
+        try:
+            results[fmt] = future.result()
+        except Exception as e:
+            results[fmt] = e
+    return results
@@ -0,0 +1,194 @@
+# common/foundry.py
+"""
+Shared Azure AI Foundry client layer for the workflow and MFT comparison backends.
+
+    from common.foundry import CachedTokenCredential, get_openai_client
+    credential = CachedTokenCredential(ClientSecretCredential(tenant_id, client_id, client_secret))
+    openai_client = get_openai_client(FOUNDARY_ENDPOINT, credential)
+
+- One keep-alive httpx.Client per process (get_http_client); every OpenAI
+  client built here and every raw REST call goes through it.
+- CachedTokenCredential keeps AAD tokens per scope until shortly before they
+  expire. Once a token is inside the refresh window it is still served while a
+  background thread fetches the next one, so requests only wait on AAD for the
+  first token or after a token has actually expired.
+- OpenAI clients are memoized per (endpoint, credential key).
+- FOUNDRY_STATIC_TOKEN replaces the credential wrapped by CachedTokenCredential
+  with that fixed token, so the backends run against the local stand-in
+  (common/standin.py) without an AAD login.
+
+Streamlit runs every session as a thread of one process, so all of this is
+guarded by locks and concurrent callers share a single token fetch.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import httpx
+from azure.core.credentials import AccessToken
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT = float(os.getenv("FOUNDRY_HTTP_TIMEOUT", "120"))
+MAX_CONNECTIONS = int(os.getenv("FOUNDRY_MAX_CONNECTIONS", "50"))
+MAX_KEEPALIVE = int(os.getenv("FOUNDRY_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("FOUNDRY_KEEPALIVE_EXPIRY", "60"))
+# Start refreshing this many seconds before expiry; below MIN_VALIDITY the caller waits for a new token
+REFRESH_MARGIN = int(os.getenv("FOUNDRY_TOKEN_REFRESH_MARGIN", "300"))
+MIN_VALIDITY = 30
+STATIC_TOKEN = os.getenv("FOUNDRY_STATIC_TOKEN", "")
+MAX_CLIENTS = 32
+
+_http_client = None
+_http_lock = threading.Lock()
+_clients = OrderedDict()
+_clients_lock = threading.Lock()
+
+
+def get_http_client():
+    """Process-wide keep-alive connection pool."""
+    global _http_client
+    with _http_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                timeout=HTTP_TIMEOUT,
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                                    max_keepalive_connections=MAX_KEEPALIVE,
+                                    keepalive_expiry=KEEPALIVE_EXPIRY),
+            )
+        return _http_client
+
+
+class StaticTokenCredential:
+    """A fixed bearer token that never expires; for the local stand-in and load tests."""
+
+    def __init__(self, token):
+        self.token = token
+
+    def get_token(self, *scopes, **kwargs):
+        return AccessToken(self.token, int(time.time()) + 3600)
+
+
+class CachedTokenCredential:
+    """
+    TokenCredential wrapper that caches tokens per scope set and refreshes
+    them in the background before they expire. Calls with claims or a
+    tenant_id (CAE challenges) always go to the wrapped credential.
+    """
+
+    def __init__(self, credential, refresh_margin=REFRESH_MARGIN):
+        if STATIC_TOKEN:
+            credential = StaticTokenCredential(STATIC_TOKEN)
+        self._credential = credential
+        self._refresh_margin = refresh_margin
+        self._tokens = {}
+        self._fetch_locks = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.fetches = 0
+
+    def _fetch(self, scopes, kwargs):
+        token = self._credential.get_token(*scopes, **kwargs)
+        with self._lock:
+            self._tokens[scopes] = token
+            self.fetches += 1
+        return token
+
+    def _background_refresh(self, scopes, kwargs):
+        try:
+            self._fetch(scopes, kwargs)
+        except Exception:
+            # The current token is still valid; the next call retries
+            logger.exception("Background token refresh failed for %s", scopes)
+        finally:
+            with self._lock:
+                self._refreshing.discard(scopes)
+
+    def get_token(self, *scopes, **kwargs):
+        if kwargs.get("claims") or kwargs.get("tenant_id"):
+            return self._credential.get_token(*scopes, **kwargs)
+
+        with self._lock:
+            token = self._tokens.get(scopes)
+            fetch_lock = self._fetch_locks.setdefault(scopes, threading.Lock())
+        remaining = token.expires_on - time.time() if token else 0
+        if remaining > self._refresh_margin:
+            return token
+        if remaining > MIN_VALIDITY:
+            with self._lock:
+                start = scopes not in self._refreshing
+                self._refreshing.add(scopes)
+            if start:
+                threading.Thread(target=self._background_refresh, args=(scopes, kwargs),
+                                 name="token-refresh", daemon=True).start()
+            return token
+
+        # No usable token: one caller fetches, the others wait and reuse it
+        with fetch_lock:
+            with self._lock:
+                token = self._tokens.get(scopes)
+            if token and token.expires_on - time.time() > MIN_VALIDITY:
+                return token
+            return self._fetch(scopes, kwargs)
+
+    def close(self):
+        close = getattr(self._credential, "close", None)
+        if close:
+            close()
+
+
+def credential_key(secret):
+    """Stable cache key for a credential built from a secret (e.g. a pasted token) without keeping the secret."""
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()
+
+
+def get_openai_client(endpoint, credential, key=None):
+    """
+    OpenAI client for a Foundry project, built once per (endpoint, key) and
+    bound to the shared connection pool. key defaults to the credential
+    object itself; pass credential_key(token) for per-user tokens.
+    """
+    from azure.ai.projects import AIProjectClient
+
+    cache_key = (endpoint, key if key is not None else credential)
+    with _clients_lock:
+        client = _clients.get(cache_key)
+        if client is not None:
+            _clients.move_to_end(cache_key)
+            return client
+    project_client = AIProjectClient(endpoint=endpoint, credential=credential)
+    client = project_client.get_openai_client(http_client=get_http_client())
+    logger.info("Initialized Foundry OpenAI client for endpoint: %s", endpoint)
+    with _clients_lock:
+        client = _clients.setdefault(cache_key, client)
+        # Evicted clients are not closed: closing would close the shared pool
+        while len(_clients) > MAX_CLIENTS:
+            _clients.popitem(last=False)
+    return client
+
+
+def response_text(response):
+    """Text of a responses.create() result: output_text, or the text parts of response.output."""
+    raw_text = getattr(response, "output_text", None)
+    if raw_text:
+        return raw_text
+    parts = []
+    for item in getattr(response, "output", []) or []:
+        if not isinstance(item, dict):
+            continue
+        content = item.get("content")
+        if isinstance(content, list):
+            for c in content:
+                if isinstance(c, dict) and "text" in c:
+                    parts.append(c["text"])
+                elif isinstance(c, str):
+                    parts.append(c)
+        elif isinstance(content, str):
+            parts.append(content)
+        if item.get("text"):
+            parts.append(item["text"])
+    return "\n\n".join(parts).strip()
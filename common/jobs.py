@@ -0,0 +1,262 @@
+# common/jobs.py
+"""
+Local background job queue, so LLM work outlives Streamlit reruns.
+
+    from common.jobs import get_job_queue
+    jobs = get_job_queue()
+    job_id = jobs.submit(summarize, actions, job_id=request_key("summary", actions))
+    st.session_state.job_id = job_id          # a rerun reattaches instead of re-submitting
+    for chunk in jobs.stream(job_id):         # replays what is done, then follows the job live
+        ...
+    jobs.poll(job_id)                         # {"status": "running", "chunks": 12, ...}
+    jobs.result(job_id)
+    jobs.cancel(job_id)
+
+Jobs run on a pool of worker threads (JOB_WORKERS). A job function may be
+a generator: every yielded item is recorded as a chunk for stream(), and
+the result is the generator's return value, or the list of chunks when it
+returns nothing. Finished jobs are pickled to JOB_STORE_DIR, so a job id
+keeps its result across reruns and app restarts until JOB_TTL expires.
+Once on disk a job is dropped from memory and read back when asked for;
+jobs that are not persisted (cancelled, unpicklable results) stay in
+memory until JOB_TTL after they finished.
+Submitting an id that already exists (running or finished, not failed or
+cancelled) returns it without running anything.
+"""
+
+import glob
+import inspect
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_STORE_DIR = os.getenv("JOB_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".jobs"))
+JOB_TTL = int(os.getenv("JOB_TTL", str(24 * 3600)))
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = "pending", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised by JobQueue.result for a cancelled job."""
+
+
+class Job:
+    def __init__(self, job_id, status=PENDING):
+        self.id = job_id
+        self.status = status
+        self.chunks = []
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.cancel_requested = threading.Event()
+        self.cond = threading.Condition()
+        self.future = None
+
+    def snapshot(self):
+        with self.cond:
+            return {"id": self.id, "status": self.status, "chunks": len(self.chunks), "error": self.error,
+                    "created": self.created, "finished": self.finished}
+
+    def __getstate__(self):
+        return {k: getattr(self, k) for k in ("id", "status", "chunks", "result", "error", "created", "finished")}
+
+    def __setstate__(self, state):
+        self.__init__(state["id"])
+        self.__dict__.update(state)
+
+
+class JobQueue:
+    """Worker threads plus a job-id registry backed by one pickle per finished job."""
+
+    def __init__(self, workers=JOB_WORKERS, store_dir=JOB_STORE_DIR, ttl=JOB_TTL):
+        self.store_dir = store_dir
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+        self._prune()
+
+    def _path(self, job_id):
+        return os.path.join(self.store_dir, f"{job_id}.pkl")
+
+    def _prune(self):
+        oldest = time.time() - self.ttl
+        for path in glob.glob(os.path.join(self.store_dir, "*.pkl")):
+            try:
+                if os.path.getmtime(path) < oldest:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _persist(self, job):
+        """Pickle a finished job to the store; returns True when it is on disk."""
+        path = self._path(job.id)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(job, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            return True
+        except Exception as e:
+            # Unpicklable results stay available in memory for this process
+            logger.warning("Could not persist job %s: %s", job.id, e)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return False
+
+    def _evict_expired(self):
+        """Drop finished in-memory jobs older than the TTL (those that could not be persisted). Needs _lock."""
+        oldest = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.finished is not None and job.finished < oldest:
+                del self._jobs[job_id]
+
+    def _load(self, job_id):
+        path = self._path(job_id)
+        if not os.path.exists(path) or os.path.getmtime(path) < time.time() - self.ttl:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning("Could not load job %s: %s", job_id, e)
+            return None
+
+    def get(self, job_id):
+        """The Job for job_id (from memory or the store), or None."""
+        with self._lock:
+            # Jobs read from the store are finished and are not kept in memory again
+            return self._jobs.get(job_id) or self._load(job_id)
+
+    def submit(self, fn, *args, job_id=None, **kwargs):
+        """Queue fn(*args, **kwargs); returns the job id (an existing live or finished job is reused)."""
+        job_id = job_id or uuid.uuid4().hex
+        with self._lock:
+            self._evict_expired()
+            job = self._jobs.get(job_id) or self._load(job_id)
+            if job is not None and job.status not in (FAILED, CANCELLED):
+                return job_id
+            job = self._jobs[job_id] = Job(job_id)
+            job.future = self._pool.submit(self._run, job, fn, args, kwargs)
+        return job_id
+
+    def _set(self, job, persist=False, **fields):
+        with job.cond:
+            job.__dict__.update(fields)
+        # Written before waiters wake up, so a finished job is always on disk;
+        # waiters keep their own reference, everyone else reads it back from the store
+        if persist and self._persist(job):
+            with self._lock:
+                if self._jobs.get(job.id) is job:
+                    del self._jobs[job.id]
+        with job.cond:
+            job.cond.notify_all()
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancel_requested.is_set():
+            # cancel() raced the worker picking the job up, so future.cancel() failed there
+            self._set(job, status=CANCELLED, finished=time.time())
+            return
+        self._set(job, status=RUNNING)
+        try:
+            if inspect.isgeneratorfunction(fn):
+                result = self._drain(job, fn(*args, **kwargs))
+            else:
+                result = fn(*args, **kwargs)
+            if job.cancel_requested.is_set():
+                self._set(job, status=CANCELLED, finished=time.time())
+            else:
+                self._set(job, persist=True, status=DONE, result=result, finished=time.time())
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+            self._set(job, persist=True, status=FAILED, error=f"{type(e).__name__}: {e}", finished=time.time())
+
+    def _drain(self, job, generator):
+        try:
+            while True:
+                if job.cancel_requested.is_set():
+                    generator.close()
+                    return None
+                chunk = next(generator)
+                with job.cond:
+                    job.chunks.append(chunk)
+                    job.cond.notify_all()
+        except StopIteration as stop:
+            return stop.value if stop.value is not None else list(job.chunks)
+
+    def poll(self, job_id):
+        """Status snapshot of a job, or None if the id is unknown."""
+        job = self.get(job_id)
+        return job.snapshot() if job else None
+
+    def stream(self, job_id, start=0):
+        """Yield a job's chunks from index start, waiting for new ones until the job finishes."""
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        position = start
+        while True:
+            with job.cond:
+                while position >= len(job.chunks) and job.status not in FINISHED:
+                    job.cond.wait()
+                chunks = job.chunks[position:]
+                finished = job.status in FINISHED
+            position += len(chunks)
+            yield from chunks
+            if finished and position >= len(job.chunks):
+                return
+
+    def result(self, job_id, timeout=None):
+        """Wait for a job and return its result; raises RuntimeError if it failed, JobCancelled if cancelled."""
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        with job.cond:
+            if not job.cond.wait_for(lambda: job.status in FINISHED, timeout):
+                raise TimeoutError(job_id)
+        if job.status == FAILED:
+            raise RuntimeError(job.error)
+        if job.status == CANCELLED:
+            raise JobCancelled(job_id)
+        return job.result
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or stop a running generator job at its next chunk. Returns False if already finished."""
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED:
+            return False
+        job.cancel_requested.set()
+        if job.future is not None and job.future.cancel():
+            self._set(job, status=CANCELLED, finished=time.time())
+        return True
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """The process-wide job queue (shared by every Streamlit session)."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
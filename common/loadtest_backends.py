@@ -0,0 +1,318 @@
+# common/loadtest_backends.py
+"""
+Load test of the app backends against the local stand-in (common/standin.py):
+N concurrent simulated Streamlit sessions per backend, reporting throughput
+and tail latency.
+
+Usage:
+    python common/loadtest_backends.py --sessions 20 --requests 10
+    python common/loadtest_backends.py --targets analyzer,comparison --latency-ms 1500 --rate-429 0.05
+    python common/loadtest_backends.py --url http://127.0.0.1:8900 --output loadtest.json
+
+Without --url a stand-in is started in this process with the given fault
+settings; for thousands of sessions run common/standin.py separately so
+server and clients do not share one interpreter. The environment is
+pointed at the stand-in before any backend is imported (ENDPOINT_URL,
+FOUNDARY_ENDPOINT, FOUNDRY_STATIC_TOKEN, AZURE_* secrets), so no request
+leaves the machine.
+
+Each session runs --requests calls of its backend's public function with
+think time in between (exponential, mean --think-s), like a user clicking
+through the app. --shared is the fraction of calls that reuse one of a
+few common prompts, so concurrent identical requests exercise the
+single-flight paths; the rest are unique. Summary and fact caches are
+bypassed. Targets whose imports are missing here (e.g. streamlit for the
+app-registration backends) are reported as skipped.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.append(ROOT)
+from common.standin import DEFAULTS, start_server
+
+ANALYZER_DIR = os.path.join(ROOT, "GoAMFT_Project_Anlayzer")
+ANALYZER_V2_DIR = os.path.join(ANALYZER_DIR, "version2")
+WORKFLOW_DIR = os.path.join(ROOT, "GoAMFT_workflow_agentic")
+COMPARISON_DIR = os.path.join(ROOT, "MFT_Tools_Comparision")
+
+TOOLS = ["GoAnywhere MFT", "MOVEit Transfer", "Axway SecureTransport"]
+SHARED_PROMPTS = 4
+
+Target = namedtuple("Target", "name description setup")
+
+
+def standin_environment(url):
+    """Point every backend at the stand-in; must run before the backends are imported."""
+    os.environ.update({
+        "ENDPOINT_URL": url,
+        "AZURE_OPENAI_API_KEY": "standin",
+        "FOUNDARY_ENDPOINT": f"{url}/api/projects/standin",
+        "FOUNDARY_AGENT_NAME": os.getenv("FOUNDARY_AGENT_NAME", "standinAgent"),
+        "FOUNDARY_PROJECT_NAME": "standin",
+        "FOUNDRY_STATIC_TOKEN": "standin",
+        "AZURE_TENANT_ID": "standin", "AZURE_CLIENT_ID": "standin", "AZURE_CLIENT_SECRET": "standin",
+    })
+
+
+def load_file(module_name, path):
+    """Import a backend file under its own name (several apps have a backend.py)."""
+    directory = os.path.dirname(path)
+    if directory not in sys.path:
+        sys.path.append(directory)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _project(seed):
+    from generate_projects import project_bytes
+    return project_bytes(actions=40, modules=3, seed=seed)
+
+
+def _consume(chunks):
+    """Drain a generator; returns (text, seconds to the first chunk)."""
+    start = time.perf_counter()
+    first = None
+    parts = []
+    for chunk in chunks:
+        if first is None:
+            first = time.perf_counter() - start
+        parts.append(chunk)
+    return "".join(parts), first
+
+
+def _error(text):
+    return text.startswith("❌") or "❌ Error" in text
+
+
+# Each setup returns call(prompt_id) -> (ok, seconds to first chunk or None)
+
+def setup_analyzer():
+    sys.path.insert(0, ANALYZER_V2_DIR)
+    from backend.parser import parse_project_xml
+    from backend.summarizer import summarize_actions
+
+    def call(prompt_id):
+        actions = parse_project_xml(_project(prompt_id))
+        text, first = _consume(summarize_actions(actions, use_cache=False, stream=True))
+        return bool(text), first
+    return call
+
+
+def setup_analyzer_v1():
+    sys.path.insert(0, ANALYZER_V2_DIR)
+    module = load_file("loadtest_analyzer_v1", os.path.join(ANALYZER_DIR, "backend.py"))
+
+    def call(prompt_id):
+        return bool(module.summarize_actions(module.parse_project_xml(_project(prompt_id)))), None
+    return call
+
+
+def _workflow_prompt(prompt_id):
+    return (f"Create a GoAnywhere project XML that downloads *.csv files from SFTP server E{prompt_id} "
+            f"into the workspace, archives them and uploads them to I{prompt_id}.")
+
+
+def setup_workflow():
+    module = load_file("loadtest_workflow", os.path.join(WORKFLOW_DIR, "backend.py"))
+
+    def call(prompt_id):
+        return not _error(module.run_agent_workflow(_workflow_prompt(prompt_id), "standin")), None
+    return call
+
+
+def setup_workflow_appreg():
+    module = load_file("loadtest_workflow_appreg", os.path.join(WORKFLOW_DIR, "backend_using_appreg.py"))
+
+    def call(prompt_id):
+        text, first = _consume(module.stream_agent_workflow(_workflow_prompt(prompt_id)))
+        return not _error(text), first
+    return call
+
+
+def _requirements(prompt_id):
+    return f"1. SFTP support\n2. HIPAA compliance\n3. Azure Blob integration\n4. Retention of {prompt_id} days"
+
+
+def setup_comparison():
+    module = load_file("loadtest_comparison", os.path.join(COMPARISON_DIR, "backend.py"))
+
+    def call(prompt_id):
+        text, table = module.get_comparison(_requirements(prompt_id), TOOLS, fan_out=True, use_cache=False)
+        return not _error(text) and not table.empty, None
+    return call
+
+
+def setup_comparison_appreg():
+    module = load_file("loadtest_comparison_appreg", os.path.join(COMPARISON_DIR, "backend_using_appreg.py"))
+
+    def call(prompt_id):
+        return not _error(module.run_agent_workflow(_requirements(prompt_id))), None
+    return call
+
+
+def setup_comparison_rest():
+    module = load_file("loadtest_comparison_rest", os.path.join(COMPARISON_DIR, "backend_using_appreg_test.py"))
+
+    def call(prompt_id):
+        return not _error(module.run_agent_workflow(_requirements(prompt_id))), None
+    return call
+
+
+def setup_comparison_openai():
+    module = load_file("loadtest_comparison_openai", os.path.join(COMPARISON_DIR, "backend_using_openAI.py"))
+
+    def call(prompt_id):
+        text, _ = module.get_comparison(_requirements(prompt_id), TOOLS)
+        return not _error(text), None
+    return call
+
+
+TARGETS = [
+    Target("analyzer", "version2 summarizer, streamed", setup_analyzer),
+    Target("analyzer-v1", "GoAMFT_Project_Anlayzer/backend.py", setup_analyzer_v1),
+    Target("workflow", "workflow agent, user token", setup_workflow),
+    Target("workflow-appreg", "workflow agent, app registration, streamed", setup_workflow_appreg),
+    Target("comparison", "MFT comparison, per-tool fan-out", setup_comparison),
+    Target("comparison-appreg", "MFT comparison, app registration", setup_comparison_appreg),
+    Target("comparison-rest", "MFT comparison, REST agent call", setup_comparison_rest),
+    Target("comparison-openai", "MFT comparison, Azure OpenAI", setup_comparison_openai),
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_target(call, args, seed):
+    """Run the sessions; returns (wall seconds, [(latency, ok, first_chunk)])."""
+    results = []
+    lock = threading.Lock()
+    counter = iter(range(10 ** 9))
+
+    def session(number):
+        rng = random.Random(seed * 1000 + number)
+        for _ in range(args.requests):
+            time.sleep(rng.expovariate(1 / args.think_s) if args.think_s > 0 else 0)
+            with lock:
+                unique = next(counter)
+            prompt_id = rng.randrange(SHARED_PROMPTS) if rng.random() < args.shared else SHARED_PROMPTS + unique
+            start = time.perf_counter()
+            try:
+                ok, first = call(prompt_id)
+            except Exception:
+                ok, first = False, None
+            with lock:
+                results.append((time.perf_counter() - start, ok, first))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions, thread_name_prefix="session") as pool:
+        list(pool.map(session, range(args.sessions)))
+    return time.perf_counter() - start, results
+
+
+def summarize(wall, results, standin_before, standin_after):
+    latencies = [latency for latency, ok, _ in results if ok]
+    firsts = [first for _, ok, first in results if ok and first is not None]
+    status_before = standin_before.get("status", {})
+    status = {code: count - status_before.get(code, 0) for code, count in standin_after.get("status", {}).items()}
+    summary = {
+        "requests": len(results),
+        "errors": sum(1 for _, ok, _ in results if not ok),
+        "wall_s": wall,
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "upstream_requests": standin_after.get("requests", 0) - standin_before.get("requests", 0),
+        "upstream_status": {code: count for code, count in status.items() if count},
+    }
+    for name, values in (("latency", latencies), ("first_chunk", firsts)):
+        if values:
+            summary.update({f"{name}_p50_s": percentile(values, 50), f"{name}_p95_s": percentile(values, 95),
+                            f"{name}_p99_s": percentile(values, 99), f"{name}_max_s": max(values)})
+    return summary
+
+
+def _standin_stats(server, url):
+    if server is not None:
+        return server.stats()
+    import httpx
+    try:
+        return httpx.get(f"{url}/_standin/stats", timeout=10).json()
+    except httpx.HTTPError:
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the app backends against the local stand-in.")
+    parser.add_argument("--targets", default=",".join(t.name for t in TARGETS),
+                        help=f"Comma separated subset of: {', '.join(t.name for t in TARGETS)}")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent simulated Streamlit sessions")
+    parser.add_argument("--requests", type=int, default=5, help="Requests per session")
+    parser.add_argument("--think-s", type=float, default=0.5, help="Mean think time between requests")
+    parser.add_argument("--shared", type=float, default=0.2, help="Fraction of requests using a common prompt")
+    parser.add_argument("--url", help="Use a running stand-in instead of starting one")
+    parser.add_argument("--output", help="Write the results as JSON")
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default,
+                            help="Stand-in setting (ignored with --url)")
+    args = parser.parse_args(argv)
+
+    selected = args.targets.split(",")
+    unknown = set(selected) - {t.name for t in TARGETS}
+    if unknown:
+        raise SystemExit(f"Unknown target(s): {', '.join(sorted(unknown))}")
+
+    server = None
+    url = args.url
+    if url is None:
+        server = start_server(**{name: getattr(args, name) for name in DEFAULTS})
+        url = server.url
+    standin_environment(url)
+    print(f"Stand-in at {url}; {args.sessions} sessions x {args.requests} requests per target")
+
+    report = {}
+    for seed, target in enumerate(t for t in TARGETS if t.name in selected):
+        try:
+            call = target.setup()
+        except Exception as e:
+            report[target.name] = {"skipped": f"{type(e).__name__}: {e}"}
+            print(f"{target.name:<20} skipped ({type(e).__name__}: {e})")
+            continue
+        before = _standin_stats(server, url)
+        wall, results = run_target(call, args, seed)
+        summary = summarize(wall, results, before, _standin_stats(server, url))
+        report[target.name] = {"description": target.description, **summary}
+        line = (f"{target.name:<20} {summary['throughput_rps']:>7.2f} req/s  errors={summary['errors']:<4} "
+                f"upstream={summary['upstream_requests']:<5}")
+        if "latency_p50_s" in summary:
+            line += (f" p50={summary['latency_p50_s']:.2f}s p95={summary['latency_p95_s']:.2f}s "
+                     f"p99={summary['latency_p99_s']:.2f}s")
+        if "first_chunk_p50_s" in summary:
+            line += f" first chunk p50={summary['first_chunk_p50_s']:.2f}s p95={summary['first_chunk_p95_s']:.2f}s"
+        if summary["upstream_status"]:
+            line += f" status={summary['upstream_status']}"
+        print(line, flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "settings": vars(args), "targets": report}, f, indent=2)
+        print(f"Results written to {args.output}")
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
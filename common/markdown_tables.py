@@ -0,0 +1,209 @@
+# common/markdown_tables.py
+"""
+Markdown table extraction for agent/LLM responses.
+
+    from common.markdown_tables import extract_tables, parse_markdown_table, TableExtractor
+    tables = extract_tables(response_text)          # every table, in order
+    df = parse_markdown_table(response_text)        # first table or an empty DataFrame
+
+    extractor = TableExtractor()
+    for chunk in stream:
+        for df in extractor.feed(chunk):            # tables are returned as soon as they end
+            ...
+    tables = extractor.finish()
+
+A table is a row line followed by an alignment row (| --- | :---: |), then
+row lines until the first line without a pipe; an alignment row only counts
+right after the header, so dash-only data rows (| - | - |) stay data. Everything is done in one
+pass over the lines, so streamed chunks and a full string give the same
+result. Escaped pipes (\\|) stay inside cells, ragged rows are padded or
+trimmed to the header, and columns are typed: integers and floats (currency
+symbols, thousands separators and % are ignored), booleans (yes/no,
+true/false, ✓/✗, ✅/❌), otherwise strings; "-" and "n/a" cells are missing
+values in number and boolean columns. Alignment is kept in
+df.attrs["alignment"].
+"""
+
+import re
+
+import pandas as pd
+
+from common.metrics import get_metrics
+
+_PIPE = re.compile(r"(?<!\\)\|")
+_ALIGNMENT_CELL = re.compile(r"^:?-+:?$")
+_NUMBER = re.compile(r"^[-+]?(?:\d{1,3}(?:,\d{3})+|\d+)?(?:\.\d+)?$")
+_NUMBER_NOISE = re.compile(r"[$€£\s%]|USD|EUR|GBP")
+
+TRUE_VALUES = {"yes", "true", "y", "✓", "✔", "✔️", "✅", "☑", "☑️"}
+FALSE_VALUES = {"no", "false", "n", "✗", "✘", "✕", "✖", "❌", "✖️"}
+# Not-applicable markers: missing values in number and boolean columns
+MISSING_VALUES = {"", "-", "–", "—", "n/a"}
+
+
+def split_row(line):
+    """Cells of a markdown table row; escaped pipes (\\|) stay inside the cell."""
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    if "\\" not in line:
+        return [cell.strip() for cell in line.split("|")]
+    return [cell.strip().replace("\\|", "|") for cell in _PIPE.split(line)]
+
+
+def _alignment(cells):
+    """Alignments of an alignment row, or None if cells are not one."""
+    if not cells or not all(_ALIGNMENT_CELL.match(cell) for cell in cells):
+        return None
+    result = []
+    for cell in cells:
+        if cell.startswith(":") and cell.endswith(":"):
+            result.append("center")
+        elif cell.endswith(":"):
+            result.append("right")
+        elif cell.startswith(":"):
+            result.append("left")
+        else:
+            result.append(None)
+    return result
+
+
+def _to_number(value):
+    text = _NUMBER_NOISE.sub("", value)
+    if not text or not _NUMBER.match(text) or not any(ch.isdigit() for ch in text):
+        return None
+    return float(text.replace(",", ""))
+
+
+def infer_column(values):
+    """Typed pandas array for a column of cell strings (empty and N/A cells become missing values)."""
+    missing = [v.lower() in MISSING_VALUES for v in values]
+    present = [v for v, skip in zip(values, missing) if not skip]
+    if present:
+        if all(v.lower() in TRUE_VALUES or v.lower() in FALSE_VALUES for v in present):
+            return pd.array([None if skip else v.lower() in TRUE_VALUES for v, skip in zip(values, missing)],
+                            dtype="boolean")
+        parsed = [None if skip else _to_number(v) for v, skip in zip(values, missing)]
+        if all(n is not None for n, skip in zip(parsed, missing) if not skip):
+            if all(n is None or n.is_integer() for n in parsed):
+                return pd.array([None if n is None else int(n) for n in parsed], dtype="Int64")
+            return pd.array(parsed, dtype="Float64")
+    return pd.array(values, dtype=object)
+
+
+def _unique(header):
+    seen = {}
+    columns = []
+    for i, name in enumerate(header):
+        name = name or f"column_{i + 1}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}_{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def build_table(header, rows, alignment=None, infer_types=True):
+    """DataFrame from header cells and row cells; ragged rows are padded or trimmed."""
+    width = len(header)
+    rows = [row[:width] + [""] * (width - len(row)) for row in rows]
+    columns = _unique(header)
+    if infer_types:
+        cells = list(zip(*rows)) if rows else [()] * width
+        df = pd.DataFrame({i: infer_column(list(column)) for i, column in enumerate(cells)}, copy=False)
+        df.columns = columns
+    else:
+        df = pd.DataFrame(rows, columns=columns)
+    df.attrs["alignment"] = (alignment or [None] * width)[:width]
+    return df
+
+
+class TableExtractor:
+    """Streaming, single-pass table finder: feed() text chunks, get finished tables back."""
+
+    def __init__(self, infer_types=True):
+        self.infer_types = infer_types
+        self._pending = ""
+        self._candidate = None   # last pipe line, possible header
+        self._header = None
+        self._alignment = None
+        self._rows = []
+
+    def _close(self):
+        table = None
+        if self._header is not None:
+            table = build_table(self._header, self._rows, self._alignment, self.infer_types)
+        self._header, self._alignment, self._rows = None, None, []
+        return table
+
+    def _line(self, line):
+        """Process one complete line; returns a finished table or None."""
+        has_pipe = "|" in line and ("\\" not in line or _PIPE.search(line) is not None)
+        if self._header is not None:
+            if has_pipe and line.strip():
+                # Inside a table every pipe line is data, including dash-only rows
+                # such as "| - | - |" (N/A cells); a new table needs a non-pipe line first
+                self._rows.append(split_row(line))
+                return None
+            table = self._close()
+            self._candidate = None
+            return table
+        if has_pipe:
+            cells = split_row(line)
+            alignment = _alignment(cells)
+            if alignment is not None and self._candidate is not None:
+                self._header, self._alignment = self._candidate, alignment
+                self._candidate = None
+            else:
+                self._candidate = cells
+        else:
+            self._candidate = None
+        return None
+
+    def feed(self, chunk):
+        """Add a chunk of text; returns the tables that ended inside it."""
+        self._pending += chunk
+        *lines, self._pending = self._pending.split("\n")
+        tables = []
+        for line in lines:
+            table = self._line(line)
+            if table is not None:
+                tables.append(table)
+        return tables
+
+    def finish(self):
+        """Flush the last line; returns the remaining table, if any, as a list."""
+        tables = []
+        if self._pending:
+            table = self._line(self._pending)
+            self._pending = ""
+            if table is not None:
+                tables.append(table)
+        table = self._close()
+        if table is not None:
+            tables.append(table)
+        return tables
+
+
+def extract_tables(text, infer_types=True):
+    """Every markdown table in text, in order of appearance."""
+    with get_metrics().span("markdown.tables", bytes=len(text)) as span:
+        extractor = TableExtractor(infer_types=infer_types)
+        tables = extractor.feed(text) + extractor.finish()
+        span["items"] = len(tables)
+    return tables
+
+
+def parse_markdown_table(text, infer_types=True):
+    """First markdown table in text, or an empty DataFrame."""
+    with get_metrics().span("markdown.tables", bytes=len(text)) as span:
+        extractor = TableExtractor(infer_types=infer_types)
+        tables = extractor.feed(text)
+        if not tables:
+            tables = extractor.finish()
+        span["items"] = min(len(tables), 1)
+    return tables[0] if tables else pd.DataFrame()
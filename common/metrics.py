@@ -0,0 +1,201 @@
+# common/metrics.py
+"""
+Lightweight per-stage instrumentation: span timings, token counts, cache
+hits and payload sizes, exported as Prometheus text or JSON lines.
+
+    from common.metrics import get_metrics, usage_fields
+    metrics = get_metrics()
+    with metrics.span("xml.parse", bytes=len(data)) as span:
+        actions = parse(data)
+        span["items"] = len(actions)
+    with metrics.span("llm.completion") as span:
+        response = client.chat.completions.create(...)
+        span.update(usage_fields(response.usage))              # prompt/completion tokens
+    metrics.count("summary.cache", "hit")
+    for chunk in metrics.timed_iter("llm.generation", stream, first_stage="llm.first_token"):
+        ...                                                    # time spent waiting on the stream only
+    metrics.prometheus()        # text exposition format
+    metrics.stats()             # {stage: {"count", "p50", "p95", ...}}
+
+Every stage keeps its last METRICS_WINDOW durations for percentiles plus
+running totals. When METRICS_JSONL is set, each span is also appended to
+that file as one JSON line. Stages used in this repo:
+    xml.parse, prompt.build, llm.first_token, llm.generation, llm.completion,
+    agent.response, agent.first_token, agent.generation, markdown.tables, pdf.render
+and the counter summary.cache{hit,miss}.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "2048"))
+METRICS_JSONL = os.getenv("METRICS_JSONL", "")
+# Numeric span fields that are summed per stage
+TOTAL_FIELDS = ("bytes", "items", "prompt_tokens", "completion_tokens")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def usage_fields(usage):
+    """{"prompt_tokens", "completion_tokens"} from a chat.completions or responses usage (object or dict)."""
+    if not usage:
+        return {}
+    get = usage.get if isinstance(usage, dict) else lambda name: getattr(usage, name, None)
+    prompt, completion = get("prompt_tokens"), get("completion_tokens")
+    if prompt is None:
+        prompt, completion = get("input_tokens"), get("output_tokens")
+    return {"prompt_tokens": prompt, "completion_tokens": completion}
+
+
+class _Stage:
+    def __init__(self, window):
+        self.durations = deque(maxlen=window)
+        self.count = 0
+        self.seconds = 0.0
+        self.totals = dict.fromkeys(TOTAL_FIELDS, 0)
+
+
+class Metrics:
+    """Thread-safe collector; one per process (see get_metrics)."""
+
+    def __init__(self, window=METRICS_WINDOW, jsonl_path=METRICS_JSONL):
+        self.window = window
+        self.jsonl_path = jsonl_path
+        self._stages = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._jsonl = None
+
+    def record(self, stage, seconds, **fields):
+        """Add one observation of stage; numeric TOTAL_FIELDS are summed, everything goes to the JSONL log."""
+        with self._lock:
+            data = self._stages.get(stage)
+            if data is None:
+                data = self._stages[stage] = _Stage(self.window)
+            data.durations.append(seconds)
+            data.count += 1
+            data.seconds += seconds
+            for name in TOTAL_FIELDS:
+                value = fields.get(name)
+                if isinstance(value, (int, float)):
+                    data.totals[name] += value
+            if self.jsonl_path:
+                self._write_line({"ts": time.time(), "stage": stage, "seconds": round(seconds, 6), **fields})
+
+    def _write_line(self, entry):
+        try:
+            if self._jsonl is None:
+                self._jsonl = open(self.jsonl_path, "a", encoding="utf-8", buffering=1)
+            self._jsonl.write(json.dumps(entry, default=str) + "\n")
+        except OSError:
+            self.jsonl_path = ""
+
+    @contextmanager
+    def span(self, stage, **fields):
+        """Time the with-block; fields set on the yielded dict are recorded with it."""
+        start = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as e:
+            fields["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - start, **fields)
+
+    def timed_iter(self, stage, iterable, first_stage=None, fields=None):
+        """
+        Yield from iterable, recording only the time spent inside it (not in
+        the consumer) under stage. With first_stage, the wait for the first
+        item is recorded there and stage gets the remainder. fields is
+        recorded when the iteration ends, so the caller may fill it in while
+        iterating (e.g. token usage from the last chunk).
+        """
+        fields = {} if fields is None else fields
+        iterator = iter(iterable)
+        busy = 0.0
+        items = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    busy += time.perf_counter() - start
+                    break
+                elapsed = time.perf_counter() - start
+                if items == 0 and first_stage:
+                    self.record(first_stage, elapsed)
+                else:
+                    busy += elapsed
+                items += 1
+                yield item
+        finally:
+            self.record(stage, busy, **{"items": items, **fields})
+
+    def count(self, name, label="total", n=1):
+        """Bump a labelled counter, e.g. count("summary.cache", "hit")."""
+        with self._lock:
+            key = (name, label)
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def stats(self):
+        """{stage: {count, p50, p95, max, mean, totals...}} (seconds) plus {"counters": {...}}."""
+        with self._lock:
+            stages = {name: (sorted(data.durations), data.count, data.seconds, dict(data.totals))
+                      for name, data in self._stages.items()}
+            counters = dict(self._counters)
+        result = {}
+        for name, (durations, count, seconds, totals) in sorted(stages.items()):
+            result[name] = {"count": count, "p50": percentile(durations, 50), "p95": percentile(durations, 95),
+                            "max": durations[-1] if durations else None, "mean": seconds / count if count else None,
+                            **{k: v for k, v in totals.items() if v}}
+        result["counters"] = {f"{name}{{{label}}}": value for (name, label), value in sorted(counters.items())}
+        return result
+
+    def prometheus(self, prefix="goa"):
+        """Prometheus text exposition: a summary per stage, totals and counters."""
+        lines = [f"# TYPE {prefix}_stage_seconds summary"]
+        stats = self.stats()
+        stats.pop("counters")
+        for stage, data in stats.items():
+            label = f'stage="{stage}"'
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95")):
+                if data[key] is not None:
+                    lines.append(f'{prefix}_stage_seconds{{{label},quantile="{quantile}"}} {data[key]:.6f}')
+            lines.append(f"{prefix}_stage_seconds_sum{{{label}}} {data['mean'] * data['count']:.6f}")
+            lines.append(f"{prefix}_stage_seconds_count{{{label}}} {data['count']}")
+        for field in TOTAL_FIELDS:
+            rows = [(stage, data[field]) for stage, data in stats.items() if data.get(field)]
+            if rows:
+                lines.append(f"# TYPE {prefix}_stage_{field}_total counter")
+                lines.extend(f'{prefix}_stage_{field}_total{{stage="{stage}"}} {value}' for stage, value in rows)
+        with self._lock:
+            counter_items = sorted(self._counters.items())
+        names = sorted({name for (name, _), _ in counter_items})
+        for name in names:
+            metric = f"{prefix}_{name.replace('.', '_')}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f'{metric}{{label="{label}"}} {value}' for (n, label), value in counter_items if n == name)
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """The process-wide collector."""
+    return _metrics
@@ -0,0 +1,190 @@
+# common/singleflight.py
+"""
+Process-wide single-flight for LLM/agent calls: concurrent identical
+requests share one in-flight call and all receive its result.
+
+    from common.singleflight import get_flight, request_key
+    flight = get_flight("summarize")
+    summary = flight.do(request_key(prompt, deployment), call_llm, prompt)
+    for chunk in flight.stream(request_key(prompt, deployment), stream_llm, prompt):
+        ...                                   # followers replay the leader's chunks as they arrive
+
+Only calls that overlap in time are shared; once the leader finishes, the
+next identical request makes a new call (caching results is left to the
+caches in front of it). The leader's exception is raised in every waiter.
+Counters per group: calls (requests seen), leaders (upstream calls made)
+and coalesced (requests served by another request's call).
+"""
+
+import hashlib
+import json
+import threading
+
+
+def request_key(*parts):
+    """Canonical hash of a request: dicts are key-sorted, other objects use str()."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _StreamCall:
+    def __init__(self, fn, args, kwargs):
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+        self.iterator = None
+        self.chunks = []
+        self.finished = False
+        self.error = None
+        self.driving = False     # a consumer is pulling the next chunk
+        self.consumers = 0
+        self.cond = threading.Condition()
+
+
+class SingleFlight:
+    """One group of de-duplicated calls (e.g. all summaries); thread-safe."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.leaders = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._streams = {}
+
+    def _join(self, table, key, factory):
+        """(call, is_leader) for key, registering a new call if none is in flight."""
+        with self._lock:
+            self.calls += 1
+            call = table.get(key)
+            leader = call is None
+            if leader:
+                call = table[key] = factory()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+            if isinstance(call, _StreamCall):
+                call.consumers += 1
+            return call, leader
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return fn(*args, **kwargs), sharing the result with identical calls in flight."""
+        call, leader = self._join(self._inflight, key, _Call)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+        return call.result
+
+    def stream(self, key, fn, *args, **kwargs):
+        """
+        Generator over the chunks of fn(*args, **kwargs) (itself a generator).
+        Identical streams share one upstream generator: a consumer that joins
+        late first gets every chunk produced so far. Whichever consumer is
+        waiting pulls the next chunk, so the stream continues if the first
+        consumer stops early; it is closed when the last consumer stops.
+        """
+        call, _ = self._join(self._streams, key, lambda: _StreamCall(fn, args, kwargs))
+        position = 0
+        try:
+            while True:
+                with call.cond:
+                    while position == len(call.chunks) and not call.finished and call.driving:
+                        call.cond.wait()
+                    chunks = call.chunks[position:]
+                    if not chunks and call.finished:
+                        if call.error is not None:
+                            raise call.error
+                        return
+                    if not chunks:
+                        call.driving = True
+                if not chunks:
+                    chunks = self._pull(key, call)
+                position += len(chunks)
+                yield from chunks
+        finally:
+            self._leave(key, call)
+
+    def _pull(self, key, call):
+        """Next upstream chunk as a one-item list, [] at the end (caller is the driver)."""
+        try:
+            if call.iterator is None:
+                call.iterator = iter(call.fn(*call.args, **call.kwargs))
+            chunk = next(call.iterator)
+        except StopIteration:
+            self._finish(key, call)
+            return []
+        except BaseException as e:
+            self._finish(key, call, e)
+            raise
+        with call.cond:
+            call.chunks.append(chunk)
+            call.driving = False
+            call.cond.notify_all()
+        return [chunk]
+
+    def _finish(self, key, call, error=None):
+        with self._lock:
+            if self._streams.get(key) is call:
+                del self._streams[key]
+        with call.cond:
+            call.finished = True
+            call.error = error
+            call.driving = False
+            call.cond.notify_all()
+
+    def _leave(self, key, call):
+        with self._lock:
+            call.consumers -= 1
+            abandoned = call.consumers == 0 and not call.finished
+            if abandoned and self._streams.get(key) is call:
+                # Unregistered under the same lock as the last leave, so a later
+                # request starts a fresh upstream call instead of joining this one
+                del self._streams[key]
+        if abandoned:
+            # Nobody is reading any more: stop the upstream call
+            self._finish(key, call)
+            close = getattr(call.iterator, "close", None)
+            if close is not None:
+                close()
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "leaders": self.leaders, "coalesced": self.coalesced,
+                    "in_flight": len(self._inflight) + len(self._streams)}
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def get_flight(name):
+    """The process-wide SingleFlight group called name."""
+    with _flights_lock:
+        flight = _flights.get(name)
+        if flight is None:
+            flight = _flights[name] = SingleFlight(name)
+        return flight
+
+
+def flight_stats():
+    """{group name: stats} for every group used so far."""
+    with _flights_lock:
+        flights = list(_flights.values())
+    return {flight.name: flight.stats() for flight in flights}
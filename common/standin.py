@@ -0,0 +1,448 @@
+# common/standin.py
+"""
+Local stand-in for Azure OpenAI and Azure AI Foundry, so the backends can be
+run and load-tested offline.
+
+    python common/standin.py --port 8900 --latency-ms 800 --tokens-per-s 80 --rate-429 0.05
+
+    ENDPOINT_URL=http://127.0.0.1:8900 \\
+    FOUNDARY_ENDPOINT=http://127.0.0.1:8900/api/projects/standin \\
+    FOUNDRY_STATIC_TOKEN=standin streamlit run app.py
+
+APIs (any prefix, so Azure deployment paths, /openai/v1 and the Foundry
+agent REST path all work; ?api-version is ignored):
+    POST .../chat/completions   chat.completions, stream and stream_options.include_usage
+    POST .../responses          responses.create, with or without an agent reference, stream
+    GET  /_standin/stats        request, status and token counters
+    POST /_standin/config       change the settings below at runtime (JSON object)
+    POST /_standin/reset        clear the counters
+
+Every request waits latency_ms (+- jitter_ms) before the first byte, then
+produces text at tokens_per_s (0 = instantly): streamed in chunks of
+chunk_tokens, or as one body once generation would have finished.
+rate_429 and error_rate are probabilities of answering 429 (with
+Retry-After) or 500 instead; capacity > 0 also answers 429 whenever more
+requests than that are already being served, like a deployment's quota.
+
+Response text is looked up in the replay file (JSON lines with "key" from
+request_key(kind, prompt) or a "match" substring of the prompt, plus
+"text" and optional "usage"); otherwise a synthetic answer is generated:
+prose, a markdown table with one row per numbered requirement in the
+prompt and, when the prompt mentions XML, a minimal valid project. With
+--upstream the request is forwarded (non-streaming) to the real endpoint
+instead, and its answer is appended to --record for later replays; the
+client still gets the stream it asked for.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.singleflight import request_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "latency_ms": float(os.getenv("STANDIN_LATENCY_MS", "500")),
+    "jitter_ms": float(os.getenv("STANDIN_JITTER_MS", "100")),
+    "tokens_per_s": float(os.getenv("STANDIN_TOKENS_PER_S", "80")),
+    "response_tokens": int(os.getenv("STANDIN_RESPONSE_TOKENS", "400")),
+    "chunk_tokens": int(os.getenv("STANDIN_CHUNK_TOKENS", "4")),
+    "rate_429": float(os.getenv("STANDIN_RATE_429", "0")),
+    "error_rate": float(os.getenv("STANDIN_ERROR_RATE", "0")),
+    "capacity": int(os.getenv("STANDIN_CAPACITY", "0")),
+    "retry_after": float(os.getenv("STANDIN_RETRY_AFTER", "1")),
+}
+
+# Short letter runs, digit groups and punctuation, each with its leading whitespace: "".join(tokens) == text
+_TOKEN = re.compile(r"\s*(?:[A-Za-z]{1,8}|\d{1,3}|[^\sA-Za-z\d])|\s+")
+_NUMBERED = re.compile(r"^\s*(\d+)[.)]\s+(.+?)\s*$", re.MULTILINE)
+
+PROSE = ("The project connects to the source server, lists the files that match the configured pattern and "
+         "downloads them into the job workspace. Files are archived, uploaded to the target server and removed "
+         "from the source once the transfer succeeds; failures are routed to the error handling module. ")
+PROJECT_XML = ('<project name="standin" mainModule="Main" version="2.0">\n'
+               '\t<module name="Main" onError="abort">\n'
+               '\t\t<createWorkspace label="Create workspace" version="1.0" />\n'
+               '\t\t<deleteWorkspace version="1.0" />\n'
+               "\t</module>\n</project>")
+
+
+def split_tokens(text):
+    return _TOKEN.findall(text)
+
+
+def estimate_tokens(text):
+    return len(split_tokens(text))
+
+
+def prompt_of(kind, body):
+    """The prompt text of a chat.completions or responses request body."""
+    items = body.get("messages") if kind == "chat" else body.get("input")
+    if isinstance(items, str):
+        return items
+    parts = []
+    for item in items or []:
+        content = item.get("content") if isinstance(item, dict) else item
+        if isinstance(content, list):
+            parts.extend(c.get("text", "") for c in content if isinstance(c, dict))
+        elif content:
+            parts.append(str(content))
+    return "\n".join(parts)
+
+
+def synthetic_text(prompt, tokens):
+    """Answer of roughly tokens tokens with the shapes the apps parse: prose, a markdown table, optional XML."""
+    requirements = _NUMBERED.findall(prompt) or [(str(i), f"Requirement {i}") for i in range(1, 6)]
+    rows = [f"| {n} | {req.replace('|', '/')} | {('Yes', 'Partial', 'No')[int(n) % 3]} | Stand-in answer {n} |"
+            for n, req in requirements]
+    table = "\n".join(["| # | Requirement | Support | Details |", "|---|---|---|---|", *rows])
+    xml = f"\n\n```xml\n{PROJECT_XML}\n```" if "xml" in prompt.lower() else ""
+    prose_tokens = max(1, tokens - estimate_tokens(table) - estimate_tokens(xml))
+    per_paragraph = estimate_tokens(PROSE)
+    prose = PROSE * max(1, round(prose_tokens / per_paragraph))
+    return f"{prose.strip()}\n\n{table}{xml}\n"
+
+
+class StandinServer(ThreadingHTTPServer):
+    """HTTP server holding the settings, counters and replay table shared by all request threads."""
+
+    daemon_threads = True
+
+    def __init__(self, address, replay=None, record=None, upstream=None, upstream_key=None, **config):
+        super().__init__(address, _Handler)
+        self.config = {**DEFAULTS, **config}
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.upstream_key = upstream_key
+        self.record_path = record
+        self.rng = random.Random()
+        self._lock = threading.Lock()
+        self.active = 0
+        self.replay_by_key = {}
+        self.replay_by_match = []
+        if replay:
+            self.load_replay(replay)
+        self.reset()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def load_replay(self, path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    self.add_recording(json.loads(line))
+        logger.info("Loaded %d replay entries from %s", len(self.replay_by_key) + len(self.replay_by_match), path)
+
+    def add_recording(self, entry):
+        if entry.get("key"):
+            self.replay_by_key[entry["key"]] = entry
+        elif entry.get("match"):
+            self.replay_by_match.append(entry)
+
+    def lookup(self, kind, prompt):
+        entry = self.replay_by_key.get(request_key(kind, prompt))
+        if entry is None:
+            entry = next((e for e in self.replay_by_match if e["match"] in prompt), None)
+        return entry
+
+    def reset(self):
+        with self._lock:
+            self.counters = {"requests": 0, "replayed": 0, "proxied": 0, "streamed": 0, "status": {},
+                             "prompt_tokens": 0, "completion_tokens": 0, "max_active": 0}
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "status": dict(self.counters["status"]), "active": self.active,
+                    "config": dict(self.config)}
+
+    def admit(self):
+        """Fault to inject for a new request: None, 429 or 500 (the request is counted as active if admitted)."""
+        with self._lock:
+            self.counters["requests"] += 1
+            capacity = self.config["capacity"]
+            if capacity and self.active >= capacity:
+                return 429
+            if self.rng.random() < self.config["rate_429"]:
+                return 429
+            if self.rng.random() < self.config["error_rate"]:
+                return 500
+            self.active += 1
+            self.counters["max_active"] = max(self.counters["max_active"], self.active)
+            return None
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+
+    def count(self, status, **fields):
+        with self._lock:
+            self.counters["status"][str(status)] = self.counters["status"].get(str(status), 0) + 1
+            for name, value in fields.items():
+                self.counters[name] += value
+
+    def record(self, entry):
+        self.add_recording(entry)
+        if self.record_path:
+            with self._lock, open(self.record_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandinServer
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=()):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length) if length else b""
+        return json.loads(raw) if raw else {}
+
+    def do_GET(self):
+        if self.path.startswith("/_standin/stats"):
+            return self._send_json(200, self.server.stats())
+        self._send_json(404, {"error": {"code": "NotFound", "message": self.path}})
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        try:
+            body = self._read_body()
+        except ValueError as e:
+            return self._send_json(400, {"error": {"code": "BadRequest", "message": str(e)}})
+        if path == "/_standin/config":
+            self.server.config.update({k: type(DEFAULTS[k])(v) for k, v in body.items() if k in DEFAULTS})
+            return self._send_json(200, self.server.config)
+        if path == "/_standin/reset":
+            self.server.reset()
+            return self._send_json(200, {})
+        if path.endswith("/chat/completions"):
+            return self._generate("chat", body)
+        if path.endswith("/responses"):
+            return self._generate("responses", body)
+        self._send_json(404, {"error": {"code": "NotFound", "message": f"No stand-in route for {path}"}})
+
+    def _generate(self, kind, body):
+        server = self.server
+        config = server.config
+        fault = server.admit()
+        if fault is not None:
+            server.count(fault)
+            if fault == 429:
+                retry = config["retry_after"]
+                return self._send_json(429, {"error": {"code": "429", "message": "Rate limit is exceeded (stand-in)."}},
+                                       headers=[("Retry-After", str(retry)), ("retry-after-ms", str(int(retry * 1000)))])
+            return self._send_json(500, {"error": {"code": "InternalServerError", "message": "Injected failure (stand-in)."}})
+        try:
+            start = time.perf_counter()
+            prompt = prompt_of(kind, body)
+            text, usage, source = self._answer(kind, body, prompt)
+            delay = max(0.0, config["latency_ms"] + server.rng.uniform(-1, 1) * config["jitter_ms"]) / 1000
+            time.sleep(max(0.0, delay - (time.perf_counter() - start)))
+            stream = bool(body.get("stream"))
+            if stream:
+                self._stream(kind, body, text, usage)
+            else:
+                rate = config["tokens_per_s"]
+                if rate > 0:
+                    time.sleep(usage["completion_tokens"] / rate)
+                self._send_json(200, _chat_body(body, text, usage) if kind == "chat" else _response_body(body, text, usage))
+            server.count(200, streamed=int(stream), prompt_tokens=usage["prompt_tokens"],
+                         completion_tokens=usage["completion_tokens"], **{source: 1} if source else {})
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away (cancelled stream); nothing left to send
+            server.count("disconnected")
+        except Exception as e:
+            logger.exception("Stand-in request failed")
+            server.count(502)
+            self._send_json(502, {"error": {"code": "BadGateway", "message": str(e)}})
+        finally:
+            server.release()
+
+    def _answer(self, kind, body, prompt):
+        """(text, usage, counter name) from the replay table, the upstream or the synthetic generator."""
+        server = self.server
+        entry = server.lookup(kind, prompt)
+        source = "replayed"
+        if entry is None and server.upstream:
+            entry = self._proxy(kind, body, prompt)
+            source = "proxied"
+        if entry is None:
+            tokens = body.get("max_tokens") or body.get("max_output_tokens") or server.config["response_tokens"]
+            entry = {"text": synthetic_text(prompt, min(int(tokens), server.config["response_tokens"]))}
+            source = None
+        text = entry["text"]
+        usage = {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(text),
+                 **(entry.get("usage") or {})}
+        return text, usage, source
+
+    def _proxy(self, kind, body, prompt):
+        import httpx
+
+        headers = {name: self.headers[name] for name in ("Authorization", "api-key") if self.headers.get(name)}
+        if self.server.upstream_key:
+            headers["api-key"] = self.server.upstream_key
+        upstream_body = {k: v for k, v in body.items() if k not in ("stream", "stream_options")}
+        response = httpx.post(f"{self.server.upstream}{self.path}", json=upstream_body, headers=headers, timeout=300)
+        response.raise_for_status()
+        data = response.json()
+        if kind == "chat":
+            text = data["choices"][0]["message"]["content"] or ""
+            usage = data.get("usage") or {}
+            usage = {"prompt_tokens": usage.get("prompt_tokens"), "completion_tokens": usage.get("completion_tokens")}
+        else:
+            text = data.get("output_text") or "".join(
+                c.get("text", "") for item in data.get("output", []) if isinstance(item, dict)
+                for c in item.get("content") or [] if isinstance(c, dict))
+            usage = data.get("usage") or {}
+            usage = {"prompt_tokens": usage.get("input_tokens"), "completion_tokens": usage.get("output_tokens")}
+        entry = {"key": request_key(kind, prompt), "kind": kind, "text": text,
+                 "usage": {k: v for k, v in usage.items() if v is not None}}
+        self.server.record(entry)
+        return entry
+
+    def _stream(self, kind, body, text, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        config = self.server.config
+        tokens = split_tokens(text)
+        size = max(1, config["chunk_tokens"])
+        interval = size / config["tokens_per_s"] if config["tokens_per_s"] > 0 else 0.0
+        events = _chat_events if kind == "chat" else _response_events
+        deltas = ("".join(tokens[i:i + size]) for i in range(0, len(tokens), size))
+        next_at = time.perf_counter()
+        for event, payload, is_delta in events(body, deltas, text, usage):
+            if is_delta and interval:
+                next_at += interval
+                time.sleep(max(0.0, next_at - time.perf_counter()))
+            data = payload if isinstance(payload, str) else json.dumps(payload)
+            prefix = f"event: {event}\n" if event else ""
+            self.wfile.write(f"{prefix}data: {data}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+
+def _chat_body(body, text, usage):
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "object": "chat.completion", "created": int(time.time()),
+        "model": body.get("model", "standin"),
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+        "usage": {**usage, "total_tokens": usage["prompt_tokens"] + usage["completion_tokens"]},
+    }
+
+
+def _chat_events(body, deltas, text, usage):
+    base = {"id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "object": "chat.completion.chunk",
+            "created": int(time.time()), "model": body.get("model", "standin")}
+    # Azure opens with a content-filter chunk that has no choices
+    yield None, {**base, "choices": [], "prompt_filter_results": []}, False
+    yield None, {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}}]}, False
+    for delta in deltas:
+        yield None, {**base, "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]}, True
+    yield None, {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}, False
+    if (body.get("stream_options") or {}).get("include_usage"):
+        yield None, {**base, "choices": [], "usage": {**usage, "total_tokens": sum(usage.values())}}, False
+    yield None, "[DONE]", False
+
+
+def _response_body(body, text, usage, status="completed", response_id=None, message_id=None):
+    response = {
+        "id": response_id or f"resp_{uuid.uuid4().hex}", "object": "response", "created_at": int(time.time()),
+        "status": status, "model": body.get("model") or "standin", "output": [], "parallel_tool_calls": False,
+        "tool_choice": "auto", "tools": [],
+    }
+    agent = (body.get("agent") or {}).get("name")
+    if agent:
+        response["agent"] = {"name": agent, "type": "agent_id"}
+    if status == "completed":
+        response["output"] = [{"type": "message", "id": message_id or f"msg_{uuid.uuid4().hex}", "role": "assistant",
+                               "status": "completed",
+                               "content": [{"type": "output_text", "text": text, "annotations": []}]}]
+        response["usage"] = {"input_tokens": usage["prompt_tokens"], "output_tokens": usage["completion_tokens"],
+                             "total_tokens": usage["prompt_tokens"] + usage["completion_tokens"],
+                             "input_tokens_details": {"cached_tokens": 0},
+                             "output_tokens_details": {"reasoning_tokens": 0}}
+    return response
+
+
+def _response_events(body, deltas, text, usage):
+    response_id, message_id = f"resp_{uuid.uuid4().hex}", f"msg_{uuid.uuid4().hex}"
+    sequence = iter(range(1_000_000))
+    created = _response_body(body, text, usage, status="in_progress", response_id=response_id)
+    yield "response.created", {"type": "response.created", "sequence_number": next(sequence), "response": created}, False
+    item = {"type": "message", "id": message_id, "role": "assistant", "status": "in_progress", "content": []}
+    yield "response.output_item.added", {"type": "response.output_item.added", "sequence_number": next(sequence),
+                                         "output_index": 0, "item": item}, False
+    for delta in deltas:
+        yield "response.output_text.delta", {"type": "response.output_text.delta", "sequence_number": next(sequence),
+                                             "item_id": message_id, "output_index": 0, "content_index": 0,
+                                             "delta": delta, "logprobs": []}, True
+    yield "response.output_text.done", {"type": "response.output_text.done", "sequence_number": next(sequence),
+                                        "item_id": message_id, "output_index": 0, "content_index": 0,
+                                        "text": text, "logprobs": []}, False
+    completed = _response_body(body, text, usage, response_id=response_id, message_id=message_id)
+    yield "response.completed", {"type": "response.completed", "sequence_number": next(sequence),
+                                 "response": completed}, False
+
+
+def start_server(host="127.0.0.1", port=0, **options):
+    """Start a stand-in on a background thread and return it (server.url, server.stats(), server.shutdown())."""
+    server = StandinServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="standin", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Azure OpenAI / Foundry stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+    parser.add_argument("--replay", help="JSON lines of recorded responses to serve")
+    parser.add_argument("--upstream", help="Real endpoint to forward unknown requests to (record mode)")
+    parser.add_argument("--upstream-key", default=os.getenv("AZURE_OPENAI_API_KEY"),
+                        help="api-key header for --upstream (Bearer tokens from clients are passed through)")
+    parser.add_argument("--record", help="Append forwarded answers to this JSON lines file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    config = {name: getattr(args, name) for name in DEFAULTS}
+    server = StandinServer((args.host, args.port), replay=args.replay, record=args.record,
+                           upstream=args.upstream, upstream_key=args.upstream_key, **config)
+    print(f"Stand-in listening on {server.url}")
+    print(f"  ENDPOINT_URL={server.url}")
+    print(f"  FOUNDARY_ENDPOINT={server.url}/api/projects/standin  FOUNDRY_STATIC_TOKEN=standin")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()